@@ -7,8 +7,9 @@ __version__ = "0.2.0"
 import pathlib
 from typing import Iterator, Optional
 
-from . import cli, experiments, projects, types
+from . import cli, executors, experiments, projects, types
 from .experiments import Experiment, Trial
+from .sessions import Session
 
 
 def new_experiment(
@@ -26,13 +27,28 @@ def load_experiments(
     root: Optional[pathlib.Path] = None,
     filter_fn: types.FilterFn[Experiment] = lambda _: True,
     needs_trials: bool = True,
+    engine: executors.Engine = "auto",
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    pools: Optional[executors.Pools] = None,
 ) -> Iterator[Experiment]:
+    """
+    Loads the experiments matching filter_fn. Each call starts (and stops) its own workers unless pools is given: pass executors.Pools(workers) (or a Session's pools) to reuse warm workers across calls.
+    """
     if root is None:
         root = cli.DEFAULT_ROOT
 
     project = projects.Project(root)
 
-    return experiments.load_all(project, filter_fn, needs_trials)
+    return experiments.load_all(
+        project,
+        filter_fn,
+        needs_trials,
+        engine=engine,
+        workers=workers,
+        chunksize=chunksize,
+        pools=pools,
+    )
 
 
-__all__ = ["new_experiment", "load_experiments", "Experiment", "Trial"]
+__all__ = ["new_experiment", "load_experiments", "Experiment", "Trial", "Session"]
@@ -1,11 +1,19 @@
 import argparse
+import os
 import pathlib
 import sys
+from typing import Iterable, Optional, Sequence
 
-from . import cli, projects
+from . import cli, executors, projects
+from .cli.lib import logging
 
 
-def make_parser() -> argparse.ArgumentParser:
+def make_parser(commands: Optional[Iterable[str]] = None) -> argparse.ArgumentParser:
+    """
+    Only the subcommands in commands (all of them if None) are imported and get their full parsers; the others are only listed with their help text, which is enough for `relic --help`.
+    """
+    commands = set(cli.COMMANDS if commands is None else commands)
+
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--verbose",
@@ -19,47 +27,84 @@ def make_parser() -> argparse.ArgumentParser:
         default=cli.DEFAULT_ROOT,
         type=str,
     )
+    parser.add_argument(
+        "--load-workers",
+        help=f"How many workers load experiments in parallel. Defaults to ${executors.WORKERS_VAR}, then the number of available CPUs.",
+        type=int,
+        default=None,
+    )
 
     subparsers = parser.add_subparsers(help="Available commands.")
 
     add_init_parser(subparsers)
-    cli.cat.add_parser(subparsers)
-    cli.delete.add_parser(subparsers)
-    cli.export.add_parser(subparsers)
-    cli.ls.add_parser(subparsers)
-    cli.merge.add_parser(subparsers)
-    cli.modify.add_parser(subparsers)
-    cli.plot.add_parser(subparsers)
-    cli.versions.add_parser(subparsers)
+    for name, help in cli.COMMANDS.items():
+        if name in commands:
+            cli.load(name).add_parser(subparsers)
+        else:
+            subparsers.add_parser(name, help=help)
 
     return parser
 
 
+def find_command(argv: Sequence[str]) -> Optional[str]:
+    """
+    The subcommand in argv, found without parsing it (which needs the subcommand's parser).
+    """
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--root", "--load-workers"):
+            # Skip its value.
+            next(args, None)
+        elif arg in cli.COMMANDS:
+            return arg
+        elif not arg.startswith("-"):
+            return None
+
+    return None
+
+
 def add_init_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
     parser = subparsers.add_parser("init", help="Initialize a relic repository.")
+    parser.add_argument(
+        "--object-store",
+        help="Store each distinct model once (in relics/objects) and hardlink it into experiments.",
+        action="store_true",
+    )
     parser.set_defaults(func=do_init)
 
 
 def do_init(args: argparse.Namespace) -> int:
     root = pathlib.Path(args.root)
     try:
-        projects.Project.new(root)
+        projects.Project.new(root, object_store=args.object_store)
         return 0
     except Exception as err:
-        cli.lib.logging.error(str(err))
+        logging.error(str(err))
         return getattr(err, "errno", 1)
 
 
 def main() -> None:
-    parser = make_parser()
+    command = find_command(sys.argv[1:])
+    parser = make_parser([] if command is None else [command])
     args = parser.parse_args()
 
-    cli.lib.logging.init(args.verbose)
+    logging.init(args.verbose)
+
+    if args.load_workers is not None:
+        # Through the environment, so that every load_all (and any worker processes) sees it.
+        os.environ[executors.WORKERS_VAR] = str(args.load_workers)
+    del args.load_workers
+
+    try:
+        executors.configured_workers()
+    except ValueError as err:
+        logging.error(str(err))
+        sys.exit(1)
 
     if not hasattr(args, "func"):
-        cli.lib.logging.error("No command specified.")
+        logging.error("No command specified.")
         parser.print_help()
         return
 
@@ -1,7 +1,64 @@
-import pathlib
+"""
+Subcommands of the relic command line tool.
 
-from . import cat, delete, export, ls, merge, modify, plot, versions
+Subcommand modules are imported when they are first used (see relic.__main__), so that `relic --help` or `relic versions` doesn't pay for the imports of every other subcommand.
+"""
+import importlib
+import pathlib
+import types
+from typing import TYPE_CHECKING
 
 DEFAULT_ROOT = pathlib.Path("relics")
 
-__all__ = ["cat", "delete", "export", "ls", "merge", "modify", "plot", "versions"]
+# Subcommand (and module) name -> help text.
+COMMANDS = {
+    "cat": "Show single experiment.",
+    "delete": "Delete experiments from your relic repository. Deleted experiments are moved to the trash; run `relic gc` to reclaim their space.",
+    "export": "Export your repository into file formats.",
+    "gc": "Reclaim the space used by deleted experiments.",
+    "ls": "Show results from experiments.",
+    "merge": "Merge two relic directories.",
+    "modify": "Modify existing experiment config options",
+    "plot": "Plot results.",
+    "summarize": "Rebuild experiment summaries and manifests (for projects written by older versions of relic).",
+    "versions": "Manage your project versions",
+}
+
+if TYPE_CHECKING:
+    from . import (
+        cat,
+        delete,
+        export,
+        gc,
+        ls,
+        merge,
+        modify,
+        plot,
+        summarize,
+        versions,
+    )
+
+
+def load(name: str) -> types.ModuleType:
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __getattr__(name: str) -> types.ModuleType:
+    if name in COMMANDS or name == "lib":
+        return load(name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "cat",
+    "delete",
+    "export",
+    "gc",
+    "ls",
+    "merge",
+    "modify",
+    "plot",
+    "summarize",
+    "versions",
+]
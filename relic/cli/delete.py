@@ -1,14 +1,16 @@
 import argparse
 
 from .. import experiments
-from .lib import logging, shared
+from . import COMMANDS
+from .lib import hashes, logging, shared
 
 
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
     parser = subparsers.add_parser(
-        "delete", help="Delete experiments from your relic repository."
+        "delete",
+        help=COMMANDS["delete"],
     )
     parser.add_argument(
         "--hashes",
@@ -22,9 +24,11 @@ def add_parser(
 
 
 def do_delete(args: argparse.Namespace) -> int:
-    # Delete all experiments specified by hash.
+    # Delete all experiments specified by hash. Prefixes are resolved against the hash index, so nothing is loaded.
+    index = hashes.HashIndex.from_project(args.project)
+    deleted = 0
     for hash_prefix in args.hashes:
-        to_delete = list(experiments.with_prefix(hash_prefix, args.project.root))
+        to_delete = index.with_prefix(hash_prefix)
         if len(to_delete) == 0:
             logging.warn(f"There are no experiments with the prefix '{hash_prefix}'!")
             return 1
@@ -34,12 +38,25 @@ def do_delete(args: argparse.Namespace) -> int:
             )
             return 1
         else:
-            to_delete[0].delete()
+            experiments.Experiment.remove(args.project.root, to_delete[0])
+            deleted += 1
 
-    # Delete all experiments specified by --experiments
+    # Delete all experiments specified by --experiments. Deleting only needs the hash, so trials are only loaded if the filter needs them.
     if args.experiments:
         exp_fn, needs_trials = shared.make_experiment_fn(args.experiments)
-        for exp in experiments.load_all(args.project, exp_fn, needs_trials):
+        if needs_trials:
+            exps = experiments.load_all(args.project, exp_fn)
+        else:
+            exps = experiments.load_configs(args.project, exp_fn)
+
+        for exp in exps:
             exp.delete()
+            deleted += 1
+
+    if deleted:
+        logging.info(
+            "Deleted experiments. Run `relic gc` to reclaim their space. [experiments: %s]",
+            deleted,
+        )
 
     return 0
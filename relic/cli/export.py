@@ -1,48 +1,547 @@
+"""
+Exports experiments into files that other tools (pandas, DuckDB, spreadsheets) can read. Every format has one row per trial: the experiment hash, the flattened config (config.*) and the flattened trial (trial.*).
+
+An incremental export directory holds a snapshot (part-*.<format>), zero or more deltas and a watermark (watermark.json). Each delta (delta-00001/, ...) has part files with the rows of added or changed experiments and removed.json, the hashes whose rows in the snapshot and earlier deltas are superseded. To read the export, apply the deltas in order: drop the removed experiments' rows, then append the delta's rows. --compact does exactly that and writes the result as the new snapshot.
+"""
 import argparse
+import csv
+import dataclasses
 import datetime
+import functools
 import os
 import pathlib
+import shutil
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import preface
+
+from .. import experiments, json, projects, types
+from . import COMMANDS
+from .lib import logging, parallel, shared, writers
+
+T = TypeVar("T")
 
-from .. import experiments, types
-from .lib import logging
+Record = Dict[str, Any]
 
-FORMATS = ["csv", "json"]
+FORMATS = ["jsonl", "csv", "arrow", "parquet"]
 
 
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser = subparsers.add_parser(
-        "export", help="Export your repository into file formats."
-    )
+    parser = subparsers.add_parser("export", help=COMMANDS["export"])
     parser.add_argument(
-        "--format", help="File format to export to.", choices=FORMATS, default="json"
+        "--format", help="File format to export to.", choices=FORMATS, default="jsonl"
     )
     parser.add_argument(
         "--dir",
         help="Directory to write exported files to.",
         default=f"exports_{datetime.datetime.today().strftime('%Y-%m-%d_%H-%M-%S')}",
     )
+    parser.add_argument(
+        "--shard-size",
+        help="Number of experiments per file. Use 0 to write everything to a single file.",
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of threads that build and write files. Writing arrow and parquet files runs in parallel; jsonl and csv files are mostly built one at a time, but while experiments are still loading. Defaults to min(32, CPUs + 4).",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--incremental",
+        help="Only write experiments that were added, changed or deleted since the last incremental export to --dir, as a delta.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--compact",
+        help="Merge the deltas of an incremental export in --dir into a single snapshot.",
+        action="store_true",
+    )
+    shared.add_filter_options(parser)
     parser.set_defaults(func=do_export)
 
 
-def _filepath(root: types.Path, experiment: experiments.Experiment) -> pathlib.Path:
-    return pathlib.Path(root) / experiment.hash
+def _value(value: Any) -> Any:
+    # Tensors (and numpy arrays) become plain numbers and lists.
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def _record(experiment: experiments.Experiment, trial: experiments.Trial) -> Record:
+    record: Record = {"experiment": experiment.hash}
+    for key, value in preface.dict.flattened(experiment.config).items():
+        record[f"config.{key}"] = _value(value)
+    for key, value in preface.dict.flattened(trial).items():
+        record[f"trial.{key}"] = _value(value)
+    return record
+
+
+def _text_cell(value: Any) -> Any:
+    # CSV cells are text, so nested values are written as JSON rather than Python reprs.
+    if isinstance(value, (list, dict)):
+        return json.dumpb(value, sort_keys=False).decode("utf-8")
+    return value
+
+
+def records(
+    exps: Iterable[experiments.Experiment],
+    trial_fn: types.FilterFn[experiments.Trial] = lambda _: True,
+) -> List[Record]:
+    return [_record(exp, trial) for exp in exps for trial in exp if trial_fn(trial)]
+
+
+def table(
+    records: Sequence[Record], format: str = "jsonl"
+) -> Tuple[List[str], List[List[Any]]]:
+    """
+    Returns the headers and rows for some records. Headers are the union of every record's columns, in the order they first appear; missing values are None.
+    """
+    headers: Dict[str, None] = {}
+    for record in records:
+        headers.update(dict.fromkeys(record))
+
+    rows = [[record.get(header) for header in headers] for record in records]
+    if format == "csv":
+        rows = [[_text_cell(value) for value in row] for row in rows]
+
+    return list(headers), rows
+
+
+def to_table(
+    exps: Iterable[experiments.Experiment],
+    format: str = "jsonl",
+    trial_fn: types.FilterFn[experiments.Trial] = lambda _: True,
+) -> Tuple[List[str], List[List[Any]]]:
+    """
+    Returns the headers and rows for the trials matching trial_fn.
+    """
+    return table(records(exps, trial_fn), format)
+
+
+def shard_path(directory: pathlib.Path, shard: int, format: str) -> pathlib.Path:
+    return directory / f"part-{shard:05d}.{format}"
+
+
+def write_shard(
+    shard: T,
+    path: pathlib.Path,
+    format: str,
+    to_records: Callable[[T], Sequence[Record]],
+) -> None:
+    headers, rows = table(to_records(shard), format)
+
+    # Write to a temporary name first, so that a shard is either complete or missing.
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as fp:
+        writers.WRITERS[format](headers, rows, fp)
+    os.replace(tmp, path)
+
+    logging.debug("Wrote shard. [path: %s, rows: %s]", path, len(rows))
+
+
+def write_shards(
+    shards: Iterable[T],
+    directory: pathlib.Path,
+    format: str,
+    to_records: Callable[[T], Sequence[Record]],
+    max_workers: Optional[int] = None,
+) -> int:
+    """
+    Writes each shard to its own file (part-00000.<format>, ...) while the next shards are produced. A pool of threads turns each shard into records (with to_records) and writes them, so building records overlaps with producing shards (for example, loading experiments). Only pyarrow (arrow and parquet) releases the GIL while writing, so jsonl and csv shards don't write in parallel. Returns the number of shards written.
+    """
+    # Each queued shard is held in memory, so keep the queue short.
+    pool = parallel.BoundedExecutor(max_workers=max_workers, queue_size=1)
+    count = 0
+    try:
+        for count, shard in enumerate(shards, start=1):
+            path = shard_path(directory, count - 1, format)
+            pool.submit(write_shard, shard, path, format, to_records)
+        pool.finish()
+    finally:
+        pool.shutdown()
+
+    return count
+
+
+def _batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if size > 0 and len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def export(
+    exps: Iterable[experiments.Experiment],
+    directory: pathlib.Path,
+    format: str,
+    shard_size: int = 1000,
+    max_workers: Optional[int] = None,
+    trial_fn: types.FilterFn[experiments.Trial] = lambda _: True,
+) -> int:
+    """
+    Writes experiments to directory in shards of shard_size experiments (0 means a single shard). Returns the number of shards written.
+    """
+    return write_shards(
+        _batches(exps, shard_size),
+        directory,
+        format,
+        functools.partial(records, trial_fn=trial_fn),
+        max_workers,
+    )
+
+
+# region INCREMENTAL
+
+
+@dataclasses.dataclass
+class Watermark:
+    """
+    What an incremental export directory contains (watermark.json): the format, the filters, the number of deltas and the content fingerprint (see Experiment.content_fingerprint) of every experiment that was considered, including those the filters left out (so they aren't loaded again until they change). Because of that, later exports must use the same filters.
+    """
+
+    format: str
+    deltas: int = 0
+    experiments: Dict[str, str] = dataclasses.field(default_factory=dict)
+    # --experiments and --trials, as given.
+    experiment_filters: List[str] = dataclasses.field(default_factory=list)
+    trial_filters: List[str] = dataclasses.field(default_factory=list)
+    # While a compaction is being applied: the number of deltas it merged and the number of shards it wrote (in .compacted/). See compact().
+    compacting: int = 0
+    compacted_shards: int = 0
+
+    @staticmethod
+    def path(directory: pathlib.Path) -> pathlib.Path:
+        return directory / "watermark.json"
+
+    @classmethod
+    def load(cls, directory: pathlib.Path) -> Optional["Watermark"]:
+        try:
+            return cls(**json.load(cls.path(directory)))
+        except FileNotFoundError:
+            return None
+
+    def save(self, directory: pathlib.Path) -> None:
+        # Written last and atomically, so an interrupted export is simply redone.
+        tmp = directory / ".watermark.json.tmp"
+        json.dump(tmp, dataclasses.asdict(self))
+        os.replace(tmp, self.path(directory))
+
+
+def pending_dir(directory: pathlib.Path) -> pathlib.Path:
+    # Next to directory, so that it can be renamed into place.
+    directory = directory.resolve()
+    return directory.with_name(f".{directory.name}.pending")
+
+
+def delta_dir(directory: pathlib.Path, delta: int) -> pathlib.Path:
+    return directory / f"delta-{delta:05d}"
+
+
+def removed_path(delta: pathlib.Path) -> pathlib.Path:
+    return delta / "removed.json"
+
+
+def export_incremental(
+    project: projects.Project,
+    directory: pathlib.Path,
+    format: str,
+    experiment_filters: Sequence[str] = (),
+    trial_filters: Sequence[str] = (),
+    shard_size: int = 1000,
+    max_workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Exports the experiments that were added or changed since the last incremental export to directory, and records the ones that changed or were deleted. The first export is a full snapshot. Returns the number of written and removed experiments.
+
+    The first snapshot is written to pending_dir(directory), with its watermark, and then renamed to directory, so an interrupted first export is simply redone.
+    """
+    watermark = Watermark.load(directory)
+    if watermark is None:
+        watermark = Watermark(
+            format, 0, {}, list(experiment_filters), list(trial_filters)
+        )
+        target = pending_dir(directory)
+    else:
+        _finish_compaction(directory, watermark)
+        if watermark.format != format:
+            raise ValueError(
+                f"{directory} is a {watermark.format} export; can't add {format} files to it!"
+            )
+        if (watermark.experiment_filters, watermark.trial_filters) != (
+            list(experiment_filters),
+            list(trial_filters),
+        ):
+            raise ValueError(
+                f"{directory} was exported with other filters (--experiments {watermark.experiment_filters}, --trials {watermark.trial_filters}); export to a new directory instead!"
+            )
+        target = delta_dir(directory, watermark.deltas + 1)
+
+    exp_fn, needs_trials = shared.make_experiment_fn(experiment_filters)
+    trial_fn = shared.make_trial_fn(trial_filters)
+
+    # Fingerprint before loading, so that experiments written during the export are exported again next time.
+    current = experiments.content_fingerprints(project, max_workers)
+    changed = [
+        hash
+        for hash, fingerprint in current.items()
+        if watermark.experiments.get(hash) != fingerprint
+    ]
+    # Rows of changed and deleted experiments in earlier files are superseded.
+    removed = sorted(
+        hash
+        for hash in watermark.experiments
+        if hash not in current or current[hash] != watermark.experiments[hash]
+    )
+
+    if not changed and not removed:
+        return 0, 0
+
+    written: List[str] = []
+
+    def track(
+        exps: Iterable[experiments.Experiment],
+    ) -> Iterator[experiments.Experiment]:
+        for exp in exps:
+            written.append(exp.hash)
+            yield exp
+
+    if target.exists():
+        # Left over from an interrupted export.
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    exps = experiments.load_all(project, exp_fn, needs_trials, hashes=changed)
+    export(track(exps), target, format, shard_size, max_workers, trial_fn)
+
+    is_delta = target != pending_dir(directory)
+    if is_delta:
+        json.dump(removed_path(target), removed)
+        watermark.deltas += 1
+
+    for hash in removed:
+        del watermark.experiments[hash]
+    # Experiments the filters left out are recorded too, so that they aren't loaded again until they change.
+    for hash in changed:
+        watermark.experiments[hash] = current[hash]
+
+    if is_delta:
+        watermark.save(directory)
+    else:
+        watermark.save(target)
+        # Replaces directory if it is empty.
+        os.replace(target, directory)
+
+    return len(written), len(removed)
+
+
+def read_shard(path: pathlib.Path, format: str) -> List[Record]:
+    if format == "jsonl":
+        with open(path, "rb") as fp:
+            return [json.loadb(line) for line in fp if line.strip()]
+    elif format == "csv":
+        with open(path, newline="", encoding="utf-8") as fp:
+            return [
+                {key: None if value == "" else value for key, value in row.items()}
+                for row in csv.DictReader(fp)
+            ]
+    elif format == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all().to_pylist()  # type: ignore
+    elif format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pylist()  # type: ignore
+    else:
+        raise ValueError(f"Format '{format}' is not supported!")
+
+
+def _read_shards(directory: pathlib.Path, format: str) -> List[Record]:
+    return [
+        record
+        for path in sorted(directory.glob(f"part-*.{format}"))
+        for record in read_shard(path, format)
+    ]
+
+
+def compact(
+    directory: pathlib.Path, shard_size: int = 1000, max_workers: Optional[int] = None
+) -> int:
+    """
+    Applies every delta in an incremental export directory to its snapshot and writes the result as the new snapshot. Returns the number of deltas that were merged.
+
+    The merged snapshot is written to .compacted/ and recorded in the watermark before anything is removed, so a compaction that is interrupted at any point is finished (or redone) by the next export or compaction.
+    """
+    watermark = Watermark.load(directory)
+    if watermark is None:
+        raise ValueError(f"{directory} is not an incremental export!")
+
+    _finish_compaction(directory, watermark)
+
+    if watermark.deltas == 0:
+        return 0
+
+    format = watermark.format
+    snapshot = _read_shards(directory, format)
+    for delta in range(1, watermark.deltas + 1):
+        removed = set(json.load(removed_path(delta_dir(directory, delta))))
+        snapshot = [
+            record for record in snapshot if record["experiment"] not in removed
+        ]
+        snapshot.extend(_read_shards(delta_dir(directory, delta), format))
+
+    # Shards hold whole experiments.
+    by_experiment: Dict[str, List[Record]] = {}
+    for record in snapshot:
+        by_experiment.setdefault(record["experiment"], []).append(record)
+
+    compacted = compacted_dir(directory)
+    if compacted.exists():
+        # Left over from a compaction that was interrupted before its watermark was saved.
+        shutil.rmtree(compacted)
+    compacted.mkdir()
+
+    count = write_shards(
+        _batches(by_experiment.values(), shard_size),
+        compacted,
+        format,
+        _concat,
+        max_workers,
+    )
+
+    merged = watermark.deltas
+    watermark.compacting, watermark.compacted_shards = merged, count
+    watermark.deltas = 0
+    watermark.save(directory)
+
+    _finish_compaction(directory, watermark)
+
+    return merged
+
+
+def _concat(batch: List[List[Record]]) -> List[Record]:
+    return [record for records in batch for record in records]
+
+
+def compacted_dir(directory: pathlib.Path) -> pathlib.Path:
+    return directory / ".compacted"
+
+
+def _finish_compaction(directory: pathlib.Path, watermark: Watermark) -> None:
+    """
+    Swaps in the snapshot of a compaction that was recorded in the watermark (see compact()). Every step can be repeated, so this also finishes a compaction that was interrupted.
+    """
+    if not watermark.compacting:
+        return
+
+    format = watermark.format
+    compacted = compacted_dir(directory)
+    if compacted.is_dir():
+        for path in compacted.iterdir():
+            os.replace(path, directory / path.name)
+        compacted.rmdir()
+
+    # Old snapshot files that no new file replaced.
+    for path in directory.glob(f"part-*.{format}"):
+        if int(path.stem.split("-")[1]) >= watermark.compacted_shards:
+            path.unlink()
+
+    for delta in range(1, watermark.compacting + 1):
+        shutil.rmtree(delta_dir(directory, delta), ignore_errors=True)
+
+    watermark.compacting, watermark.compacted_shards = 0, 0
+    watermark.save(directory)
 
 
-def do_export(args: argparse.Namespace) -> None:
+# endregion
+
+
+def do_export(args: argparse.Namespace) -> int:
+    directory = pathlib.Path(args.dir)
+    exp_fn, needs_trials = shared.make_experiment_fn(args.experiments)
+
+    if args.compact:
+        try:
+            merged = compact(directory, args.shard_size, args.workers)
+        except ValueError as err:
+            logging.error(str(err))
+            return 1
+
+        logging.info("Compacted export. [dir: %s, deltas: %s]", directory, merged)
+        return 0
+
+    if args.incremental:
+        if (
+            Watermark.load(directory) is None
+            and directory.is_dir()
+            and os.listdir(directory)
+        ):
+            logging.error(
+                "Not writing to %s because it has files but no watermark!", directory
+            )
+            return 1
+
+        try:
+            written, removed = export_incremental(
+                args.project,
+                directory,
+                args.format,
+                args.experiments,
+                args.trials,
+                args.shard_size,
+                args.workers,
+            )
+        except ValueError as err:
+            logging.error(str(err))
+            return 1
+
+        logging.info(
+            "Exported changes. [dir: %s, written: %s, removed: %s]",
+            directory,
+            written,
+            removed,
+        )
+        return 0
+
     try:
-        os.makedirs(args.dir)
+        os.makedirs(directory)
     except OSError:
-        if os.listdir(args.dir):
+        if os.listdir(directory):
             logging.error(
-                "Not writing to %s because there are existing files in it!", args.dir
+                "Not writing to %s because there are existing files in it!", directory
             )
-            return
+            return 1
 
-    if args.format == "json":
-        raise NotImplementedError()
-    elif args.format == "csv":
-        raise NotImplementedError()
-    else:
-        raise ValueError(f"Format '{args.format}' is not supported!")
+    shards = export(
+        experiments.load_all(args.project, exp_fn, needs_trials),
+        directory,
+        args.format,
+        shard_size=args.shard_size,
+        max_workers=args.workers,
+        trial_fn=shared.make_trial_fn(args.trials),
+    )
+
+    logging.info("Exported experiments. [dir: %s, files: %s]", directory, shards)
+
+    return 0
@@ -0,0 +1,47 @@
+import argparse
+import shutil
+
+from .. import objects, trash
+from . import COMMANDS, plot
+from .lib import logging
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "gc",
+        help=COMMANDS["gc"],
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of experiments to remove at the same time. Defaults to min(32, CPUs + 4).",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--objects",
+        help="Also remove every unreferenced blob from the object store (for example, after experiment directories were removed by hand). Don't use it while other relic commands are adding models.",
+        action="store_true",
+    )
+    parser.set_defaults(func=do_gc)
+
+
+def do_gc(args: argparse.Namespace) -> int:
+    # args.project.root is the current version directory (relics/vN).
+    project_root = args.project.root.parent
+
+    count = trash.empty(project_root, args.workers)
+    logging.info("Removed deleted experiments. [experiments: %s]", count)
+
+    # Cached plots are rendered again when needed.
+    shutil.rmtree(plot.cache_dir(project_root), ignore_errors=True)
+
+    if args.objects:
+        store = objects.ObjectStore.find(args.project.root)
+        if store is None:
+            logging.warn("This project doesn't use an object store.")
+        else:
+            logging.info("Removed unreferenced blobs. [blobs: %s]", store.collect())
+
+    return 0
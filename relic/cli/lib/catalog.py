@@ -0,0 +1,71 @@
+"""
+A catalog of every config and trial key observed in a project.
+
+The catalog is filled in once, while experiments are loaded, so that column patterns like `.*loss.*` can be matched against a few hundred key names instead of re-scanning every trial for every pattern.
+"""
+
+import re
+from typing import Dict, List, Set
+
+import preface
+
+from ... import experiments
+
+
+class KeyCatalog:
+    config_keys: Set[str]
+    trial_keys: Set[str]
+
+    def __init__(self) -> None:
+        self.config_keys = set()
+        self.trial_keys = set()
+        self._expanded: Dict[str, List[str]] = {}
+
+    def add(self, experiment: experiments.Experiment) -> experiments.Experiment:
+        """
+        Records the keys of an experiment's config and trials. Returns the experiment so it can be used inline while loading.
+        """
+        self.config_keys.update(preface.dict.flattened(experiment.config))
+        if not experiment.trials_loaded and experiment.summary is not None:
+            self.trial_keys.update(experiment.summary.keys)
+        for trial in experiment:
+            self.trial_keys.update(preface.dict.flattened(trial))
+
+        self._expanded.clear()
+
+        return experiment
+
+    @classmethod
+    def from_experiments(cls, exps: List[experiments.Experiment]) -> "KeyCatalog":
+        catalog = cls()
+        for exp in exps:
+            catalog.add(exp)
+        return catalog
+
+    @property
+    def keys(self) -> Set[str]:
+        return self.config_keys | self.trial_keys
+
+    def expand(self, pattern: str) -> List[str]:
+        """
+        Expands a column pattern into the (sorted) keys it matches.
+
+        Expressions like '(sum losses)', exact key names and patterns that match no key are returned unchanged, so they still compile as relic expressions.
+        """
+        if pattern not in self._expanded:
+            self._expanded[pattern] = self._expand(pattern)
+
+        return self._expanded[pattern]
+
+    def _expand(self, pattern: str) -> List[str]:
+        if pattern.startswith("(") or pattern in self.keys:
+            return [pattern]
+
+        try:
+            regex = re.compile(pattern)
+        except re.error:
+            return [pattern]
+
+        matched = sorted(key for key in self.keys if regex.fullmatch(key))
+
+        return matched or [pattern]
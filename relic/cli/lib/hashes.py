@@ -0,0 +1,65 @@
+"""
+A sorted index of experiment hashes for prefix lookups.
+
+Resolving a prefix is two binary searches over the sorted hashes, and the shortest unique prefix of a hash only depends on its two neighbors in sorted order, so neither needs to load any experiment.
+"""
+import bisect
+from typing import Iterable, Iterator, List
+
+from ... import projects
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+class HashIndex:
+    def __init__(self, hashes: Iterable[str]):
+        self._hashes: List[str] = sorted(set(hashes))
+
+    @classmethod
+    def from_project(cls, project: projects.Project) -> "HashIndex":
+        return cls(project.hashes())
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Every hash that starts with prefix.
+        """
+        start = bisect.bisect_left(self._hashes, prefix)
+        # Hashes are hex digits, so every hash that starts with prefix sorts before prefix + "\uffff".
+        end = bisect.bisect_left(self._hashes, prefix + "\uffff", lo=start)
+        return self._hashes[start:end]
+
+    def shortest_unique_prefix(self, hash: str, minimum: int = 1) -> str:
+        """
+        The shortest prefix of hash (at least minimum characters long) that no other hash in the index starts with.
+        """
+        i = bisect.bisect_left(self._hashes, hash)
+
+        length = 0
+        if i > 0:
+            length = max(length, _common_prefix_length(hash, self._hashes[i - 1]))
+        # Skip hash itself if it is in the index.
+        j = i + 1 if i < len(self._hashes) and self._hashes[i] == hash else i
+        if j < len(self._hashes):
+            length = max(length, _common_prefix_length(hash, self._hashes[j]))
+
+        return hash[: max(length + 1, minimum)]
+
+    def __contains__(self, hash: object) -> bool:
+        if not isinstance(hash, str):
+            return False
+
+        i = bisect.bisect_left(self._hashes, hash)
+        return i < len(self._hashes) and self._hashes[i] == hash
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._hashes)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
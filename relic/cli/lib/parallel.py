@@ -1,18 +1,73 @@
 import concurrent.futures
+import threading
+from typing import Any, Callable, List, Optional, Set, Type
+
 
 class BoundedExecutor:
-    def __init__(self, pool_cls=concurrent.futures.ThreadPoolExecutor):
-        self._pool = pool_cls()
-        self._futures = []
+    """
+    A thread pool whose queue of pending work is bounded.
+
+    submit() blocks once max_workers + queue_size tasks are in flight, so a producer that generates work faster than the workers finish it (for example, reading experiments from a large source project) only holds a bounded amount of work in memory.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        pool_cls: Type[
+            concurrent.futures.Executor
+        ] = concurrent.futures.ThreadPoolExecutor,
+    ) -> None:
+        self._pool = pool_cls(max_workers=max_workers)  # type: ignore
+        max_workers = self._pool._max_workers  # type: ignore
+        if queue_size is None:
+            queue_size = max_workers
+
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending: Set["concurrent.futures.Future[Any]"] = set()
+        self._errors: List[BaseException] = []
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        # Stop accepting work as soon as something went wrong.
+        self._raise_errors()
 
-    def submit(self, *args, **kwargs):
-        self._futures.append(self._pool.submit(*args, **kwargs))
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
 
-    def shutdown(self, **kwargs):
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: "concurrent.futures.Future[Any]") -> None:
+        with self._lock:
+            self._pending.discard(future)
+            if not future.cancelled() and future.exception() is not None:
+                self._errors.append(future.exception())  # type: ignore
+
+        self._slots.release()
+
+    def _raise_errors(self) -> None:
+        with self._lock:
+            if self._errors:
+                raise self._errors[0]
+
+    def shutdown(self, **kwargs: Any) -> None:
         self._pool.shutdown(wait=False, cancel_futures=True, **kwargs)
 
-    def finish(self):
-        return [
-            future.result()
-            for future in concurrent.futures.as_completed(self._futures)
-        ]
+    def finish(self) -> None:
+        """
+        Waits for all submitted work, then re-raises the first exception raised by any task.
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            concurrent.futures.wait(pending)
+
+        self._raise_errors()
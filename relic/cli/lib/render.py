@@ -0,0 +1,203 @@
+"""
+A fast renderer for plain-text tables.
+
+It produces exactly the same text as `tabulate(rows, headers=headers, floatfmt=".3g", missingval="-")` (the "simple" format), but works a column at a time: each column's type is found once, every cell in it is formatted with a single formatter, and widths are computed in one pass. tabulate does this generically per cell (including an ANSI-stripping regex on every value), which is slow for large tables.
+
+Cells with newlines, ANSI escape codes or non-ASCII characters change how tabulate measures widths; tables with any of those fall back to tabulate.
+"""
+import itertools
+from typing import IO, Any, Callable, Iterator, List, Sequence
+
+FLOATFMT = ".3g"
+MISSINGVAL = "-"
+# Separator between columns.
+SEP = "  "
+# Headers get at least this much padding.
+MIN_PADDING = 2
+
+# Column types, ordered from least to most generic (like tabulate).
+NONE, BOOL, INT, FLOAT, TEXT = range(5)
+
+_INF = float("inf")
+
+
+def _isint(value: Any) -> bool:
+    if type(value) is int:
+        return True
+
+    if not isinstance(value, str):
+        return False
+
+    try:
+        int(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _isnumber(value: Any) -> bool:
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return False
+
+    if isinstance(value, str) and (number != number or number in (_INF, -_INF)):
+        return value.lower() in ("inf", "-inf", "nan")
+
+    return True
+
+
+def _type(value: Any) -> int:
+    if value is None:
+        return NONE
+
+    # Fast paths for the common Python types.
+    cls = type(value)
+    if cls is bool:
+        return BOOL
+    if cls is int:
+        return INT
+    if cls is float:
+        return FLOAT
+
+    if isinstance(value, str):
+        if value in ("True", "False"):
+            return BOOL
+        if _isint(value):
+            return INT
+        if _isnumber(value):
+            return FLOAT
+        return TEXT
+
+    # dates, lists, dicts, etc.
+    if hasattr(value, "isoformat") or isinstance(value, bytes):
+        return TEXT
+
+    if _isnumber(value):
+        return FLOAT
+
+    return TEXT
+
+
+def _column_type(column: Sequence[Any]) -> int:
+    # tabulate starts from bool, so an all-None column is a bool column.
+    return max(itertools.chain((BOOL,), map(_type, column)))
+
+
+def _formatter(coltype: int) -> Callable[[Any], str]:
+    if coltype == FLOAT:
+        return lambda value: format(float(value), FLOATFMT)
+
+    return str
+
+
+def _afterpoint(string: str) -> int:
+    """
+    Number of characters after the decimal point (or exponent), -1 if there isn't one.
+    """
+    if not _isnumber(string) or _isint(string):
+        return -1
+
+    pos = string.rfind(".")
+    if pos < 0:
+        pos = string.lower().rfind("e")
+
+    return len(string) - pos - 1 if pos >= 0 else -1
+
+
+def _align(strings: List[str], coltype: int, minwidth: int) -> List[str]:
+    if coltype in (INT, FLOAT):
+        # Decimal alignment: line up decimal points, then flush right.
+        decimals = [_afterpoint(s) for s in strings]
+        maxdecimals = max(decimals)
+        strings = [s + (maxdecimals - decs) * " " for s, decs in zip(strings, decimals)]
+        width = max(minwidth, max(map(len, strings)))
+        return [s.rjust(width) for s in strings]
+
+    strings = [s.strip() for s in strings]
+    width = max(minwidth, max(map(len, strings)))
+    return [s.ljust(width) for s in strings]
+
+
+def _needs_tabulate(strings: Sequence[str]) -> bool:
+    for string in strings:
+        if not string.isascii() or "\n" in string or "\r" in string:
+            return True
+        if "\x1b" in string:
+            return True
+
+    return False
+
+
+def lines(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> Iterator[str]:
+    """
+    Yields the table one line at a time.
+    """
+    headers = [str(header) for header in headers]
+    if not headers:
+        return
+
+    columns = list(zip(*rows))
+
+    if not columns:
+        # Only headers.
+        widths = [len(header) + MIN_PADDING for header in headers]
+        yield SEP.join(h.ljust(w) for h, w in zip(headers, widths)).rstrip()
+        yield SEP.join("-" * w for w in widths).rstrip()
+        return
+
+    formatted = []
+    coltypes = []
+    for column in columns:
+        coltype = _column_type(column)
+        fmt = _formatter(coltype)
+        formatted.append(
+            [MISSINGVAL if value is None else fmt(value) for value in column]
+        )
+        coltypes.append(coltype)
+
+    if _needs_tabulate(headers) or any(_needs_tabulate(c) for c in formatted):
+        # Only imported for the rare tables that need it.
+        from tabulate import tabulate
+
+        yield from tabulate(
+            rows, headers=headers, floatfmt=FLOATFMT, missingval=MISSINGVAL
+        ).split("\n")
+        return
+
+    aligned = [
+        _align(column, coltype, len(header) + MIN_PADDING)
+        for column, coltype, header in zip(formatted, coltypes, headers)
+    ]
+    widths = [len(column[0]) for column in aligned]
+
+    yield SEP.join(
+        h.rjust(w) if t in (INT, FLOAT) else h.ljust(w)
+        for h, w, t in zip(headers, widths, coltypes)
+    ).rstrip()
+    yield SEP.join("-" * w for w in widths).rstrip()
+
+    for row in zip(*aligned):
+        yield SEP.join(row).rstrip()
+
+
+def render(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    return "\n".join(lines(headers, rows))
+
+
+def write(
+    headers: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    fp: IO[str],
+    chunk_size: int = 4096,
+) -> None:
+    """
+    Writes the table (and a trailing newline) to fp, chunk_size lines at a time.
+    """
+    it = lines(headers, rows)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            break
+        fp.write("\n".join(chunk))
+        fp.write("\n")
@@ -14,8 +14,13 @@ AGGREGATOR_MAP: Dict[str, types.AggregatorFunc] = {
     "mode": statistics.mode,
     "stdev": statistics.stdev,
     "sum": sum,
+    "min": min,
+    "max": max,
 }
 
+# Aggregators that can be answered from an experiment's summary (see experiments.Summary) without loading trials.
+SUMMARY_AGGREGATORS = {"mean", "stdev", "sum", "min", "max"}
+
 
 def add_filter_options(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     parser.add_argument(
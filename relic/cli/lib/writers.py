@@ -0,0 +1,105 @@
+"""
+Machine-readable writers for tabular output.
+
+Every writer takes the column headers, an iterable of rows and a binary file. The text writers (jsonl, csv) write each row as soon as it is produced, so a consumer reading from a pipe sees results before the whole table is computed. The columnar writers (arrow, parquet) need every row to build typed columns, so they write a single record batch at the end.
+"""
+import csv
+import io
+from typing import IO, Any, Callable, Dict, Iterable, List, Sequence
+
+from ... import json
+
+Row = Sequence[Any]
+Writer = Callable[[Sequence[str], Iterable[Row], IO[bytes]], None]
+
+
+def write_jsonl(headers: Sequence[str], rows: Iterable[Row], fp: IO[bytes]) -> None:
+    """
+    Writes one JSON object per row. Keys stay in column order and values keep their native types.
+    """
+    for row in rows:
+        fp.write(json.dumpb(dict(zip(headers, row)), sort_keys=False, default=str))
+        fp.write(b"\n")
+
+
+def write_csv(headers: Sequence[str], rows: Iterable[Row], fp: IO[bytes]) -> None:
+    """
+    Writes a header line, then one line per row. Missing values (None) are empty cells.
+    """
+    text = io.TextIOWrapper(fp, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+    finally:
+        # Don't close the underlying file (usually stdout) when the wrapper is garbage collected.
+        text.detach()
+
+
+def _arrow_column(values: List[Any]) -> List[Any]:
+    """
+    Arrow columns need a single type. Columns that mix types (for example, a metric that is a float in one experiment and a string summary in another) fall back to strings.
+    """
+    types = {type(value) for value in values if value is not None}
+
+    if types <= {int, float} or len(types) <= 1:
+        return values
+
+    return [None if value is None else str(value) for value in values]
+
+
+def _import_pyarrow(format: str) -> Any:
+    try:
+        import pyarrow as pa
+    except ImportError as err:
+        raise RuntimeError(
+            f"Writing {format} files requires pyarrow to be installed!"
+        ) from err
+
+    return pa
+
+
+def _record_batch(pa: Any, headers: Sequence[str], rows: Iterable[Row]) -> Any:
+    columns: Dict[str, List[Any]] = {header: [] for header in headers}
+    for row in rows:
+        for header, value in zip(headers, row):
+            columns[header].append(value)
+
+    return pa.record_batch(
+        [pa.array(_arrow_column(values)) for values in columns.values()],
+        names=list(headers),
+    )
+
+
+def write_arrow(headers: Sequence[str], rows: Iterable[Row], fp: IO[bytes]) -> None:
+    """
+    Writes the rows as one typed record batch in the Arrow IPC file format, which downstream tools can memory-map.
+    """
+    pa = _import_pyarrow("arrow")
+    batch = _record_batch(pa, headers, rows)
+
+    with pa.ipc.new_file(pa.PythonFile(fp, mode="w"), batch.schema) as writer:
+        writer.write_batch(batch)
+
+
+def write_parquet(headers: Sequence[str], rows: Iterable[Row], fp: IO[bytes]) -> None:
+    """
+    Writes the rows as a compressed Parquet file.
+    """
+    pa = _import_pyarrow("parquet")
+    import pyarrow.parquet as pq
+
+    batch = _record_batch(pa, headers, rows)
+    pq.write_table(pa.Table.from_batches([batch]), fp)
+
+
+WRITERS: Dict[str, Writer] = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "arrow": write_arrow,
+    "parquet": write_parquet,
+}
+
+# Formats relic ls can write to stdout. Parquet is only for files (relic export).
+LS_FORMATS = ["jsonl", "csv", "arrow"]
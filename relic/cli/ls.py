@@ -2,33 +2,52 @@ import argparse
 import collections
 import functools
 import sys
-from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+import time
+import typing
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 if sys.version_info >= (3, 8):
-    from typing import Literal
+    from typing import Literal, Protocol
 else:
-    from typing_extensions import Literal
+    from typing_extensions import Literal, Protocol
 
 import preface
-from tabulate import tabulate
 from typing_extensions import TypeGuard
 
-from .. import experiments, types
-from . import lib
+from .. import experiments, json, projects, types
+from . import COMMANDS
+from .lib import catalog, hashes, lang, logging, render, shared, writers
 
 FormatFunc = Callable[[Any], str]
-Handler = Callable[[experiments.Experiment], Tuple[str, Any]]
 Row = List[Any]
 Ordering = Callable[[Sequence[str], Sequence[Row]], List[Row]]
 SpecialField = Literal["experiment", "trials"]
 
 
+class Handler(Protocol):
+    header: str
+
+    def __call__(self, experiment: experiments.Experiment) -> Tuple[str, Any]:
+        ...
+
+
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser = subparsers.add_parser("ls", help="Show results from experiments.")
+    parser = subparsers.add_parser("ls", help=COMMANDS["ls"])
 
-    parser = lib.shared.add_filter_options(parser)
+    parser = shared.add_filter_options(parser)
 
     parser.add_argument(
         "--show",
@@ -40,7 +59,7 @@ def add_parser(
         "--aggregator",
         help="Aggregate function to use on multiple trials.",
         default="mean",
-        choices=list(lib.shared.AGGREGATOR_MAP.keys()),
+        choices=list(shared.AGGREGATOR_MAP.keys()),
     )
     parser.add_argument(
         "--sort",
@@ -65,6 +84,34 @@ def add_parser(
         help="Include experiments with 0 trials.",
         action="store_true",
     )
+    parser.add_argument(
+        "--group-by",
+        help="Config keys to group experiments by. --show metrics are aggregated over every trial in a group.",
+        nargs="+",
+        default=[],
+    )
+    parser.add_argument(
+        "--pivot",
+        help="Config key whose values become separate columns for each --show metric.",
+        default=None,
+    )
+    parser.add_argument(
+        "--watch",
+        help="Keep the table on screen and redraw it when experiments change.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--interval",
+        help="Seconds between checks for changes with --watch.",
+        type=float,
+        default=2.0,
+    )
+    parser.add_argument(
+        "--format",
+        help="Output format. 'table' is for humans; jsonl and csv stream one row at a time; arrow writes a typed columnar file.",
+        choices=["table", *writers.LS_FORMATS],
+        default="table",
+    )
     parser.set_defaults(func=do_ls)
 
 
@@ -79,9 +126,33 @@ def isboollist(obj: object) -> TypeGuard[List[bool]]:
     return True
 
 
+def _summarize(
+    values: List[Any], agg_fn: types.AggregatorFunc
+) -> Union[None, float, str, bool]:
+    """
+    Combines the values of one field over many trials into a single cell.
+    """
+    if not values:
+        return None
+
+    if lang.ast.isnumberlist(values):
+        return agg_fn(values)
+    elif isboollist(values):
+        true_count = len([val for val in values if val])
+        # false_count = len(values) - true_count
+        return f"{true_count}/{len(values)} ({true_count/len(values)*100:.0f}%)"
+    elif all(a == b for a, b in zip(values, values[1:])):
+        return f"{values[0]} (all)"
+    else:
+        return ",".join(map(str, values))
+
+
 class Table:
+    """
+    Rows are computed lazily, one experiment at a time, so that streaming writers can emit each row as soon as it is ready. Sorting needs every row, so tables with orderings compute all rows first.
+    """
+
     headers: List[str]
-    rows: List[Row]
 
     def __init__(
         self,
@@ -91,43 +162,83 @@ class Table:
         show_handlers: Sequence[Handler],
         orderings: Sequence[Ordering],
     ) -> None:
+        self._exps = exps
+        self._handlers = [*special_handlers, *config_handlers, *show_handlers]
+        self._orderings = orderings
+        self._rows: Optional[List[Row]] = None
+
+        self.headers = [handler.header for handler in self._handlers]
+
+    @classmethod
+    def from_rows(
+        cls, headers: List[str], rows: List[Row], orderings: Sequence[Ordering]
+    ) -> "Table":
+        """
+        Makes a table from rows that are already computed (for example, aggregated groups).
+        """
+        table = cls([], [], [], [], orderings)
+        table.headers = headers
 
-        columns: Dict[str, List[str]] = collections.defaultdict(list)
+        for ordering in reversed(orderings):
+            rows = ordering(headers, rows)
+        table._rows = rows
 
+        return table
+
+    def _compute_row(self, experiment: experiments.Experiment) -> Row:
         # NOTE: embarassingly parallel.
-        for experiment in exps:
-            for handler in special_handlers:
-                field, value = handler(experiment)
-                columns[field].append(value)
+        return [handler(experiment)[1] for handler in self._handlers]
 
-            for handler in config_handlers:
-                field, value = handler(experiment)
-                columns[field].append(value)
+    def stream(self) -> Iterator[Row]:
+        """
+        Yields rows in display order, computing each one only when it is requested (unless the table is sorted).
+        """
+        if self._rows is not None or self._orderings:
+            yield from self.rows
+            return
 
-            for handler in show_handlers:
-                field, value = handler(experiment)
-                columns[field].append(value)
+        rows = []
+        for experiment in self._exps:
+            row = self._compute_row(experiment)
+            rows.append(row)
+            yield row
 
-        self.headers = list(columns.keys())
-        self.rows = [list(row) for row in zip(*columns.values())]
+        self._rows = rows
 
-        # sort rows by the orderings
-        for ordering in reversed(orderings):
-            self.rows = ordering(self.headers, self.rows)
+    @property
+    def rows(self) -> List[Row]:
+        if self._rows is None:
+            rows = [self._compute_row(experiment) for experiment in self._exps]
+
+            # sort rows by the orderings
+            for ordering in reversed(self._orderings):
+                rows = ordering(self.headers, rows)
+
+            self._rows = rows
+
+        return self._rows
+
+    def write(self, fp: typing.IO[str]) -> None:
+        """
+        Writes the rendered table to fp in chunks, without building the whole string first.
+        """
+        render.write(self.headers, self.rows, fp)
 
     def __str__(self) -> str:
-        return tabulate(self.rows, headers=self.headers, floatfmt=".3g", missingval="-")
+        return render.render(self.headers, self.rows)
 
 
 class ConfigHandler:
     def __init__(self, field: str):
         self.field = field
+        self.header = field
 
     def __call__(self, experiment: experiments.Experiment) -> Tuple[str, Any]:
         try:
             value = preface.dict.get(experiment.config, self.field)
         except KeyError:
-            value = "-"
+            # Tables show None as '-'; machine-readable formats keep it as null.
+            value = None
 
         return self.field, value
 
@@ -148,14 +259,42 @@ class ShowHandler:
         field_code: str,
         agg_fn: types.AggregatorFunc,
         filter_fn: types.FilterFn[experiments.Trial],
+        aggregator: Optional[str] = None,
     ):
-        self.field = lib.lang.compile(field_code)
+        self.field = lang.compile(field_code)
+        self.header = str(self.field)
         self.agg_fn = agg_fn
         self.filter_fn = filter_fn
+        self.aggregator = aggregator
+
+    def _from_summary(self, experiment: experiments.Experiment) -> Optional[float]:
+        """
+        Answers simple metrics (every trial has a number for the key) from the experiment's summary. Returns None if the summary can't answer.
+        """
+        if experiment.summary is None or experiment.summary.trials == 0:
+            return None
+
+        if self.aggregator not in shared.SUMMARY_AGGREGATORS:
+            return None
+
+        if not isinstance(self.field, lang.ast.Identifier):
+            return None
+
+        metric = experiment.summary.metrics.get(self.field.ident)
+        if metric is None or metric.count != experiment.summary.trials:
+            return None
+
+        value: float = getattr(metric, self.aggregator)
+        return value
 
     def __call__(self, experiment: experiments.Experiment) -> Tuple[str, Any]:
+        if not experiment.trials_loaded:
+            summary_value = self._from_summary(experiment)
+            if summary_value is not None:
+                return self.header, summary_value
 
-        value: Union[None, float, str, bool] = None
+            # The summary can't answer this field, so we need the trials after all.
+            experiment = experiments.Experiment.load(experiment.root, experiment.hash)
 
         values = []
         for trial in experiment:
@@ -165,25 +304,13 @@ class ShowHandler:
             values.append(self.field(trial))
 
         if values:
-            if lib.lang.ast.isnumberlist(values):
-                value = self.agg_fn(values)
-            elif isboollist(values):
-                true_count = len([val for val in values if val])
-                # false_count = len(values) - true_count
-                value = (
-                    f"{true_count}/{len(values)} ({true_count/len(values)*100:.0f}%)"
-                )
-            elif all(a == b for a, b in zip(values, values[1:])):
-                value = f"{values[0]} (all)"
-            else:
-
-                value = ",".join(map(str, values))
+            value = _summarize(values, self.agg_fn)
         else:
             result = self.field(experiment)
-            assert lib.lang.ast.isresult(result)
+            assert lang.ast.isresult(result)
             value = result
 
-        return str(self.field), value
+        return self.header, value
 
 
 def _make_show_handlers(
@@ -194,27 +321,59 @@ def _make_show_handlers(
 
     The default strategy is to use mean.
     """
-    agg_fn = lib.shared.AGGREGATOR_MAP[aggregator]
+    agg_fn = shared.AGGREGATOR_MAP[aggregator]
 
-    return [ShowHandler(field, agg_fn, filter_fn) for field in fields]
+    return [ShowHandler(field, agg_fn, filter_fn, aggregator) for field in fields]
+
+
+# Hash prefixes are never shorter than this, even if a shorter one is unique.
+MIN_HASH_PREFIX = 4
+
+
+class ExperimentHandler:
+    """
+    Shows the shortest prefix that uniquely identifies an experiment among all experiments in the index (usually every experiment in the project), so it can be passed to commands like `relic delete --hashes`.
+    """
+
+    header = "experiment"
+
+    def __init__(self, index: hashes.HashIndex):
+        self.index = index
+
+    def __call__(self, experiment: experiments.Experiment) -> Tuple[str, Any]:
+        return self.header, self.index.shortest_unique_prefix(
+            experiment.hash, MIN_HASH_PREFIX
+        )
+
+
+class TrialCountHandler:
+    header = "trials"
+
+    def __init__(self, filter_fn: types.FilterFn[experiments.Trial]):
+        self.filter_fn = filter_fn
+
+    def __call__(self, experiment: experiments.Experiment) -> Tuple[str, Any]:
+        if not experiment.trials_loaded:
+            # Only loaded without trials when there are no trial filters.
+            return self.header, len(experiment)
+
+        return self.header, len(
+            [trial for trial in experiment if self.filter_fn(trial)]
+        )
 
 
 def _make_special_handlers(
-    fields: Sequence[SpecialField], filter_fn: types.FilterFn[experiments.Trial]
+    fields: Sequence[SpecialField],
+    filter_fn: types.FilterFn[experiments.Trial],
+    index: hashes.HashIndex,
 ) -> List[Handler]:
-    handlers = []
+    handlers: List[Handler] = []
 
     for field in fields:
         if field == "experiment":
-            # TODO: eventually this should be the shortest length required to uniquely distinguish an experiment among all experiments in the relics directory.
-            handlers.append(lambda exp: ("experiment", exp.hash[: len("experiment")]))
+            handlers.append(ExperimentHandler(index))
         elif field == "trials":
-            handlers.append(
-                lambda exp: (
-                    "trials",
-                    len([trial for trial in exp if filter_fn(trial)]),
-                )
-            )
+            handlers.append(TrialCountHandler(filter_fn))
         else:
             preface.never(field)
 
@@ -229,7 +388,7 @@ class OrderingObj:
         try:
             i = headers.index(self.field)
         except ValueError:
-            lib.logging.warn(
+            logging.warn(
                 f"Sorting by {self.field} but {self.field} is not in fields displayed!"
             )
             return rows  # type: ignore
@@ -281,15 +440,26 @@ def make_table(
     hide: Optional[List[str]] = None,
     only: Optional[List[str]] = None,
     trial_filters: Optional[List[str]] = None,
+    key_catalog: Optional[catalog.KeyCatalog] = None,
+    hash_index: Optional[hashes.HashIndex] = None,
 ) -> Table:
     differing = set(experiments.differing_config_fields(exps))
 
+    if hash_index is None:
+        hash_index = hashes.HashIndex(exp.hash for exp in exps)
+
+    if key_catalog is None:
+        key_catalog = catalog.KeyCatalog.from_experiments(exps)
+
     if sorts is None:
         sorts = []
 
     if show is None:
         show = []
 
+    # Expand regular expressions like '.*loss.*' into the keys they match.
+    show = preface.flattened([key_catalog.expand(pattern) for pattern in show])
+
     if hide is None:
         hide = []
 
@@ -305,15 +475,7 @@ def make_table(
 
     special_fields: List[SpecialField] = filter_fields(["experiment", "trials"])  # type: ignore
 
-    config_fields = filter_fields(
-        sorted(
-            set(
-                preface.flattened(
-                    [list(preface.dict.flattened(e.config).keys()) for e in exps]
-                )
-            )
-        )
-    )
+    config_fields = filter_fields(sorted(key_catalog.config_keys))
 
     show_fields = [
         field
@@ -323,30 +485,223 @@ def make_table(
 
     config_handlers = _make_config_handlers(config_fields)
 
-    trial_filter_fn = lib.shared.make_trial_fn(trial_filters)
+    trial_filter_fn = shared.make_trial_fn(trial_filters)
 
     show_handlers = _make_show_handlers(show_fields, aggregator, trial_filter_fn)
 
     orderings = _parse_orderings(sorts)
 
-    special_handlers = _make_special_handlers(special_fields, trial_filter_fn)
+    special_handlers = _make_special_handlers(
+        special_fields, trial_filter_fn, hash_index
+    )
 
     return Table(exps, special_handlers, config_handlers, show_handlers, orderings)
 
 
-def make_table_from_args(args: argparse.Namespace) -> Optional[Table]:
-    filter_fn, needs_trials = lib.shared.make_experiment_fn(args.experiments)
+GroupKey = Tuple[Any, ...]
+
+
+def _hashable(value: object) -> object:
+    """
+    Config values can be lists or dicts, which can't be dictionary keys.
+    """
+    if isinstance(value, (list, dict)):
+        return json.dumpb(value, default=str)
+
+    return value
+
+
+def _sort_key(key: GroupKey) -> Tuple[Tuple[bool, str], ...]:
+    # Group values can be any type (and None), so sort by their string form.
+    return tuple((value is None, str(value)) for value in key)
+
+
+class Group:
+    def __init__(self, key: GroupKey) -> None:
+        self.key = key
+        self.experiments = 0
+        self.trials = 0
+        # (pivot value, field header) -> every trial's value
+        self.values: Dict[Tuple[object, str], List[Any]] = collections.defaultdict(list)
 
-    exps = list(experiments.load_all(args.project, filter_fn, needs_trials))
 
-    if not args.all:
+class GroupAggregator:
+    """
+    Hash-aggregates experiments by their values for some config keys in a single pass.
+
+    Experiments are added one at a time and then dropped, so only the per-group trial values for the --show fields are kept in memory.
+    """
+
+    def __init__(
+        self,
+        group_by: Sequence[str],
+        pivot: Optional[str],
+        show: Sequence[str],
+        agg_fn: types.AggregatorFunc,
+        filter_fn: types.FilterFn[experiments.Trial],
+    ) -> None:
+        self.group_by = group_by
+        self.pivot = pivot
+        self.show = show
+        self.agg_fn = agg_fn
+        self.filter_fn = filter_fn
+
+        self.catalog = catalog.KeyCatalog()
+        self.fields: Dict[str, lang.ast.Expr] = {}
+
+        self.groups: Dict[GroupKey, Group] = {}
+        # hashable pivot value -> original value
+        self.pivot_values: Dict[object, object] = {}
+
+        self._update_fields()
+
+    def _update_fields(self, strict: bool = False) -> None:
+        # Regular expressions in --show can match keys that only appear in later experiments.
+        for pattern in self.show:
+            for field_code in self.catalog.expand(pattern):
+                if field_code in self.fields:
+                    continue
+
+                try:
+                    self.fields[field_code] = lang.compile(field_code)
+                except (lang.lexing.LexError, lang.parsing.ParseError):
+                    # Might be a regular expression that matches keys we haven't seen yet.
+                    if strict:
+                        raise
+
+    def _config_value(self, experiment: experiments.Experiment, key: str) -> object:
+        if not preface.dict.contains(experiment.config, key):
+            return None
+        return preface.dict.get(experiment.config, key)
+
+    def add(self, experiment: experiments.Experiment) -> None:
+        known_keys = len(self.catalog.keys)
+        self.catalog.add(experiment)
+        if len(self.catalog.keys) != known_keys:
+            self._update_fields()
+
+        key = tuple(self._config_value(experiment, k) for k in self.group_by)
+        hashable_key = tuple(_hashable(value) for value in key)
+        if hashable_key not in self.groups:
+            self.groups[hashable_key] = Group(key)
+        group = self.groups[hashable_key]
+
+        pivot: object = None
+        if self.pivot is not None:
+            pivot_value = self._config_value(experiment, self.pivot)
+            pivot = _hashable(pivot_value)
+            self.pivot_values.setdefault(pivot, pivot_value)
+
+        group.experiments += 1
+        for trial in experiment:
+            if not self.filter_fn(trial):
+                continue
+
+            group.trials += 1
+            for header, field in self.fields.items():
+                group.values[(pivot, header)].append(field(trial))
+
+    def headers(self) -> List[str]:
+        self._update_fields(strict=True)
+
+        headers = [*self.group_by, "experiments", "trials"]
+
+        for header in self._field_headers():
+            if self.pivot is None:
+                headers.append(header)
+                continue
+
+            for pivot in self._pivots():
+                headers.append(f"{header} ({self.pivot}={self.pivot_values[pivot]})")
+
+        return headers
+
+    def _field_headers(self) -> List[str]:
+        return preface.flattened(
+            [self.catalog.expand(pattern) for pattern in self.show]
+        )
+
+    def _pivots(self) -> List[object]:
+        return sorted(
+            self.pivot_values,
+            key=lambda pivot: _sort_key((self.pivot_values[pivot],))[0],
+        )
+
+    def rows(self) -> List[Row]:
+        pivots = self._pivots() if self.pivot is not None else [None]
+
+        rows = []
+        for group in sorted(self.groups.values(), key=lambda g: _sort_key(g.key)):
+            row = [*group.key, group.experiments, group.trials]
+            for header in self._field_headers():
+                for pivot in pivots:
+                    row.append(
+                        _summarize(group.values.get((pivot, header), []), self.agg_fn)
+                    )
+            rows.append(row)
+
+        return rows
+
+
+def make_grouped_table_from_args(args: argparse.Namespace) -> Optional[Table]:
+    """
+    Builds a table with one row per group of experiments in one streaming pass over the project.
+    """
+    filter_fn, needs_trials = shared.make_experiment_fn(args.experiments)
+
+    aggregator = GroupAggregator(
+        args.group_by,
+        args.pivot,
+        args.show,
+        shared.AGGREGATOR_MAP[args.aggregator],
+        shared.make_trial_fn(args.trials),
+    )
+
+    for exp in experiments.load_all(args.project, filter_fn, needs_trials):
+        # Remove experiments with 0 trials
+        if args.all or len(exp) > 0:
+            aggregator.add(exp)
+
+    if not aggregator.groups:
+        logging.info(f"No experiments that match {args.experiments}")
+        return None
+
+    return Table.from_rows(
+        aggregator.headers(), aggregator.rows(), _parse_orderings(args.sort)
+    )
+
+
+def make_table_from_args(args: argparse.Namespace) -> Optional[Table]:
+    filter_fn, needs_trials = shared.make_experiment_fn(args.experiments)
+
+    # Aggregates of plain keys over unfiltered trials can come from each experiment's summary; expressions like '(sum losses)' need the trials.
+    load_trials = (
+        needs_trials
+        or bool(args.trials)
+        or args.aggregator not in shared.SUMMARY_AGGREGATORS
+        or any(pattern.startswith("(") for pattern in args.show)
+    )
+
+    # Build the key catalog in the same pass that loads experiments.
+    key_catalog = catalog.KeyCatalog()
+    exps = [
+        key_catalog.add(exp)
+        for exp in experiments.load_all(
+            args.project, filter_fn, needs_trials, load_trials
+        )
         # Remove experiments with 0 trials
-        exps = [e for e in exps if len(e) > 0]
+        if args.all or len(exp) > 0
+    ]
 
     if not exps:
-        lib.logging.info(f"No experiments that match {args.experiments}")
+        logging.info(f"No experiments that match {args.experiments}")
         return None
 
+    if not load_trials:
+        exps = _load_trials_where_needed(
+            args.project, exps, args.show, args.aggregator, key_catalog
+        )
+
     return make_table(
         exps,
         args.aggregator,
@@ -355,12 +710,258 @@ def make_table_from_args(args: argparse.Namespace) -> Optional[Table]:
         hide=args.hide,
         only=args.only,
         trial_filters=args.trials,
+        key_catalog=key_catalog,
+        hash_index=hashes.HashIndex.from_project(args.project),
     )
 
 
-def do_ls(args: argparse.Namespace) -> int:
-    table = make_table_from_args(args)
+def _load_trials_where_needed(
+    project: projects.Project,
+    exps: List[experiments.Experiment],
+    show: List[str],
+    aggregator: str,
+    key_catalog: catalog.KeyCatalog,
+) -> List[experiments.Experiment]:
+    """
+    Reloads, with their trials, the experiments whose summary can't answer every show field (for example, a key that only some trials have). They are loaded in one parallel load_all instead of one by one for every cell.
+    """
+    fields = [
+        field
+        for pattern in show
+        for field in key_catalog.expand(pattern)
+        if field not in key_catalog.config_keys
+    ]
+    agg_fn = shared.AGGREGATOR_MAP[aggregator]
+    handlers = [
+        ShowHandler(field, agg_fn, lambda _: True, aggregator) for field in fields
+    ]
+
+    missing = [
+        exp.hash
+        for exp in exps
+        if not exp.trials_loaded
+        and any(handler._from_summary(exp) is None for handler in handlers)
+    ]
+    if not missing:
+        return exps
+
+    reloaded = {exp.hash: exp for exp in experiments.load_all(project, hashes=missing)}
+    return [reloaded.get(exp.hash, exp) for exp in exps]
+
+
+class LiveTable:
+    """
+    A table that can be refreshed as experiments change on disk.
+
+    Each refresh stats every experiment's config file and trials/ directory (see experiments.fingerprint) and only reloads experiments whose fingerprint changed. Cells that depend on trials are cached per experiment, and the set of differing config fields is kept up to date with per-field value counts instead of comparing every config again.
+    """
 
-    print(table)
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.project = args.project
+        self.args = args
+        self.filter_fn, self.needs_trials = shared.make_experiment_fn(args.experiments)
+        self.trial_filter_fn = shared.make_trial_fn(args.trials)
+        self.agg_fn = shared.AGGREGATOR_MAP[args.aggregator]
+
+        self.initialized = False
+        self.fingerprints: Dict[str, experiments.Fingerprint] = {}
+        # hash -> flattened config, only for experiments that are shown.
+        self.configs: Dict[str, Dict[str, Any]] = {}
+        # hash -> header -> value for the special and --show columns.
+        self.cells: Dict[str, Dict[str, Any]] = {}
+        # config field -> (type, value) -> number of experiments
+        self.config_values: Dict[str, typing.Counter[Tuple[str, object]]] = {}
+
+        self.key_catalog = catalog.KeyCatalog()
+        # The experiment column depends on every hash in the project, so it is computed in table().
+        self.handlers: Dict[str, Handler] = {
+            "trials": TrialCountHandler(self.trial_filter_fn),
+        }
+        self.loaded: Dict[str, experiments.Experiment] = {}
+
+    def _show_fields(self) -> List[str]:
+        return preface.flattened(
+            [self.key_catalog.expand(pattern) for pattern in self.args.show]
+        )
+
+    def _update_handlers(self) -> None:
+        """
+        Adds handlers for --show fields that started matching new keys and computes only those new columns.
+        """
+        new_handlers = {}
+        for field in self._show_fields():
+            if field in self.handlers or field in self.key_catalog.config_keys:
+                continue
+            new_handlers[field] = ShowHandler(field, self.agg_fn, self.trial_filter_fn)
+
+        for hash, exp in self.loaded.items():
+            for field, handler in new_handlers.items():
+                self.cells[hash][field] = handler(exp)[1]
+
+        self.handlers.update(new_handlers)
+
+    def _remove(self, hash: str) -> None:
+        if hash not in self.configs:
+            return
+
+        for field, value in self.configs.pop(hash).items():
+            counter = self.config_values[field]
+            key = (type(value).__name__, _hashable(value))
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+            if not counter:
+                del self.config_values[field]
+
+        del self.cells[hash]
+        del self.loaded[hash]
+
+    def _add(self, exp: experiments.Experiment) -> None:
+        if not self.filter_fn(exp):
+            return
+
+        if not self.args.all and len(exp) == 0:
+            return
+
+        config = preface.dict.flattened(exp.config)
+        for field, value in config.items():
+            counter = self.config_values.setdefault(field, collections.Counter())
+            counter[(type(value).__name__, _hashable(value))] += 1
+
+        self.configs[exp.hash] = config
+        self.loaded[exp.hash] = exp
+        self.key_catalog.add(exp)
+        self.cells[exp.hash] = {
+            header: handler(exp)[1] for header, handler in self.handlers.items()
+        }
+
+    def refresh(self) -> int:
+        """
+        Reloads new, changed and deleted experiments. Returns how many there were.
+        """
+        current = experiments.fingerprints(self.project)
+
+        changed = [
+            hash for hash, fp in current.items() if self.fingerprints.get(hash) != fp
+        ]
+        deleted = [hash for hash in self.fingerprints if hash not in current]
+
+        for hash in deleted:
+            self._remove(hash)
+
+        if not self.initialized:
+            # Initial load: use the parallel loader.
+            for exp in experiments.load_all(
+                self.project, self.filter_fn, self.needs_trials
+            ):
+                self._add(exp)
+        else:
+            for hash in changed:
+                self._remove(hash)
+                try:
+                    exp = experiments.Experiment.load(self.project.root, hash)
+                except (experiments.Experiment.LoadError, FileNotFoundError):
+                    # Being written or deleted right now; try again next refresh.
+                    current.pop(hash, None)
+                    continue
+                self._add(exp)
+
+        self.fingerprints = current
+        self.initialized = True
+        self._update_handlers()
+
+        return len(changed) + len(deleted)
+
+    def table(self) -> Optional[Table]:
+        if not self.configs:
+            return None
+
+        differing = {
+            field
+            for field, counter in self.config_values.items()
+            if len(counter) > 1 or sum(counter.values()) < len(self.configs)
+        }
+        show = self._show_fields()
+        filter_fields = functools.partial(
+            _filter_fields_in_table,
+            differing=differing,
+            hide=self.args.hide,
+            only=self.args.only,
+            show=set(show),
+        )
+
+        special_fields = filter_fields(["experiment", "trials"])
+        config_fields = filter_fields(sorted(self.config_values))
+        show_fields = [
+            field
+            for field in filter_fields(show)
+            if field not in config_fields + special_fields and field in self.handlers
+        ]
+
+        headers = [
+            *special_fields,
+            *config_fields,
+            *(self.handlers[field].header for field in show_fields),
+        ]
+        experiment = ExperimentHandler(hashes.HashIndex(self.fingerprints))
+        rows = [
+            [
+                *(
+                    experiment(self.loaded[hash])[1]
+                    if field == "experiment"
+                    else self.cells[hash][field]
+                    for field in special_fields
+                ),
+                *(self.configs[hash].get(field) for field in config_fields),
+                *(self.cells[hash][field] for field in show_fields),
+            ]
+            for hash in self.configs
+        ]
+
+        return Table.from_rows(headers, rows, _parse_orderings(self.args.sort))
+
+
+def watch(args: argparse.Namespace) -> int:
+    live = LiveTable(args)
+
+    try:
+        first = True
+        while True:
+            if live.refresh() or first:
+                table = live.table()
+                # Clear the screen and move the cursor to the top left.
+                sys.stdout.write("\x1b[H\x1b[2J")
+                if table is None:
+                    print(f"No experiments that match {args.experiments}")
+                else:
+                    print(table)
+                sys.stdout.flush()
+                first = False
+
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def do_ls(args: argparse.Namespace) -> int:
+    if args.watch:
+        if args.group_by or args.pivot or args.format != "table":
+            logging.error("--watch only works with plain tables.")
+            return 1
+        return watch(args)
+
+    if args.group_by or args.pivot:
+        table = make_grouped_table_from_args(args)
+    else:
+        table = make_table_from_args(args)
+
+    if table is None:
+        if args.format == "table":
+            print(table)
+    elif args.format == "table":
+        table.write(sys.stdout)
+    else:
+        writers.WRITERS[args.format](table.headers, table.stream(), sys.stdout.buffer)
+        sys.stdout.buffer.flush()
 
     return 1 if table is None else 0
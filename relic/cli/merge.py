@@ -1,12 +1,14 @@
 import argparse
+import dataclasses
 import functools
 import os
 import pathlib
 import sys
 import typing
-from typing import Callable, Dict, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 
-from .. import disk, experiments, json, projects, types
+from .. import experiments, projects, transfer
+from . import COMMANDS
 from .lib import logging, parallel
 
 if sys.version_info >= (3, 8):
@@ -21,9 +23,21 @@ Sometimes we will have two trials that are in conflict. Which trial should we pi
 """
 
 ConflictStrategy = Literal[
-    "longer", "src", "dst", "none", "both", "keep", "unique-seed"
+    "longer", "newer", "src", "dst", "none", "both", "keep", "unique-seed"
 ]
-ConflictFn = Callable[[experiments.Trial, experiments.Trial], bool]
+
+
+@dataclasses.dataclass
+class TrialVersion:
+    """
+    One side of a conflict. Strategies should prefer the weight (recorded when the trial was written) over the trial body.
+    """
+
+    trial: experiments.Trial
+    weight: experiments.TrialWeight
+
+
+ConflictFn = Callable[[TrialVersion, TrialVersion], bool]
 
 
 class ConflictResolutionError(Exception):
@@ -36,30 +50,34 @@ class ConflictResolutionError(Exception):
         self.dst_trial = dst_trial
 
 
-def no_resolution(src_trial: experiments.Trial, dst_trial: experiments.Trial) -> bool:
-    raise ConflictResolutionError(src_trial, dst_trial)
+def no_resolution(src: TrialVersion, dst: TrialVersion) -> bool:
+    raise ConflictResolutionError(src.trial, dst.trial)
+
+
+def use_longer_trial(src: TrialVersion, dst: TrialVersion) -> bool:
+    # Serialized sizes are padded, so small trials can have equal sizes; break ties with the number of keys and steps.
+    return (src.weight.size, src.weight.keys, src.weight.step) > (
+        dst.weight.size,
+        dst.weight.keys,
+        dst.weight.step,
+    )
 
 
-def use_longer_trial(
-    src_trial: experiments.Trial, dst_trial: experiments.Trial
-) -> bool:
-    return len(json.dumpb(src_trial)) > len(json.dumpb(dst_trial))
+def use_newer_trial(src: TrialVersion, dst: TrialVersion) -> bool:
+    return src.weight.written > dst.weight.written
 
 
-def use_source_trial(
-    src_trial: experiments.Trial, dst_trial: experiments.Trial
-) -> bool:
+def use_source_trial(src: TrialVersion, dst: TrialVersion) -> bool:
     return True
 
 
-def use_destination_trial(
-    src_trial: experiments.Trial, dst_trial: experiments.Trial
-) -> bool:
+def use_destination_trial(src: TrialVersion, dst: TrialVersion) -> bool:
     return False
 
 
 conflict_choices: Dict[ConflictStrategy, ConflictFn] = {
     "longer": use_longer_trial,
+    "newer": use_newer_trial,
     "src": use_source_trial,
     "dst": use_destination_trial,
     "none": no_resolution,
@@ -72,7 +90,7 @@ conflict_choices: Dict[ConflictStrategy, ConflictFn] = {
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser_merge = subparsers.add_parser("merge", help="Merge two relic directories.")
+    parser_merge = subparsers.add_parser("merge", help=COMMANDS["merge"])
     parser_merge.add_argument(
         "sources", help="One or more relics directories to merge from", nargs="+"
     )
@@ -82,10 +100,28 @@ def add_parser(
     )
     parser_merge.add_argument(
         "--conflicts",
-        help="How to resolve trial conflicts. 'longer' chooses the longer trial",
+        help="How to resolve trial conflicts. 'longer' chooses the trial with the larger serialized size, 'newer' the trial that was written last.",
         choices=typing.get_args(ConflictStrategy),
         default="none",
     )
+    parser_merge.add_argument(
+        "--transfer",
+        help="How to put models into the destination. 'hardlink', 'reflink' and 'move' are nearly free on the same filesystem and fall back to copying across devices. 'move' removes models from the source.",
+        choices=typing.get_args(transfer.Strategy),
+        default="copy",
+    )
+    parser_merge.add_argument(
+        "--workers",
+        help="Number of experiments to merge at the same time. Defaults to min(32, CPUs + 4).",
+        type=int,
+        default=None,
+    )
+    parser_merge.add_argument(
+        "--queue-size",
+        help="Number of experiments waiting for a worker. Together with --workers, this bounds how many experiments are in memory. Defaults to --workers.",
+        type=int,
+        default=None,
+    )
     parser_merge.set_defaults(func=do_merge)
 
 
@@ -109,27 +145,46 @@ def do_merge(args: argparse.Namespace) -> int:
             src_project,
             dst_project,
             conflict_strategy,
+            transfer_strategy=args.transfer,
+            max_workers=args.workers,
+            queue_size=args.queue_size,
         )
 
     return 0
 
 
-def add_experiment(src_exp: experiments.Experiment, dst_proj: projects.Project) -> None:
+def add_experiment(
+    src_exp: experiments.Experiment,
+    dst_proj: projects.Project,
+    transfer_strategy: transfer.Strategy = "copy",
+) -> None:
     logging.info(
         f"Adding experiment '{src_exp}' from source '{src_exp.root}' to destination '{dst_proj}' because experiment is not in destination."
     )
 
     dst_exp = experiments.Experiment.new(src_exp.config, dst_proj.root)
+    src_index = experiments.Experiment.load_model_index(src_exp.root, src_exp.hash)
+    src_weights = src_exp.trial_weights()
+    src_models = src_exp.model_digests()
 
     for trial in src_exp:
         original_model_path = src_exp.model_path(trial["instance"])
         if not os.path.exists(original_model_path):
             original_model_path = None  # type: ignore
-        dst_exp.add_trial(trial, model_path=original_model_path)
+        dst_exp.add_trial(
+            trial,
+            original_model_path,
+            transfer_strategy,
+            src_index.get(trial["instance"]),
+            src_weights[trial["instance"]].written,
+            src_models.get(trial["instance"]),
+        )
 
 
 def add_extra_trials(
-    src_exp: experiments.Experiment, dst_exp: experiments.Experiment
+    src_exp: experiments.Experiment,
+    dst_exp: experiments.Experiment,
+    transfer_strategy: transfer.Strategy = "copy",
 ) -> None:
     logging.debug(
         "Source experiment %s (%d trials) has more trials than destination experiment (%d trials). Moving all extra (%d) trials to destination.",
@@ -140,13 +195,23 @@ def add_extra_trials(
     )
 
     original_model_path: Optional[pathlib.Path]
+    src_index = experiments.Experiment.load_model_index(src_exp.root, src_exp.hash)
+    src_weights = src_exp.trial_weights()
+    src_models = src_exp.model_digests()
 
     for i, trial in list(enumerate(src_exp))[len(dst_exp) :]:
         logging.info(f"Adding trial {i} to destination experiment {dst_exp}")
         original_model_path = src_exp.model_path(trial["instance"])
         if not os.path.exists(original_model_path):
             original_model_path = None
-        dst_exp.add_trial(trial, model_path=original_model_path)
+        dst_exp.add_trial(
+            trial,
+            original_model_path,
+            transfer_strategy,
+            src_index.get(i),
+            src_weights[i].written,
+            src_models.get(i),
+        )
 
 
 @functools.singledispatch
@@ -154,48 +219,55 @@ def get_seed(*args: object) -> int:
     raise ValueError(args)
 
 
-@get_seed.register
-def _(path: pathlib.Path) -> int:
-    assert isinstance(path, pathlib.Path), type(path)
-
-    model = disk.load(path)
-    assert isinstance(model, dict), type(model)
-    assert "fastfood_seed" in model, model.keys()
+def _seed_from_metadata(metadata: experiments.ModelMetadata) -> int:
+    assert "fastfood_seed" in metadata, metadata.keys()
 
-    seed = model["fastfood_seed"]
+    seed = metadata["fastfood_seed"]
     assert isinstance(seed, int), type(seed)
 
     return seed
 
 
 @get_seed.register
-def _(exp: experiments.Experiment, trial: int) -> int:
-    return get_seed(exp.model_path(trial))
+def _(path: pathlib.Path) -> int:
+    assert isinstance(path, pathlib.Path), type(path)
 
+    return _seed_from_metadata(experiments.Experiment.read_model_metadata(path))
 
-def get_existing_seeds(exp: experiments.Experiment) -> Set[int]:
-    seeds = set()
-    for i, trial in enumerate(exp):
-        if not exp.model_exists(i):
-            continue
 
-        seeds.add(get_seed(exp, i))
+@get_seed.register
+def _(exp: experiments.Experiment, trial: int) -> int:
+    return _seed_from_metadata(exp.model_metadata(trial))
 
-    return seeds
+
+def get_existing_seeds(exp: experiments.Experiment) -> Set[int]:
+    """
+    Seeds of every model in exp, from the model index. Models that aren't indexed yet are loaded in parallel and indexed.
+    """
+    return {
+        _seed_from_metadata(metadata)
+        for metadata in exp.backfill_model_metadata().values()
+    }
 
 
 def add_unique_seed_trials(
-    src_exp: experiments.Experiment, dst_exp: experiments.Experiment
+    src_exp: experiments.Experiment,
+    dst_exp: experiments.Experiment,
+    transfer_strategy: transfer.Strategy = "copy",
 ) -> None:
     # Only keep trials with a seed that is not already in the experiment
     existing_seeds = get_existing_seeds(dst_exp)
+    # Sources are only read; the metadata is recorded in the destination's index when the trials are added.
+    src_index = src_exp.backfill_model_metadata(save=False)
+    src_weights = src_exp.trial_weights()
+    src_models = src_exp.model_digests()
 
     for i, src_trial in enumerate(src_exp):
         src_model_path = src_exp.model_path(i)
-        if not os.path.exists(src_model_path):
+        if i not in src_index:
             continue
 
-        src_seed = get_seed(src_model_path)
+        src_seed = _seed_from_metadata(src_index[i])
         if src_seed in existing_seeds:
             logging.debug(
                 "Skipping trial because seed already seen. [trial %d, seed: %d]",
@@ -205,13 +277,21 @@ def add_unique_seed_trials(
             continue
 
         del src_trial["instance"]
-        dst_exp.add_trial(src_trial, src_model_path)
+        dst_exp.add_trial(
+            src_trial,
+            src_model_path,
+            transfer_strategy,
+            src_index[i],
+            src_weights[i].written,
+            src_models.get(i),
+        )
 
 
 def merge_source_exp(
     src_exp: experiments.Experiment,
     dst_proj: projects.Project,
     conflict_strategy: ConflictStrategy,
+    transfer_strategy: transfer.Strategy = "copy",
 ) -> None:
     # experiment already exists in dst_proj
     dst_exp = experiments.Experiment.load(dst_proj.root, src_exp.hash)
@@ -227,34 +307,61 @@ def merge_source_exp(
         dst_proj,
     )
     original_model_path: Optional[pathlib.Path]
+    src_index = experiments.Experiment.load_model_index(src_exp.root, src_exp.hash)
 
     if conflict_strategy == "keep":
         # Keep all trials
+        src_weights = src_exp.trial_weights()
+        src_models = src_exp.model_digests()
         for i, src_trial in enumerate(src_exp):
             original_model_path = src_exp.model_path(i)
             if not os.path.exists(original_model_path):
                 original_model_path = None
             del src_trial["instance"]
-            dst_exp.add_trial(src_trial, original_model_path)
+            dst_exp.add_trial(
+                src_trial,
+                original_model_path,
+                transfer_strategy,
+                src_index.get(i),
+                src_weights[i].written,
+                src_models.get(i),
+            )
 
     elif conflict_strategy == "unique-seed":
-        add_unique_seed_trials(src_exp, dst_exp)
+        add_unique_seed_trials(src_exp, dst_exp, transfer_strategy)
     else:
         assert conflict_strategy in conflict_choices
         conflict_fn = conflict_choices[conflict_strategy]
+        src_weights = src_exp.trial_weights()
+        src_models = src_exp.model_digests()
+        dst_weights = dst_exp.trial_weights()
+        src_digests = _trial_digests(src_exp)
+        dst_digests = _trial_digests(dst_exp)
         for i, (src_trial, dst_trial) in enumerate(zip(src_exp, dst_exp)):
+            if i < len(src_digests) and i < len(dst_digests):
+                if src_digests[i] == dst_digests[i]:
+                    continue
             if src_trial == dst_trial:
                 continue
 
+            src = TrialVersion(src_trial, src_weights[i])
+            dst = TrialVersion(dst_trial, dst_weights[i])
             try:
-                if conflict_fn(src_trial, dst_trial):
+                if conflict_fn(src, dst):
                     logging.info(
                         f"Replacing trial {i} in experiment {dst_exp} from experiment {src_exp}."
                     )
                     original_model_path = src_exp.model_path(i)
                     if not os.path.exists(original_model_path):
                         original_model_path = None
-                    dst_exp.update_trial(src_trial, original_model_path)
+                    dst_exp.update_trial(
+                        src_trial,
+                        original_model_path,
+                        transfer_strategy,
+                        src_index.get(i),
+                        src_weights[i].written,
+                        src_models.get(i),
+                    )
                 else:
                     logging.info(
                         f"Keeping trial {i} in destination experiment {dst_exp}; ignoring trial {i} in source experiment {src_exp}."
@@ -265,21 +372,83 @@ def merge_source_exp(
                 raise RuntimeError(msg)
 
         if len(src_exp) > len(dst_exp):
-            add_extra_trials(src_exp, dst_exp)
+            add_extra_trials(src_exp, dst_exp, transfer_strategy)
+
+
+def _trial_digests(exp: experiments.Experiment) -> List[str]:
+    manifest = experiments.Experiment.load_manifest(exp.root, exp.hash)
+    return [] if manifest is None else manifest.trials
+
+
+def unchanged(src_root: pathlib.Path, dst_root: pathlib.Path, hash: str) -> bool:
+    src_manifest = experiments.Experiment.load_manifest(src_root, hash)
+    if src_manifest is None:
+        return False
+
+    return src_manifest == experiments.Experiment.load_manifest(dst_root, hash)
+
+
+def merge_source_hash(
+    src_root: pathlib.Path,
+    hash: str,
+    dst_proj: projects.Project,
+    conflict_strategy: ConflictStrategy,
+    transfer_strategy: transfer.Strategy = "copy",
+) -> None:
+    """
+    Loads, compares and writes a single source experiment. Experiments have unique hashes, so different hashes can be merged at the same time.
+
+    Experiments whose manifests match in both projects are already identical and are skipped without loading (except with 'keep', which always appends the source trials).
+    """
+    if conflict_strategy != "keep" and unchanged(src_root, dst_proj.root, hash):
+        logging.debug(
+            "Skipping experiment because it is unchanged. [source: %s, hash: %s]",
+            src_root,
+            hash,
+        )
+        return
+
+    try:
+        src_exp = experiments.Experiment.load(src_root, hash)
+    except experiments.Experiment.LoadError as err:
+        logging.warn(
+            "Skipping experiment because of a load error. [source: %s, hash: %s, file: %s]",
+            src_root,
+            hash,
+            err.file,
+        )
+        return
+
+    if not experiments.Experiment.exists(dst_proj.root, src_exp.hash):
+        add_experiment(src_exp, dst_proj, transfer_strategy)
+    else:
+        merge_source_exp(src_exp, dst_proj, conflict_strategy, transfer_strategy)
 
 
 def merge_source_proj(
     src_proj: projects.Project,
     dst_proj: projects.Project,
     conflict_strategy: ConflictStrategy,
+    transfer_strategy: transfer.Strategy = "copy",
+    max_workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
 ) -> None:
+    """
+    Merges every experiment in src_proj into dst_proj.
+
+    Each experiment is loaded inside a worker rather than up front, so loading, comparing and writing overlap, and at most max_workers + queue_size source experiments are in memory at once.
+    """
+    pool = parallel.BoundedExecutor(max_workers=max_workers, queue_size=queue_size)
     try:
-        pool = parallel.BoundedExecutor()
-        for src_exp in experiments.load_all(src_proj):
-            if not experiments.Experiment.exists(dst_proj.root, src_exp.hash):
-                pool.submit(add_experiment, src_exp, dst_proj)
-            else:
-                pool.submit(merge_source_exp,src_exp, dst_proj, conflict_strategy)
+        for hash in src_proj.hashes():
+            pool.submit(
+                merge_source_hash,
+                src_proj.root,
+                hash,
+                dst_proj,
+                conflict_strategy,
+                transfer_strategy,
+            )
         pool.finish()
     finally:
         pool.shutdown()
@@ -1,11 +1,16 @@
 import argparse
+import collections
 import copy
-from typing import Callable, Dict, Iterator
+import dataclasses
+import pathlib
+import typing
+from typing import Callable, Dict, List, Optional
 
 import preface
 
-from .. import experiments, types
-from .lib import logging, shared
+from .. import experiments, transfer, types
+from . import COMMANDS
+from .lib import logging, parallel, shared
 
 
 def _to_bool(val: str) -> bool:
@@ -129,14 +134,24 @@ def _add_change_parser(
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser = subparsers.add_parser(
-        "modify", help="Modify existing experiment config options"
-    )
+    parser = subparsers.add_parser("modify", help=COMMANDS["modify"])
     parser.add_argument(
         "--act",
         help="actually make the change. Otherwise, just show the modification that would be made.",
         action="store_true",
     )
+    parser.add_argument(
+        "--transfer",
+        help="How to move models to the modified experiment. The old experiment is deleted afterwards, so the default 'hardlink' avoids copying models on the same filesystem (and falls back to copying otherwise).",
+        choices=typing.get_args(transfer.Strategy),
+        default="hardlink",
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of experiments to rename at the same time. Defaults to min(32, CPUs + 4).",
+        type=int,
+        default=None,
+    )
 
     modify_subparsers = parser.add_subparsers(help="Available commands.")
 
@@ -154,18 +169,22 @@ def print_help(parser: argparse.ArgumentParser) -> int:
     return 1
 
 
-def load_experiments(args: argparse.Namespace) -> Iterator[experiments.Experiment]:
-    filter_fn, needs_trials = shared.make_experiment_fn(args.experiments)
-    return experiments.load_all(args.project, filter_fn, needs_trials)
-
-
 def _update_experiment(
     old_exp: experiments.Experiment,
     new_config: types.Config,
     conflict_strategy: ConflictStrategy,
+    transfer_strategy: transfer.Strategy = "copy",
 ) -> None:
-    # 1. create new experiment with new config
-    new_exp = experiments.Experiment.new(new_config, old_exp.root)
+    new_hash = experiments.Experiment.hash_from_config(new_config)
+    if new_hash == old_exp.hash:
+        return
+
+    if not experiments.Experiment.exists(old_exp.root, new_hash):
+        # No conflict: move the whole experiment at once.
+        old_exp.rekey(new_config)
+        return
+
+    new_exp = experiments.Experiment.load(old_exp.root, new_hash)
 
     if len(old_exp) == 0:  # No existing trials.
         old_exp.delete()
@@ -173,7 +192,7 @@ def _update_experiment(
 
     if len(new_exp) == 0:
         # New experiment has no existing trials. Copying is easy
-        copy_trials(old_exp, new_exp)
+        copy_trials(old_exp, new_exp, transfer_strategy)
         old_exp.delete()
         return
 
@@ -198,7 +217,7 @@ def _update_experiment(
         if len(old_exp) > len(new_exp):
             # Use old trials
             new_exp.delete_trials()
-            copy_trials(old_exp, new_exp)
+            copy_trials(old_exp, new_exp, transfer_strategy)
 
         old_exp.delete()
 
@@ -229,7 +248,7 @@ def _update_experiment(
             print("Using trials from after modification.")
         elif user_decision == "b":
             new_exp.delete_trials()
-            copy_trials(old_exp, new_exp)
+            copy_trials(old_exp, new_exp, transfer_strategy)
             print("Using trials from before modification.")
         else:
             raise RuntimeError()
@@ -244,7 +263,7 @@ def _update_experiment(
 
     elif conflict_strategy is ConflictStrategy.before:
         new_exp.delete_trials()
-        copy_trials(old_exp, new_exp)
+        copy_trials(old_exp, new_exp, transfer_strategy)
         print("Using trials from before modification.")
         old_exp.delete()
     elif conflict_strategy is ConflictStrategy.after:
@@ -257,8 +276,12 @@ def _update_experiment(
 
 
 def copy_trials(
-    old_exp: experiments.Experiment, new_exp: experiments.Experiment
+    old_exp: experiments.Experiment,
+    new_exp: experiments.Experiment,
+    transfer_strategy: transfer.Strategy = "copy",
 ) -> None:
+    model_digests = old_exp.model_digests()
+
     for i, trial in enumerate(old_exp):
         assert trial["instance"] == i
 
@@ -266,104 +289,185 @@ def copy_trials(
         if old_exp.model_exists(i):
             model_path = old_exp.model_path(i)
 
-        new_exp.add_trial(trial, model_path)
+        new_exp.add_trial(
+            trial, model_path, transfer_strategy, model_digest=model_digests.get(i)
+        )
+
+
+ChangeFn = Callable[[experiments.Experiment], Optional[types.Config]]
+
+
+@dataclasses.dataclass
+class Move:
+    old_hash: str
+    new_hash: str
+    new_config: types.Config
+
+
+@dataclasses.dataclass
+class Plan:
+    """
+    Every change a modify command makes, computed from configs alone before anything is written.
+    """
+
+    # Moves to hashes that don't exist and that no other move targets. These are independent renames.
+    renames: List[Move] = dataclasses.field(default_factory=list)
+    # Moves to hashes that already exist (or that several experiments move to). These need conflict resolution.
+    conflicts: List[Move] = dataclasses.field(default_factory=list)
+    # Experiments that match the filter but aren't changed.
+    unchanged: int = 0
+
+    def __str__(self) -> str:
+        return f"{len(self.renames)} renames, {len(self.conflicts)} conflicts, {self.unchanged} unchanged"
+
+
+def make_plan(args: argparse.Namespace, change_fn: ChangeFn) -> Plan:
+    """
+    Computes the plan in a single pass. Unless the filter looks at trials, only configs are loaded.
+    """
+    filter_fn, needs_trials = shared.make_experiment_fn(args.experiments)
+    existing = set(args.project.hashes())
+
+    if needs_trials:
+        exps = experiments.load_all(args.project, filter_fn)
+    else:
+        exps = experiments.load_configs(args.project, filter_fn)
+
+    moves = []
+    plan = Plan()
+    for exp in exps:
+        new_config = change_fn(exp)
+        if new_config is None:
+            plan.unchanged += 1
+            continue
+
+        new_hash = experiments.Experiment.hash_from_config(new_config)
+        if new_hash == exp.hash:
+            plan.unchanged += 1
+            continue
+
+        moves.append(Move(exp.hash, new_hash, new_config))
+
+    targets = collections.Counter(move.new_hash for move in moves)
+    for move in moves:
+        if move.new_hash in existing or targets[move.new_hash] > 1:
+            plan.conflicts.append(move)
+        else:
+            plan.renames.append(move)
+
+    return plan
+
+
+def _rename(root: pathlib.Path, move: Move) -> None:
+    experiments.Experiment.rename(root, move.old_hash, move.new_config)
+
+
+def execute_plan(args: argparse.Namespace, plan: Plan) -> None:
+    root = args.project.root
+
+    # Renames touch disjoint directories, so they run in parallel.
+    pool = parallel.BoundedExecutor(max_workers=args.workers)
+    try:
+        for move in plan.renames:
+            pool.submit(_rename, root, move)
+        pool.finish()
+    finally:
+        pool.shutdown()
+
+    # Conflicts can involve the same destination, so they run one at a time.
+    for move in plan.conflicts:
+        _update_experiment(
+            experiments.Experiment.load(root, move.old_hash),
+            move.new_config,
+            ConflictStrategy.new(args.conflicts),
+            args.transfer,
+        )
+
+
+def modify(args: argparse.Namespace, change_fn: ChangeFn, description: str) -> int:
+    plan = make_plan(args, change_fn)
+
+    for move in plan.renames + plan.conflicts:
+        logging.debug("Planned move. [from: %s, to: %s]", move.old_hash, move.new_hash)
+
+    if not args.act:
+        logging.info(
+            f"Would {description}: {plan}. Use --act to make the change (conflicts resolved with '{args.conflicts}')."
+        )
+        return 0
+
+    execute_plan(args, plan)
+    logging.info(f"Finished: {description}: {plan}.")
+
+    return 0
 
 
 def do_add(args: argparse.Namespace) -> int:
     default_value = TYPE_MAP[args.type](args.value)
 
-    for old_experiment in load_experiments(args):
-        new_config = copy.deepcopy(old_experiment.config)
-        if preface.dict.contains(new_config, args.field):
+    def change_fn(old_experiment: experiments.Experiment) -> Optional[types.Config]:
+        if preface.dict.contains(old_experiment.config, args.field):
             logging.debug(
-                f"Not setting field '{args.field}' in experiment '{old_experiment}' because it already has value {preface.dict.get(new_config, args.field)}."
+                f"Not setting field '{args.field}' in experiment '{old_experiment}' because it already has value {preface.dict.get(old_experiment.config, args.field)}."
             )
-            continue
+            return None
 
+        new_config = copy.deepcopy(old_experiment.config)
         preface.dict.set(new_config, args.field, default_value)
+        return new_config
 
-        if args.act:
-            _update_experiment(
-                old_experiment, new_config, ConflictStrategy.new(args.conflicts)
-            )
-        else:
-            logging.info(
-                f"1. Add '{args.field}: {default_value}' ({type(default_value)}) to experiment {old_experiment}'s config. \n2. Re-hash the experiment and write to disk.\n3. Delete the old experiment."
-            )
-
-    return 0
+    return modify(
+        args,
+        change_fn,
+        f"add '{args.field}: {default_value}' ({type(default_value)})",
+    )
 
 
 def do_rename(args: argparse.Namespace) -> int:
-    for old_experiment in load_experiments(args):
-        # Remove and add the field from configurations.
-        new_config = copy.deepcopy(old_experiment.config)
-        if not preface.dict.contains(new_config, args.old_field):
+    def change_fn(old_experiment: experiments.Experiment) -> Optional[types.Config]:
+        if not preface.dict.contains(old_experiment.config, args.old_field):
             logging.debug(
                 f"Not renaming missing field '{args.old_field}' in experiment '{old_experiment}'."
             )
-            continue
+            return None
 
+        # Remove and add the field from configurations.
+        new_config = copy.deepcopy(old_experiment.config)
         value = preface.dict.get(new_config, args.old_field)
         preface.dict.delete(new_config, args.old_field)
         preface.dict.set(new_config, args.new_field, value)
+        return new_config
 
-        if args.act:
-            _update_experiment(
-                old_experiment, new_config, ConflictStrategy.new(args.conflicts)
-            )
-        else:
-            logging.info(
-                f"1. Rename '{args.old_field}' from experiment {old_experiment}'s config to '{args.new_field}'. \n2. Re-hash the experiment and write to disk.\n3. Delete the old experiment."
-            )
-
-    return 0
+    return modify(args, change_fn, f"rename '{args.old_field}' to '{args.new_field}'")
 
 
 def do_remove(args: argparse.Namespace) -> int:
-    for old_experiment in load_experiments(args):
-        # Remove the field from configurations.
-        new_config = copy.deepcopy(old_experiment.config)
-        if not preface.dict.contains(new_config, args.field):
+    def change_fn(old_experiment: experiments.Experiment) -> Optional[types.Config]:
+        if not preface.dict.contains(old_experiment.config, args.field):
             logging.debug(
                 f"Not removing missing field '{args.field}' from experiment '{old_experiment}'."
             )
-            continue
+            return None
 
+        new_config = copy.deepcopy(old_experiment.config)
         preface.dict.delete(new_config, args.field)
+        return new_config
 
-        if args.act:
-            _update_experiment(
-                old_experiment, new_config, ConflictStrategy.new(args.conflicts)
-            )
-        else:
-            logging.info(
-                f"1. Remove '{args.field}' from experiment {old_experiment}'s config. \n2. Re-hash the experiment and write to disk.\n3. Delete the old experiment."
-            )
-
-    return 0
+    return modify(args, change_fn, f"remove '{args.field}'")
 
 
 def do_change(args: argparse.Namespace) -> int:
     new_value = TYPE_MAP[args.type](args.value)
 
-    for old_experiment in load_experiments(args):
-        new_config = copy.deepcopy(old_experiment.config)
-        if not preface.dict.contains(new_config, args.field):
+    def change_fn(old_experiment: experiments.Experiment) -> Optional[types.Config]:
+        if not preface.dict.contains(old_experiment.config, args.field):
             logging.debug(
                 f"Not updating field '{args.field}' in experiment '{old_experiment}' because it does not yet have a value."
             )
-            continue
+            return None
 
+        new_config = copy.deepcopy(old_experiment.config)
         preface.dict.set(new_config, args.field, new_value)
+        return new_config
 
-        if args.act:
-            _update_experiment(
-                old_experiment, new_config, ConflictStrategy.new(args.conflicts)
-            )
-        else:
-            logging.info(
-                f"1. Set '{args.field}: {new_value}' in experiment {old_experiment}'s config. \n2. Re-hash the experiment and write to disk.\n3. Delete the old experiment."
-            )
-
-    return 0
+    return modify(args, change_fn, f"set '{args.field}: {new_value}'")
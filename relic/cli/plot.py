@@ -1,18 +1,28 @@
 import argparse
+import hashlib
+import os
+import pathlib
+import shutil
+from typing import Dict, List, Optional, Tuple
 
-from .. import experiments
-from .lib import shared
+from .. import __version__, experiments, json
+from . import COMMANDS
+from .lib import logging, shared
 
 
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser = subparsers.add_parser("plot", help="Plot results.")
+    parser = subparsers.add_parser("plot", help=COMMANDS["plot"])
 
     parser = shared.add_filter_options(parser)
 
     parser.add_argument(
-        "-y", "--y-axis", help="Metric to plot on the y-axis.", required=True
+        "-y",
+        "--y-axis",
+        nargs="+",
+        help="Metrics to plot on the y-axis. Several metrics are drawn as a grid of subplots from a single load of the project.",
+        required=True,
     )
     parser.add_argument(
         "-x", "--x-axis", help="Metric to plot on the x-axis.", required=True
@@ -36,10 +46,126 @@ def add_parser(
         choices=list(shared.AGGREGATOR_MAP.keys()),
     )
     parser.add_argument("--title", help="Plot title.", default=None)
+    parser.add_argument(
+        "--out",
+        help="Write the plot to this file (for example, plot.png or plot.svg) instead of showing it. Works without a display. Use {metric} in the name (plots/{metric}.png) to write one file per metric.",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Always render the plot, even if the same plot of the same experiments was already rendered.",
+        action="store_true",
+    )
     parser.set_defaults(func=do_plot)
 
 
+# Older plots are removed once the cache holds more than this many. relic gc removes all of them.
+MAX_CACHED_PLOTS = 256
+
+
+def cache_dir(project_root: pathlib.Path) -> pathlib.Path:
+    return project_root / ".cache" / "plots"
+
+
+def prune_cache(directory: pathlib.Path, keep: int = MAX_CACHED_PLOTS) -> int:
+    """
+    Removes the least recently used plots until at most keep are left. Returns how many were removed.
+    """
+    plots = []
+    for path in directory.iterdir():
+        try:
+            plots.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            # Removed by another render.
+            continue
+
+    plots.sort(reverse=True)
+    removed = 0
+    for _, path in plots[keep:]:
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            continue
+
+    return removed
+
+
+def cache_key(
+    args: argparse.Namespace,
+    metrics: List[str],
+    suffix: str,
+    data: Dict[str, experiments.Fingerprint],
+) -> str:
+    """
+    Identifies a rendered plot: the query (every option that changes the image), the fingerprint of every experiment (data; see experiments.fingerprints) and the relic version.
+    """
+    query = {
+        "experiments": args.experiments,
+        "y": metrics,
+        "x": args.x_axis,
+        "control_for": args.control_for,
+        "trial_aggregator": args.trial_aggregator,
+        "experiment_aggregator": args.experiment_aggregator,
+        "title": args.title,
+        "suffix": suffix,
+    }
+
+    key = json.dumpb({"query": query, "data": data, "version": __version__})
+    return hashlib.sha1(key).hexdigest()
+
+
+def outputs(args: argparse.Namespace) -> List[Tuple[List[str], Optional[str]]]:
+    """
+    The metrics in each figure and the file it is written to (None to show it). If --out contains {metric}, every metric gets its own file; otherwise all metrics share one figure.
+    """
+    if args.out is not None and "{metric}" in args.out:
+        return [([metric], args.out.format(metric=metric)) for metric in args.y_axis]
+
+    return [(args.y_axis, args.out)]
+
+
+def _save_to_cache(out: str, cached: pathlib.Path) -> None:
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    # Copy to a temporary name first, so that concurrent renders never see a partial file.
+    tmp = cached.with_name(f".{cached.name}.{os.getpid()}.tmp")
+    shutil.copyfile(out, tmp)
+    os.replace(tmp, cached)
+    prune_cache(cached.parent)
+
+
 def do_plot(args: argparse.Namespace) -> int:
+    # (metrics, out, cache file) for every figure that needs to be rendered.
+    pending: List[Tuple[List[str], Optional[str], Optional[pathlib.Path]]] = []
+
+    data = None
+    for metrics, out in outputs(args):
+        if out is None or args.no_cache:
+            pending.append((metrics, out, None))
+            continue
+
+        if data is None:
+            # Only stats files, and is shared by every output.
+            data = experiments.fingerprints(args.project)
+
+        suffix = pathlib.Path(out).suffix
+        # args.project.root is the current version directory (relics/vN).
+        cached = cache_dir(args.project.root.parent) / (
+            cache_key(args, metrics, suffix, data) + suffix
+        )
+        if cached.is_file():
+            shutil.copyfile(cached, out)
+            # Marks it as recently used, so prune_cache keeps it.
+            os.utime(cached)
+            logging.info("Used cached plot. [out: %s]", out)
+            continue
+
+        pending.append((metrics, out, cached))
+
+    if not pending:
+        return 0
+
+    # Every figure is drawn from a single load.
     filter_fn, needs_trials = shared.make_experiment_fn(args.experiments)
 
     exps = list(experiments.load_all(args.project, filter_fn, needs_trials))
@@ -47,16 +173,33 @@ def do_plot(args: argparse.Namespace) -> int:
     # filter experiments with 0 trials
     exps = [e for e in exps if len(e) > 0]
 
-    # Only import plotting if we need it.
+    # Only import plotting (numpy, and matplotlib once rendering) if we need it.
     from .. import plotting
 
-    plotting.plot(
-        exps,
-        args.y_axis,
-        with_respect_to=args.x_axis,
-        controlling_for=args.control_for,
-        aggregating_with=shared.AGGREGATOR_MAP[args.experiment_aggregator],
-        title=args.title,
-    )
+    # Grouping and differences don't depend on the metric, so they are computed once.
+    experiment_series = plotting.make_experiment_series(exps, args.control_for)
+    plotting.print_differences(experiment_series, args.x_axis)
+
+    series: Dict[str, Dict[plotting.Key, plotting.Series]] = {}
+    for metrics, out, cache_file in pending:
+        for metric in metrics:
+            if metric not in series:
+                series[metric] = plotting.compute_series(
+                    experiment_series,
+                    metric,
+                    args.x_axis,
+                    aggregating_with=shared.AGGREGATOR_MAP[args.experiment_aggregator],
+                    trial_aggregating_with=shared.AGGREGATOR_MAP[args.trial_aggregator],
+                )
+
+        plotting.render(
+            {metric: series[metric] for metric in metrics},
+            args.x_axis,
+            title=args.title,
+            out=out,
+        )
+
+        if out is not None and cache_file is not None:
+            _save_to_cache(out, cache_file)
 
-    return 1
+    return 0
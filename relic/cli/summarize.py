@@ -0,0 +1,27 @@
+import argparse
+
+from .. import experiments
+from . import COMMANDS
+from .lib import logging
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "summarize",
+        help=COMMANDS["summarize"],
+    )
+    parser.set_defaults(func=do_summarize)
+
+
+def do_summarize(args: argparse.Namespace) -> int:
+    count = 0
+    for exp in experiments.load_all(args.project):
+        exp.save_summary()
+        exp.save_manifest()
+        count += 1
+
+    logging.info("Rebuilt summaries and manifests. [experiments: %s]", count)
+
+    return 0
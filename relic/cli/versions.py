@@ -1,10 +1,12 @@
 import argparse
 
+from . import COMMANDS
+
 
 def add_parser(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
-    parser = subparsers.add_parser("versions", help="Manage your project versions")
+    parser = subparsers.add_parser("versions", help=COMMANDS["versions"])
     parser.add_argument(
         "--new",
         help="Move to a new version (as a result of a bug fix)",
@@ -2,17 +2,39 @@
 This module provides some basic ways to save experiments efficiently, using torch when possible and JSON when not.
 
 Right now it only uses torch in the interest of time. In the future, if torch is not available, relic should default to using JSON.
+
+torch is imported the first time a file is read or written (see import_torch()), because importing it takes seconds and most relic commands never touch a trial file.
 """
 
+import functools
+import hashlib
+import io
 import pickle
-from typing import Any
-
-import torch
+import shutil
+from typing import TYPE_CHECKING, Any
 
 from . import types
 
+if TYPE_CHECKING:
+    import torch
+
+
+@functools.lru_cache(maxsize=None)
+def import_torch() -> Any:
+    """
+    Imports torch (once) and returns it.
+    """
+    import torch
+    import torch.multiprocessing
+
+    # Trials with tensors are sent between processes by experiments.load_all. Every process that reads trials goes through here first.
+    # https://discuss.pytorch.org/t/received-0-items-of-ancdata-pytorch-0-4-0/19823
+    torch.multiprocessing.set_sharing_strategy("file_system")  # type: ignore
+
+    return torch
+
 
-def move(obj: types.T, device: torch.device) -> types.T:
+def move(obj: types.T, device: "torch.device") -> types.T:
     if isinstance(obj, list):
         return [move(t, device) for t in obj]  # type: ignore
 
@@ -28,11 +50,62 @@ def move(obj: types.T, device: torch.device) -> types.T:
     return obj
 
 
-def dump(file: types.Path, obj: object) -> None:
+def dumpb(obj: object) -> bytes:
+    torch = import_torch()
+    buffer = io.BytesIO()
     torch.save(
-        move(obj, torch.device("cpu")), file, pickle_protocol=pickle.HIGHEST_PROTOCOL
+        move(obj, torch.device("cpu")), buffer, pickle_protocol=pickle.HIGHEST_PROTOCOL
     )
+    return buffer.getvalue()
+
+
+def dump(file: types.Path, obj: object) -> str:
+    """
+    Saves obj to file and returns a digest of the written bytes.
+
+    The bytes only depend on obj (not on the file name), so equal objects have equal digests.
+    """
+    data = dumpb(obj)
+    with open(file, "wb") as fd:
+        fd.write(data)
+    return hashlib.sha1(data).hexdigest()
+
+
+def copy_with_digest(
+    src: types.Path, dst: types.Path, chunk_size: int = 1 << 20
+) -> str:
+    """
+    Copies src to dst and returns src's digest (see digest()), reading src only once.
+    """
+    sha = hashlib.sha1()
+    with open(src, "rb") as src_fd, open(dst, "wb") as dst_fd:
+        for chunk in iter(lambda: src_fd.read(chunk_size), b""):
+            sha.update(chunk)
+            dst_fd.write(chunk)
+    shutil.copystat(src, dst)
+    return sha.hexdigest()
+
+
+def digest(file: types.Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Digest of a (possibly very large) file, read chunk_size bytes at a time.
+    """
+    sha = hashlib.sha1()
+    with open(file, "rb") as fd:
+        for chunk in iter(lambda: fd.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
 
 
-def load(file: types.Path) -> Any:
-    return torch.load(file, map_location=torch.device("cpu"))  # type: ignore
+def load(file: types.Path, mmap: bool = False) -> Any:
+    """
+    Loads an object saved with dump(). With mmap, tensors are memory-mapped instead of read, so reading a few small values from a large model only reads those parts of the file (files in torch's older, non-zip format are read fully).
+    """
+    torch = import_torch()
+    if mmap:
+        try:
+            return torch.load(file, map_location=torch.device("cpu"), mmap=True)
+        except RuntimeError:
+            # Not a zip file, so it can't be memory-mapped.
+            pass
+    return torch.load(file, map_location=torch.device("cpu"))
@@ -0,0 +1,244 @@
+"""
+Ways for experiments.load_all to run many small loads at once.
+
+* process: a multiprocessing.Pool. Unpickling trials is CPU-bound, so processes are fastest for large projects, but starting the pool and pickling every result back to the parent has a fixed cost.
+* thread: a thread pool. No pickling, and waiting on slow (network) filesystems overlaps, but decoding is limited by the GIL.
+* asyncio: an event loop that runs each load in the default thread pool, with at most `limit` loads in flight (an asyncio.Semaphore). It can't be used from inside a running event loop (for example, in a Jupyter notebook).
+* inline: no concurrency at all, which is fastest for a handful of experiments.
+* auto: picks one of the above with choose().
+
+Pools keeps executors open between loads (see relic.Session), so that repeated loads don't start a new pool every time.
+
+The number of workers comes from the workers argument, then the RELIC_WORKERS environment variable, then the number of CPUs this process may run on. When no chunksize is given, the process engine tunes it from the latency of the first few items (see tune_chunksize()).
+"""
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+Engine = Literal["auto", "process", "thread", "asyncio", "inline"]
+ENGINES: Tuple[Engine, ...] = ("auto", "process", "thread", "asyncio", "inline")
+
+# Below this many experiments, starting any pool costs more than loading them one by one (see scripts/bench-load.py).
+INLINE_LIMIT = 64
+# Below this many experiments (with trials), threads beat forking and pickling.
+THREAD_LIMIT = 256
+
+WORKERS_VAR = "RELIC_WORKERS"
+
+# Items loaded in the parent to measure latency before the process pool gets the rest.
+SAMPLE_SIZE = 4
+# Chunks should take about this long, so that sending a chunk to a worker (and its results back) is a small part of the work.
+TARGET_CHUNK_SECONDS = 0.05
+# ...but every worker should get at least this many chunks, so that a slow chunk doesn't leave the other workers idle at the end.
+CHUNKS_PER_WORKER = 4
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may run on, which can be fewer than the machine has (taskset, cgroups on shared login nodes).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def configured_workers(workers: Optional[int] = None) -> Optional[int]:
+    """
+    workers if it is given, otherwise RELIC_WORKERS if it is set.
+    """
+    if workers is not None:
+        if workers < 1:
+            raise ValueError(f"Need at least one worker, not {workers}!")
+        return workers
+
+    value = os.environ.get(WORKERS_VAR)
+    if not value:
+        return None
+
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+
+    if workers < 1:
+        raise ValueError(f"{WORKERS_VAR} must be a positive integer, not '{value}'!")
+
+    return workers
+
+
+def tune_chunksize(latency: float, count: int, workers: int) -> int:
+    """
+    Chunk size for count items that take latency seconds each, split between workers.
+    """
+    by_latency = int(TARGET_CHUNK_SECONDS / max(latency, 1e-6))
+    by_balance = count // (workers * CHUNKS_PER_WORKER)
+    return max(1, min(by_latency, by_balance))
+
+
+class Executor:
+    """
+    Runs fn(*args) for every args, and returns the results in order.
+    """
+
+    def starmap(
+        self,
+        fn: Callable[..., Any],
+        iterable: Iterable[Sequence[Any]],
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Executor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class InlineExecutor(Executor):
+    def starmap(
+        self,
+        fn: Callable[..., Any],
+        iterable: Iterable[Sequence[Any]],
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        return [fn(*args) for args in iterable]
+
+
+class ProcessExecutor(Executor):
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or available_cpus()
+        # Can't use context manager (with pool as ...) because of this issue with pytest coverage:
+        # https://pytest-cov.readthedocs.io/en/latest/subprocess-support.html#if-you-use-multiprocessing-pool
+        self._pool = multiprocessing.Pool(self.workers)
+        # The last tuned chunk size, for logging and tests.
+        self.chunksize: Optional[int] = None
+
+    def starmap(
+        self,
+        fn: Callable[..., Any],
+        iterable: Iterable[Sequence[Any]],
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        if chunksize is not None:
+            return self._pool.starmap(fn, iterable, chunksize=chunksize)
+
+        # Load a few items here to measure how long one takes. They aren't wasted: their results come first.
+        items = list(iterable)
+        sample, rest = items[:SAMPLE_SIZE], items[SAMPLE_SIZE:]
+
+        start = time.perf_counter()
+        results = [fn(*args) for args in sample]
+        latency = (time.perf_counter() - start) / max(len(sample), 1)
+
+        self.chunksize = tune_chunksize(latency, len(rest), self.workers)
+        return results + self._pool.starmap(fn, rest, chunksize=self.chunksize)
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+
+class ThreadExecutor(Executor):
+    def __init__(self, workers: Optional[int] = None):
+        self._pool = concurrent.futures.ThreadPoolExecutor(workers)
+
+    def starmap(
+        self,
+        fn: Callable[..., Any],
+        iterable: Iterable[Sequence[Any]],
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        return list(self._pool.map(lambda args: fn(*args), iterable))
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+
+class AsyncioExecutor(Executor):
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or 64
+
+    async def _gather(
+        self, fn: Callable[..., Any], iterable: Iterable[Sequence[Any]]
+    ) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.limit)
+
+        async def run(args: Sequence[Any]) -> Any:
+            async with semaphore:
+                return await loop.run_in_executor(None, fn, *args)
+
+        return await asyncio.gather(*(run(args) for args in iterable))
+
+    def starmap(
+        self,
+        fn: Callable[..., Any],
+        iterable: Iterable[Sequence[Any]],
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        return asyncio.run(self._gather(fn, iterable))
+
+
+def choose(count: int, load_trials: bool, workers: Optional[int] = None) -> Engine:
+    """
+    Picks an engine for loading count experiments with (at most) workers workers. Trials are pickles that are CPU-bound to decode, so large loads with trials use processes. Configs and summaries are small, so loads without trials use threads.
+    """
+    if workers is None:
+        workers = available_cpus()
+
+    if count <= INLINE_LIMIT or workers <= 1:
+        return "inline"
+
+    if not load_trials or count <= THREAD_LIMIT:
+        return "thread"
+
+    return "process"
+
+
+def create(engine: Engine, workers: Optional[int] = None) -> Executor:
+    if engine == "process":
+        return ProcessExecutor(workers)
+    elif engine == "thread":
+        return ThreadExecutor(workers)
+    elif engine == "asyncio":
+        return AsyncioExecutor(workers)
+    elif engine == "inline":
+        return InlineExecutor()
+    else:
+        raise ValueError(f"Engine '{engine}' is not supported!")
+
+
+class Pools:
+    """
+    One executor per engine, each created on first use and kept open until close(). Executors can't be closed one at a time, only all together.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = configured_workers(workers)
+        self._executors: Dict[Engine, Executor] = {}
+
+    def get(self, engine: Engine) -> Executor:
+        if engine not in self._executors:
+            self._executors[engine] = create(engine, self.workers)
+        return self._executors[engine]
+
+    def __contains__(self, engine: Engine) -> bool:
+        return engine in self._executors
+
+    def close(self) -> None:
+        while self._executors:
+            _, executor = self._executors.popitem()
+            executor.close()
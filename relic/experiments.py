@@ -1,22 +1,42 @@
+import concurrent.futures
 import dataclasses
 import hashlib
 import logging
-import multiprocessing
-import re
+import math
 import os
 import pathlib
-import shutil
-from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, overload
+import re
+import statistics
+import sys
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
 import preface
-import torch
 
-from . import disk, json, projects, types
+from . import disk, executors, json, objects, projects, transfer, trash, types
 
 logger = logging.getLogger(__name__)
 
-# https://discuss.pytorch.org/t/received-0-items-of-ancdata-pytorch-0-4-0/19823
-torch.multiprocessing.set_sharing_strategy("file_system")  # type: ignore
+# Small values that are copied out of model files (usually dicts) into <hash>/model-index, so they can be read without loading the model.
+MODEL_METADATA_KEYS = ("fastfood_seed",)
+ModelMetadata = Dict[str, Any]
+
+
+def _is_tensor(obj: object) -> bool:
+    # If torch was never imported, nothing can be a tensor (see disk.import_torch()).
+    torch = sys.modules.get("torch")
+    return torch is not None and isinstance(obj, torch.Tensor)
 
 
 class Trial(Dict[str, Any]):
@@ -31,8 +51,8 @@ class Trial(Dict[str, Any]):
             if key not in o:
                 return False
 
-            if isinstance(self[key], torch.Tensor) and isinstance(o[key], torch.Tensor):
-                if not torch.equal(self[key], o[key]):
+            if _is_tensor(self[key]) and _is_tensor(o[key]):
+                if not sys.modules["torch"].equal(self[key], o[key]):
                     return False
 
             elif self[key] != o[key]:
@@ -50,12 +70,161 @@ class Trial(Dict[str, Any]):
         return instance
 
 
+@dataclasses.dataclass
+class MetricSummary:
+    """
+    Running statistics for one scalar metric over every trial in an experiment.
+    """
+
+    count: int = 0
+    sum: float = 0
+    min: float = math.inf
+    max: float = -math.inf
+    last: float = 0
+    # Running mean and sum of squared differences from it (Welford's algorithm), which stay accurate when values share a large offset.
+    running_mean: float = 0
+    m2: float = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last = value
+
+        delta = value - self.running_mean
+        self.running_mean += delta / self.count
+        self.m2 += delta * (value - self.running_mean)
+
+    @property
+    def mean(self) -> float:
+        if self.count < 1:
+            raise statistics.StatisticsError("mean requires at least one data point")
+        return self.sum / self.count
+
+    @property
+    def stdev(self) -> float:
+        # Sample standard deviation, like statistics.stdev.
+        if self.count < 2:
+            raise statistics.StatisticsError("stdev requires at least two data points")
+        return math.sqrt(max(self.m2 / (self.count - 1), 0.0))
+
+
+@dataclasses.dataclass
+class Summary:
+    """
+    A small sidecar (<hash>/summary) that is rewritten whenever trials are saved, so that tools like `relic ls` can show aggregates without loading any trial files.
+    """
+
+    trials: int = 0
+    # Every (flattened) key in any trial.
+    keys: List[str] = dataclasses.field(default_factory=list)
+    # Only (flattened) keys whose values are numbers.
+    metrics: Dict[str, MetricSummary] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_trials(cls, trials: Sequence[Trial]) -> "Summary":
+        keys = set()
+        metrics: Dict[str, MetricSummary] = {}
+        for trial in trials:
+            for key, value in preface.dict.flattened(trial).items():
+                keys.add(key)
+                if key == "instance" or isinstance(value, bool):
+                    continue
+                if not isinstance(value, (int, float)):
+                    continue
+                if not math.isfinite(value):
+                    # JSON can't store NaN or inf. The metric's count falls short of the number of trials, so readers load the trials instead.
+                    continue
+                metrics.setdefault(key, MetricSummary()).add(value)
+
+        return cls(len(trials), sorted(keys), metrics)
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "Summary":
+        metrics = {}
+        for key, value in obj["metrics"].items():
+            # Written before non-finite values were skipped; NaN became null.
+            if None in value.values():
+                continue
+            metrics[key] = MetricSummary(**value)
+
+        return cls(obj["trials"], obj["keys"], metrics)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+@dataclasses.dataclass
+class TrialWeight:
+    """
+    Cheap facts about a trial, recorded whenever it is written, so that merge conflicts can be resolved without comparing trial bodies.
+    """
+
+    # Serialized size in bytes.
+    size: int = 0
+    # Number of (flattened) keys.
+    keys: int = 0
+    # Length of the longest list in the trial (for example, one loss per step).
+    step: int = 0
+    # Unix time of the last write that changed the trial.
+    written: float = 0.0
+
+    @classmethod
+    def from_trial(cls, trial: Trial, size: int, written: float) -> "TrialWeight":
+        lengths = [len(v) for v in trial.values() if isinstance(v, (list, tuple))]
+        return cls(
+            size, len(preface.dict.flattened(trial)), max(lengths, default=0), written
+        )
+
+
+@dataclasses.dataclass
+class Manifest:
+    """
+    Content digests for an experiment (<hash>/manifest), rewritten whenever trials are saved. Two experiments with equal manifests have the same config, trials and models, so `relic merge` can skip them without loading anything.
+    """
+
+    # The experiment hash, which is already a digest of the config.
+    config: str = ""
+    # Digest of each trial's serialized bytes.
+    trials: List[str] = dataclasses.field(default_factory=list)
+    # Digest of each trial's model file (None if the trial has no model).
+    models: List[Optional[str]] = dataclasses.field(default_factory=list)
+    # Weight of each trial. Not part of the content (timestamps differ between copies).
+    weights: List[TrialWeight] = dataclasses.field(default_factory=list, compare=False)
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "Manifest":
+        return cls(
+            obj["config"],
+            obj["trials"],
+            obj["models"],
+            [TrialWeight(**weight) for weight in obj.get("weights", [])],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
 @dataclasses.dataclass
 class Experiment:
     root: pathlib.Path
     hash: str
     config: types.Config
     trials: List[Trial]
+    summary: Optional[Summary] = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
+    # Experiments loaded with load_trials=False only have their config and summary.
+    trials_loaded: bool = dataclasses.field(default=True, compare=False, repr=False)
+    # Digests of models copied in since the last save; see save_manifest().
+    _model_digests: Dict[int, str] = dataclasses.field(
+        default_factory=dict, init=False, compare=False, repr=False
+    )
+    # Write times of trials copied in since the last save (for example, by merge); see save_manifest().
+    _written: Dict[int, float] = dataclasses.field(
+        default_factory=dict, init=False, compare=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         for i, trial in enumerate(self.trials):
@@ -90,12 +259,22 @@ class Experiment:
             return self.message
 
     @classmethod
-    def load(cls, root: pathlib.Path, hash: str) -> "Experiment":
+    def load(
+        cls, root: pathlib.Path, hash: str, load_trials: bool = True
+    ) -> "Experiment":
+        """
+        Loads an experiment from disk. With load_trials=False, only the config and summary are read; experiments without a summary (written by older versions of relic) are loaded fully.
+        """
         try:
             config = disk.load(cls.config_path(root, hash))
         except (EOFError, FileNotFoundError, RuntimeError) as err:
             raise cls.LoadError(err, cls.config_path(root, hash))
 
+        if not load_trials:
+            summary = cls.load_summary(root, hash)
+            if summary is not None:
+                return cls(root, hash, config, [], summary, trials_loaded=False)
+
         trials: List[Trial] = []
 
         pattern = re.compile(str(cls.trial_dir(root, hash) / r"(\d+)\.trial"))
@@ -124,15 +303,319 @@ class Experiment:
         # Save config
         disk.dump(self.config_path(self.root, self.hash), self.config)
 
+        # Rewriting the trials changes their modification times, which experiments without a manifest still need.
+        previous = self._previous_manifest()
+
         # Save trials
         self.trial_dir(self.root, self.hash).mkdir(parents=False, exist_ok=True)
-        for trial in self.trials:
+        trial_digests = [
             disk.dump(self.trial_path(self.root, self.hash, trial.instance), trial)
+            for trial in self.trials
+        ]
+
+        self.save_summary()
+        self.save_manifest(trial_digests, previous)
+
+    def save_summary(self) -> None:
+        assert self.trials_loaded, "Can't summarize an experiment without its trials!"
+
+        self.summary = Summary.from_trials(self.trials)
+        json.dump(self.summary_path(self.root, self.hash), self.summary.to_dict())
+
+    @classmethod
+    def load_summary(cls, root: pathlib.Path, hash: str) -> Optional[Summary]:
+        try:
+            return Summary.from_dict(json.load(cls.summary_path(root, hash)))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def save_manifest(
+        self,
+        trial_digests: Optional[List[str]] = None,
+        previous: Optional[Manifest] = None,
+    ) -> None:
+        """
+        Writes the experiment's manifest. trial_digests are the digests returned by disk.dump while saving; without them, trials are serialized again to compute their digests. previous is the manifest from before the trials were saved (see _previous_manifest()).
+
+        Model files can be large, so a model's digest is only computed when it is copied in (or missing from the previous manifest), not on every save.
+        """
+        assert self.trials_loaded, "Can't digest an experiment without its trials!"
+
+        if trial_digests is None:
+            trial_digests = [
+                hashlib.sha1(disk.dumpb(trial)).hexdigest() for trial in self.trials
+            ]
+
+        if previous is None:
+            previous = self._previous_manifest()
+
+        models: List[Optional[str]] = []
+        for i in range(len(self.trials)):
+            if not self.model_exists(i):
+                models.append(None)
+            elif i in self._model_digests:
+                models.append(self._model_digests[i])
+            elif i < len(previous.models) and previous.models[i]:
+                models.append(previous.models[i])
+            else:
+                models.append(disk.digest(self.model_path(i)))
+
+        self._model_digests.clear()
+
+        # Trials are rewritten on every save, so keep the old timestamp unless the trial changed. Copied trials keep the time they were first written.
+        now = time.time()
+        weights = []
+        for i, (trial, digest) in enumerate(zip(self.trials, trial_digests)):
+            written = now
+            if i in self._written:
+                written = self._written[i]
+            elif i < len(previous.weights) and previous.trials[i] == digest:
+                written = previous.weights[i].written
+
+            size = os.path.getsize(self.trial_path(self.root, self.hash, i))
+            weights.append(TrialWeight.from_trial(trial, size, written))
+
+        self._written.clear()
+
+        manifest = Manifest(self.hash, trial_digests, models, weights)
+        json.dump(self.manifest_path(self.root, self.hash), manifest.to_dict())
+
+    def _previous_manifest(self) -> Manifest:
+        """
+        The saved manifest. Experiments written by older versions of relic have no manifest (or one without weights), so their trial digests and weights come from the trial files instead.
+        """
+        manifest = self.load_manifest(self.root, self.hash)
+        if manifest is not None and len(manifest.weights) == len(manifest.trials):
+            return manifest
+
+        from_files = self._manifest_from_files()
+        if manifest is not None:
+            from_files.models = manifest.models
+        return from_files
+
+    def _manifest_from_files(self) -> Manifest:
+        """
+        The trial digests and weights an older version of relic would have recorded, from the trial files on disk: written is each file's modification time. Models are left out, so their digests are computed by save_manifest().
+        """
+        digests = []
+        weights = []
+        for i, trial in enumerate(self.trials):
+            path = self.trial_path(self.root, self.hash, i)
+            try:
+                stat = os.stat(path)
+                with open(path, "rb") as fd:
+                    digest = hashlib.sha1(fd.read()).hexdigest()
+            except FileNotFoundError:
+                # Not written yet.
+                break
+            digests.append(digest)
+            weights.append(TrialWeight.from_trial(trial, stat.st_size, stat.st_mtime))
+
+        return Manifest(self.hash, digests, [], weights)
+
+    def trial_weights(self) -> List[TrialWeight]:
+        """
+        Weight of each trial, from the manifest. Experiments written by older versions of relic fall back to the trials themselves and the trial files' modification times.
+        """
+        manifest = self.load_manifest(self.root, self.hash)
+        if manifest is not None and len(manifest.weights) == len(self):
+            return manifest.weights
+
+        assert self.trials_loaded, "Can't weigh trials without loading them!"
+
+        weights = []
+        for i, trial in enumerate(self.trials):
+            stat = os.stat(self.trial_path(self.root, self.hash, i))
+            weights.append(TrialWeight.from_trial(trial, stat.st_size, stat.st_mtime))
+
+        return weights
+
+    @classmethod
+    def load_manifest(cls, root: pathlib.Path, hash: str) -> Optional[Manifest]:
+        try:
+            return Manifest.from_dict(json.load(cls.manifest_path(root, hash)))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def content_fingerprint(cls, root: pathlib.Path, hash: str) -> str:
+        """
+        A token that changes whenever the experiment's config, trials or models change, computed without loading the experiment. Unlike fingerprint(), it doesn't change when files are rewritten with the same contents. Uses the manifest's digests when there is one and file modification times otherwise.
+        """
+        manifest = cls.load_manifest(root, hash)
+        if manifest is not None:
+            content = manifest.to_dict()
+            del content["weights"]
+            return hashlib.sha1(json.dumpb(content)).hexdigest()
+
+        mtimes = [os.stat(cls.config_path(root, hash)).st_mtime_ns]
+        try:
+            mtimes.extend(
+                entry.stat().st_mtime_ns
+                for entry in os.scandir(cls.trial_dir(root, hash))
+            )
+        except FileNotFoundError:
+            pass
+
+        return f"mtime-{max(mtimes)}-{len(mtimes)}"
+
+    @classmethod
+    def load_model_index(
+        cls, root: pathlib.Path, hash: str
+    ) -> Dict[int, ModelMetadata]:
+        try:
+            index = json.load(cls.model_index_path(root, hash))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        return {int(trial): metadata for trial, metadata in index.items()}
+
+    def _save_model_index(self, index: Dict[int, ModelMetadata]) -> None:
+        try:
+            json.dump(
+                self.model_index_path(self.root, self.hash),
+                {str(trial): metadata for trial, metadata in index.items()},
+            )
+        except OSError as err:
+            # The index is only a cache; read-only sources (like a merge source) still work without it.
+            logger.debug(
+                "Couldn't write model index. [experiment: %s, err: %s]", self, err
+            )
+
+    def _set_model_metadata(
+        self, trial: int, metadata: Optional[ModelMetadata]
+    ) -> None:
+        index = self.load_model_index(self.root, self.hash)
+        if metadata is None:
+            if index.pop(trial, None) is None:
+                return
+        else:
+            index[trial] = metadata
+
+        self._save_model_index(index)
+
+    @staticmethod
+    def read_model_metadata(model_path: types.Path) -> ModelMetadata:
+        """
+        Loads a model and returns its MODEL_METADATA_KEYS. Tensors are memory-mapped (see disk.load), but the model is still unpickled, so prefer model_metadata(), which uses the index.
+        """
+        model = disk.load(model_path, mmap=True)
+        if not isinstance(model, dict):
+            return {}
+
+        return {key: model[key] for key in MODEL_METADATA_KEYS if key in model}
+
+    @overload
+    def model_metadata(self, trial: int) -> ModelMetadata:
+        ...
+
+    @overload
+    def model_metadata(self, trial: int, load: bool) -> Optional[ModelMetadata]:
+        ...
+
+    def model_metadata(self, trial: int, load: bool = True) -> Optional[ModelMetadata]:
+        """
+        Metadata for a trial's model, from the model index. Models that aren't indexed yet are loaded and indexed, unless load is False (then None is returned).
+        """
+        index = self.load_model_index(self.root, self.hash)
+        if trial in index:
+            return index[trial]
+
+        if not load:
+            return None
+
+        metadata = self.read_model_metadata(self.model_path(trial))
+        self._set_model_metadata(trial, metadata)
+        return metadata
+
+    def backfill_model_metadata(
+        self, max_workers: Optional[int] = None, save: bool = True
+    ) -> Dict[int, ModelMetadata]:
+        """
+        Indexes every model that isn't indexed yet (for example, models saved by older versions of relic), loading them in parallel. Returns the index for trials that have a model.
+
+        With save=False, the index on disk isn't changed, which is what callers that only read an experiment (like a merge source) want.
+        """
+        index = self.load_model_index(self.root, self.hash)
+        missing = [
+            i for i in range(len(self)) if i not in index and self.model_exists(i)
+        ]
+
+        if missing:
+            with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                paths = [self.model_path(i) for i in missing]
+                for i, metadata in zip(
+                    missing, pool.map(self.read_model_metadata, paths)
+                ):
+                    index[i] = metadata
+
+            if save:
+                self._save_model_index(index)
+
+        return {
+            i: index[i] for i in range(len(self)) if i in index and self.model_exists(i)
+        }
+
+    def rekey(self, config: types.Config) -> "Experiment":
+        """
+        Moves this experiment to the hash of a new config (see rename()). The new hash must not exist yet.
+
+        Returns the experiment under its new hash.
+        """
+        hash = self.rename(self.root, self.hash, config)
+        return dataclasses.replace(self, hash=hash, config=config)
+
+    @classmethod
+    def rename(cls, root: pathlib.Path, hash: str, config: types.Config) -> str:
+        """
+        Moves an experiment to the hash of a new config without loading it, by renaming its directory and rewriting only the config (trials, models and sidecars move with the directory). The new hash must not exist yet.
+
+        Returns the new hash.
+        """
+        new_hash = cls.hash_from_config(config)
+        if cls.exists(root, new_hash):
+            raise FileExistsError(cls.directory(root, new_hash))
+
+        os.rename(cls.directory(root, hash), cls.directory(root, new_hash))
+        disk.dump(cls.config_path(root, new_hash), config)
+
+        manifest = cls.load_manifest(root, new_hash)
+        if manifest is not None:
+            manifest.config = new_hash
+            json.dump(cls.manifest_path(root, new_hash), manifest.to_dict())
+
+        logger.debug("Re-keyed experiment. [from: %s, to: %s]", hash, new_hash)
+
+        return new_hash
+
+    def model_digests(self) -> Dict[int, str]:
+        """
+        Digests of the experiment's models, from the manifest. Pass them to add_trial() when copying models into another experiment, so that the models aren't read again just to digest them.
+        """
+        manifest = self.load_manifest(self.root, self.hash)
+        if manifest is None:
+            return {}
+        return {i: digest for i, digest in enumerate(manifest.models) if digest}
+
+    def _model_digest(self, trial: int) -> Optional[str]:
+        manifest = self.load_manifest(self.root, self.hash)
+        if manifest is None or trial >= len(manifest.models):
+            return None
+        return manifest.models[trial]
 
     def delete(self) -> None:
-        shutil.rmtree(self.directory(self.root, self.hash))
+        self.remove(self.root, self.hash)
+
+    @classmethod
+    def remove(cls, root: pathlib.Path, hash: str) -> None:
+        """
+        Deletes an experiment without loading it. The directory is moved into the trash; `relic gc` reclaims the space (see relic.trash).
+        """
+        trash.put(root, hash)
 
     def _delete_model(self, trial: int) -> None:
+        self._set_model_metadata(trial, None)
+        digest = self._model_digest(trial)
         try:
             os.remove(self.model_path(trial))
         except FileNotFoundError:
@@ -142,15 +625,63 @@ class Experiment:
                 self.model_path(trial),
             )
 
-    def _add_model(self, trial: int, model_path: types.Path) -> pathlib.Path:
+        store = objects.ObjectStore.find(self.root)
+        if store is not None:
+            store.release(digest)
+
+    def _add_model(
+        self,
+        trial: int,
+        model_path: types.Path,
+        transfer_strategy: transfer.Strategy = "copy",
+        model_metadata: Optional[ModelMetadata] = None,
+        model_digest: Optional[str] = None,
+    ) -> pathlib.Path:
         """
-        Copies a model from some location to the right location in the relics/ folder.
+        Copies (or links, or moves; see relic.transfer) a model from some location to the right location in the relics/ folder.
+
+        In projects with an object store (see relic.objects), the model is stored once per digest and linked into place (see ObjectStore.put).
+
+        model_metadata (see MODEL_METADATA_KEYS) is recorded in the model index. Without it, the metadata is read from the model.
+
+        model_digest is the model's digest (see disk.digest), if it is already known (for example, from another experiment's manifest). Otherwise the model is read once to compute it.
         """
         new_model_path = self.model_path(trial)
         os.makedirs(os.path.dirname(new_model_path), exist_ok=True)
-        shutil.copy2(model_path, new_model_path)
 
-        logger.info("Copied model. [from: %s, to: %s]", model_path, new_model_path)
+        store = objects.ObjectStore.find(self.root)
+        if store is None:
+            used: str = transfer.transfer(model_path, new_model_path, transfer_strategy)
+            self._model_digests[trial] = model_digest or disk.digest(new_model_path)
+        else:
+            old_digest = self._model_digest(trial)
+            digest = store.put(
+                model_path, new_model_path, model_digest, transfer_strategy
+            )
+            if old_digest != digest:
+                store.release(old_digest)
+            self._model_digests[trial] = digest
+            used = f"object store ({store})"
+
+        if model_metadata is None:
+            try:
+                model_metadata = self.read_model_metadata(new_model_path)
+            except Exception as err:
+                # Not a file relic can load; the entry is dropped and model_metadata() tries again when it is needed.
+                logger.debug(
+                    "Couldn't read model metadata. [path: %s, err: %s]",
+                    new_model_path,
+                    err,
+                )
+
+        self._set_model_metadata(trial, model_metadata)
+
+        logger.info(
+            "Transferred model. [strategy: %s, from: %s, to: %s]",
+            used,
+            model_path,
+            new_model_path,
+        )
 
         return new_model_path
 
@@ -186,10 +717,28 @@ class Experiment:
     def trial_path(cls, root: pathlib.Path, hash: str, trial: int) -> pathlib.Path:
         return cls.trial_dir(root, hash) / f"{trial}.trial"
 
+    @classmethod
+    def summary_path(cls, root: pathlib.Path, hash: str) -> pathlib.Path:
+        return cls.directory(root, hash) / "summary"
+
+    @classmethod
+    def manifest_path(cls, root: pathlib.Path, hash: str) -> pathlib.Path:
+        return cls.directory(root, hash) / "manifest"
+
+    @classmethod
+    def model_index_path(cls, root: pathlib.Path, hash: str) -> pathlib.Path:
+        return cls.directory(root, hash) / "model-index"
+
     # endregion
 
     def add_trial(
-        self, trial: Dict[str, Any], model_path: Optional[types.Path] = None
+        self,
+        trial: Dict[str, Any],
+        model_path: Optional[types.Path] = None,
+        transfer_strategy: transfer.Strategy = "copy",
+        model_metadata: Optional[ModelMetadata] = None,
+        written: Optional[float] = None,
+        model_digest: Optional[str] = None,
     ) -> Trial:
         if not isinstance(trial, Trial):
             trial = Trial(trial)
@@ -199,7 +748,9 @@ class Experiment:
         else:
             trial["instance"] = len(self)
 
-        return self.update_trial(trial, model_path)
+        return self.update_trial(
+            trial, model_path, transfer_strategy, model_metadata, written, model_digest
+        )
 
     def delete_trials(self, starting_from: int = 0) -> None:
         for i in range(starting_from, len(self)):
@@ -211,11 +762,21 @@ class Experiment:
         self.save()
 
     def update_trial(
-        self, trial: Dict[str, Any], model_path: Optional[types.Path] = None
+        self,
+        trial: Dict[str, Any],
+        model_path: Optional[types.Path] = None,
+        transfer_strategy: transfer.Strategy = "copy",
+        model_metadata: Optional[ModelMetadata] = None,
+        written: Optional[float] = None,
+        model_digest: Optional[str] = None,
     ) -> Trial:
+        """
+        Replaces (or, if trial.instance == len(self), appends) a trial and saves the experiment. written is when the trial was originally written (see TrialWeight); it defaults to now, but trials copied from another experiment should keep theirs. model_digest is passed on to _add_model().
+        """
         if not isinstance(trial, Trial):
             trial = Trial(trial)
 
+        assert self.trials_loaded, "Load the experiment's trials before changing them!"
         assert "instance" in trial
         assert trial.instance <= len(self)
 
@@ -236,7 +797,16 @@ class Experiment:
             self.trials.append(trial)
 
         if model_path is not None:
-            self._add_model(trial.instance, model_path)
+            self._add_model(
+                trial.instance,
+                model_path,
+                transfer_strategy,
+                model_metadata,
+                model_digest,
+            )
+
+        if written is not None:
+            self._written[trial.instance] = written
 
         self.save()
 
@@ -253,6 +823,10 @@ class Experiment:
         return os.path.isfile(self.model_path(trial))
 
     def __len__(self) -> int:
+        if not self.trials_loaded:
+            assert self.summary is not None
+            return self.summary.trials
+
         return len(self.trials)
 
     def __iter__(self) -> Iterator[Trial]:
@@ -276,23 +850,44 @@ class Experiment:
         return hash(self.hash)
 
 
-def with_prefix(prefix: str, root: types.Path) -> Iterator[Experiment]:
-    if not isinstance(root, pathlib.Path):
-        root = pathlib.Path(root)
+# (config mtime, trials/ mtime) in nanoseconds.
+Fingerprint = Tuple[int, int]
 
-    for file in os.listdir(root):
-        hash = Experiment.hash_from_dir(file)
-        if hash.startswith(prefix):
-            yield Experiment.load(root, hash)
+
+def fingerprint(root: pathlib.Path, hash: str) -> Optional[Fingerprint]:
+    """
+    Cheaply detects changes to an experiment without reading it.
+
+    Experiment.save() rewrites the config every time a trial is added or updated, and adding or removing trial files changes the mtime of the trials/ directory. Returns None if the experiment is gone.
+    """
+    try:
+        return (
+            os.stat(Experiment.config_path(root, hash)).st_mtime_ns,
+            os.stat(Experiment.trial_dir(root, hash)).st_mtime_ns,
+        )
+    except FileNotFoundError:
+        return None
+
+
+def fingerprints(project: projects.Project) -> Dict[str, Fingerprint]:
+    result = {}
+    for hash in project.hashes():
+        fp = fingerprint(project.root, hash)
+        if fp is not None:
+            result[hash] = fp
+
+    return result
 
 
 def _load_config_safely(root: pathlib.Path, hash: str) -> types.Config:
     return disk.load(Experiment.config_path(root, hash))  # type: ignore
 
 
-def _load_experiment_safely(root: pathlib.Path, hash: str) -> Optional[Experiment]:
+def _load_experiment_safely(
+    root: pathlib.Path, hash: str, load_trials: bool = True
+) -> Optional[Experiment]:
     try:
-        return Experiment.load(root, hash)
+        return Experiment.load(root, hash, load_trials)
     except Experiment.LoadError:
         return None
 
@@ -301,40 +896,119 @@ def load_all(
     project: projects.Project,
     experiment_fn: types.FilterFn[Experiment] = lambda _: True,
     needs_trials: bool = True,
+    load_trials: bool = True,
+    hashes: Optional[Iterable[str]] = None,
+    engine: executors.Engine = "auto",
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    pools: Optional[executors.Pools] = None,
 ) -> Iterator[Experiment]:
     """
     Generates an interator of experiments matching a filter function (experiment_fn).
+
+    With load_trials=False, experiments that have a summary are loaded without their trials (see Experiment.load). With hashes, only those experiments are considered instead of every experiment in the project. engine decides how experiments are loaded in parallel, with workers workers (default: RELIC_WORKERS, then the available CPUs) and chunksize experiments per task (default: tuned from how long experiments take to load). See relic.executors. With pools, executors are taken from (and left open in) pools instead of being created for this call, and workers is ignored.
     """
     assert callable(experiment_fn)
 
-    # Can't use context manager (with pool as ...) because of this issue with pytest coverage:
-    # https://pytest-cov.readthedocs.io/en/latest/subprocess-support.html#if-you-use-multiprocessing-pool
-    pool = multiprocessing.Pool()
+    hashes = list(project.hashes() if hashes is None else hashes)
+
+    workers = executors.configured_workers(workers if pools is None else pools.workers)
+
+    if engine == "auto":
+        engine = executors.choose(len(hashes), needs_trials or load_trials, workers)
+
+    if engine == "process":
+        # Import torch before forking, so that every worker doesn't import it again.
+        disk.import_torch()
+        # Don't start more processes than there are experiments (unless they are kept for later loads).
+        if pools is None:
+            workers = max(1, min(workers or executors.available_cpus(), len(hashes)))
+
+    if pools is None:
+        pool = executors.create(engine, workers)
+    else:
+        pool = pools.get(engine)
+
     try:
-        if needs_trials:
-            # Need to load every experiment, including trials.
-            exp_args = [(project.root, hash) for hash in project.hashes()]
-        else:
-            # Load every config, filter configs, then load experiments (with trials)
-            config_args = ((project.root, hash) for hash in project.hashes())
-            configs = pool.starmap(_load_config_safely, config_args, chunksize=32)
-
-            exp_args = []
-            for config in configs:
-                hash = Experiment.hash_from_config(config)
-                if not experiment_fn(Experiment(project.root, hash, config, [])):
-                    continue
-                exp_args.append((project.root, hash))
+        yield from _load_all_with(
+            pool, project, experiment_fn, needs_trials, load_trials, hashes, chunksize
+        )
+    finally:
+        if pools is None:
+            pool.close()
+
 
-        exps = pool.starmap(_load_experiment_safely, exp_args, chunksize=32)
-        for exp in exps:
-            if exp is None or not experiment_fn(exp):
+def _load_all_with(
+    pool: executors.Executor,
+    project: projects.Project,
+    experiment_fn: types.FilterFn[Experiment],
+    needs_trials: bool,
+    load_trials: bool,
+    hashes: List[str],
+    chunksize: Optional[int],
+) -> Iterator[Experiment]:
+    if needs_trials:
+        # Need to load every experiment, including trials.
+        exp_args = [(project.root, hash, True) for hash in hashes]
+    else:
+        # Load every config, filter configs, then load experiments (with trials)
+        config_args = ((project.root, hash) for hash in hashes)
+        configs = pool.starmap(_load_config_safely, config_args, chunksize)
+
+        exp_args = []
+        for config in configs:
+            hash = Experiment.hash_from_config(config)
+            if not experiment_fn(Experiment(project.root, hash, config, [])):
                 continue
+            exp_args.append((project.root, hash, load_trials))
+
+    exps = pool.starmap(_load_experiment_safely, exp_args, chunksize)
+    for exp in exps:
+        if exp is None or not experiment_fn(exp):
+            continue
+
+        yield exp
+
+
+def load_configs(
+    project: projects.Project,
+    experiment_fn: types.FilterFn[Experiment] = lambda _: True,
+    hashes: Optional[Iterable[str]] = None,
+    engine: executors.Engine = "auto",
+    workers: Optional[int] = None,
+) -> Iterator[Experiment]:
+    """
+    Generates experiments matching experiment_fn with only their configs (no trials and no summary), for callers that only need the config and the hash. Unlike load_all(load_trials=False), this never falls back to loading trials, so experiments without a summary are just as cheap. experiment_fn must not need trials.
+    """
+    hashes = list(project.hashes() if hashes is None else hashes)
+
+    workers = executors.configured_workers(workers)
+    if engine == "auto":
+        engine = executors.choose(len(hashes), False, workers)
 
+    with executors.create(engine, workers) as pool:
+        configs = pool.starmap(
+            _load_config_safely, [(project.root, hash) for hash in hashes]
+        )
+
+    for hash, config in zip(hashes, configs):
+        exp = Experiment(project.root, hash, config, [], trials_loaded=False)
+        if experiment_fn(exp):
             yield exp
-    finally:
-        pool.close()
-        pool.join()
+
+
+def content_fingerprints(
+    project: projects.Project, max_workers: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Content fingerprints (see Experiment.content_fingerprint) of every experiment in the project, by hash.
+    """
+    hashes = list(project.hashes())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        prints = pool.map(
+            lambda hash: Experiment.content_fingerprint(project.root, hash), hashes
+        )
+        return dict(zip(hashes, prints))
 
 
 def _differing_fields(c1: types.Config, c2: types.Config) -> Iterator[str]:
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Callable, Optional
 
 import orjson
 
@@ -17,12 +17,19 @@ def loadb(b: bytes) -> Any:
     return orjson.loads(b)
 
 
-def dumpb(obj: Any, indent: bool = False) -> bytes:
-    option = orjson.OPT_SORT_KEYS
+def dumpb(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = True,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    option = 0
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
     if indent:
         option |= orjson.OPT_INDENT_2
 
-    return orjson.dumps(obj, option=option)
+    return orjson.dumps(obj, default=default, option=option)
 
 
 def dump(file: types.Path, obj: Any, indent: bool = False) -> None:
@@ -0,0 +1,163 @@
+"""
+An optional content-addressed store for model files, kept in relics/objects/.
+
+Blobs are named by the digest of their contents (see disk.digest). Model files (<hash>/models/<trial>.model) are hardlinks to blobs, so identical checkpoints are stored once and linked in without copying, while model paths still point at ordinary files that torch.load can read.
+
+A blob's link count is its reference count: once only the store's own link is left, no trial uses the blob and it can be removed.
+
+Experiments are merged in parallel threads, so checking whether a blob exists, linking to it and removing it happen under one lock: otherwise release() could remove a blob between put() finding it and linking to it. Large copies happen outside the lock. The lock only covers threads in one process.
+"""
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Optional
+
+from . import disk, transfer, types
+
+logger = logging.getLogger(__name__)
+
+# Shared by every ObjectStore instance, since each caller creates its own (see find()).
+_lock = threading.RLock()
+
+
+class ObjectStore:
+    root: pathlib.Path
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+
+    @staticmethod
+    def directory(project_root: pathlib.Path) -> pathlib.Path:
+        return project_root / "objects"
+
+    @classmethod
+    def create(cls, project_root: pathlib.Path) -> "ObjectStore":
+        cls.directory(project_root).mkdir(exist_ok=True)
+        return cls(cls.directory(project_root))
+
+    @classmethod
+    def find(cls, version_root: pathlib.Path) -> Optional["ObjectStore"]:
+        """
+        Returns the store for an experiment root (relics/vN), or None if the project doesn't use one.
+        """
+        directory = cls.directory(version_root.parent)
+        if not directory.is_dir():
+            return None
+
+        return cls(directory)
+
+    def path(self, digest: str) -> pathlib.Path:
+        return self.root / digest[:2] / digest
+
+    def refcount(self, digest: str) -> int:
+        try:
+            return os.stat(self.path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def _tmp(self, directory: pathlib.Path) -> str:
+        directory.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        os.close(fd)
+        return tmp
+
+    def _commit(self, tmp: str, digest: str) -> pathlib.Path:
+        """
+        Moves a complete temporary file into place as a blob, unless the blob was added in the meantime. Call with the lock held.
+        """
+        blob = self.path(digest)
+        if blob.exists():
+            os.remove(tmp)
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(tmp, blob)
+        return blob
+
+    def put(
+        self,
+        src: types.Path,
+        dst: types.Path,
+        digest: Optional[str] = None,
+        transfer_strategy: transfer.Strategy = "copy",
+    ) -> str:
+        """
+        Adds src to the store and makes dst a reference to it, without the blob being released in between. Without a digest, a copied src is digested while it is copied (so it is read once); other strategies read it once to digest it. Returns the digest.
+        """
+        if digest is not None or transfer_strategy != "copy":
+            digest = digest or disk.digest(src)
+            with _lock:
+                if self.path(digest).exists():
+                    self.link(digest, dst)
+                    if transfer_strategy == "move":
+                        os.remove(src)
+                    return digest
+
+        # Write to a temporary name first (outside the lock, since models can be large), so that a blob is either complete or missing.
+        tmp = self._tmp(self.root if digest is None else self.path(digest).parent)
+        try:
+            if digest is None:
+                digest = disk.copy_with_digest(src, tmp)
+            else:
+                transfer.transfer(src, tmp, transfer_strategy)
+
+            with _lock:
+                self._commit(tmp, digest)
+                self.link(digest, dst)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            raise
+
+        return digest
+
+    def link(self, digest: str, dst: types.Path) -> None:
+        """
+        Makes dst a reference to a blob. Filesystems without hardlinks get a copy instead (which isn't counted as a reference).
+        """
+        with _lock:
+            transfer.hardlink(self.path(digest), dst)
+
+    def release(self, digest: Optional[str]) -> bool:
+        """
+        Removes a blob if nothing references it anymore. Returns whether it was removed.
+        """
+        if digest is None:
+            return False
+
+        with _lock:
+            if self.refcount(digest) > 0:
+                return False
+
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                return False
+
+        logger.debug("Removed unreferenced blob. [digest: %s]", digest)
+        return True
+
+    def collect(self) -> int:
+        """
+        Removes every unreferenced blob (for example, after experiment directories were removed by hand) and leftover temporary files. Don't run it while models are being added. Returns the number of removed files.
+        """
+        removed = 0
+        for prefix in os.scandir(self.root):
+            if prefix.name.startswith(".tmp-"):
+                os.remove(prefix.path)
+                removed += 1
+                continue
+
+            if not prefix.is_dir():
+                continue
+
+            for entry in os.scandir(prefix.path):
+                if entry.name.startswith(".tmp-") or entry.stat().st_nlink <= 1:
+                    os.remove(entry.path)
+                    removed += 1
+
+        return removed
+
+    def __str__(self) -> str:
+        return str(self.root)
@@ -9,14 +9,19 @@ relic.plot(
     aggregating_with=statistics.mean
 )
 
+plotting can also be a list of metrics (plotting=["loss", "accuracy"]), which are drawn in a grid of subplots.
+
 TODO:
 * If the with_respect_to is a string (anything that's not a number) then we should use a bar chart.
 """
 import collections
+import dataclasses
+import logging
+import math
 import statistics
-from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
-import matplotlib.pyplot as plt
+import numpy as np
 import preface
 
 from . import experiments, types
@@ -28,11 +33,21 @@ MaybeList = Union[None, types.T, List[types.T]]
 # the same value for dropout and learning rate have the same key.
 Key = Tuple[Tuple[str, object], ...]
 
+_MISSING = object()
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Series:
+    """
+    One line on the plot: the aggregate, min and max of the metric at each (sorted) x value.
+    """
 
-class Point(NamedTuple):
-    aggregate: float
-    min: float
-    max: float
+    xs: np.ndarray
+    ys: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
 
 
 def _ensure_list(x: MaybeList[types.T]) -> List[types.T]:
@@ -51,18 +66,75 @@ def _prettify(key: Key) -> str:
     return ", ".join(f"{var}: {value}" for var, value in key)
 
 
-def _metric_value(
-    experiment: experiments.Experiment, metric: str, agg_fn: types.AggregatorFunc
-) -> float:
-    values = []
-    for trial in experiment:
-        if preface.dict.contains(trial, metric):
-            values.append(preface.dict.get(trial, metric))
-    try:
-        return agg_fn(values)
-    except statistics.StatisticsError as err:
-        print(repr(experiment))
-        raise err
+def _lookup(trial: Dict[str, Any], path: List[str]) -> Any:
+    # Like preface.dict.get, but returns _MISSING instead of checking with preface.dict.contains first.
+    value: Any = trial
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _metric_values(
+    exps: Sequence[experiments.Experiment], metric: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the index of the experiment and the value for every trial that has metric. NaN values are left out (and logged), so that one diverged trial doesn't hide its whole experiment.
+    """
+    path = metric.split(".")
+    groups: List[int] = []
+    values: List[float] = []
+    for i, exp in enumerate(exps):
+        nans = 0
+        for trial in exp:
+            value = _lookup(trial, path)
+            if value is _MISSING:
+                continue
+            if isinstance(value, float) and math.isnan(value):
+                nans += 1
+                continue
+            groups.append(i)
+            values.append(value)
+
+        if nans:
+            logger.warning(
+                "Skipped NaN values. [experiment: %s, metric: %s, trials: %s]",
+                exp.hash,
+                metric,
+                nans,
+            )
+
+    return np.asarray(groups, dtype=np.intp), np.asarray(values, dtype=float)
+
+
+def group_reduce(
+    groups: np.ndarray, values: np.ndarray, n: int, agg_fn: types.AggregatorFunc
+) -> np.ndarray:
+    """
+    Aggregates values by group (0, ..., n - 1). Empty groups are NaN. Common aggregators are computed with NumPy; others are called once per group.
+    """
+    counts = np.bincount(groups, minlength=n)
+
+    if agg_fn is statistics.mean or agg_fn is sum:
+        sums = np.bincount(groups, weights=values, minlength=n)
+        if agg_fn is sum:
+            return np.where(counts > 0, sums, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    if agg_fn is min or agg_fn is max:
+        ufunc, fill = (np.minimum, np.inf) if agg_fn is min else (np.maximum, -np.inf)
+        out = np.full(n, fill)
+        ufunc.at(out, groups, values)
+        return np.where(counts > 0, out, np.nan)
+
+    order = np.argsort(groups, kind="stable")
+    splits = np.split(values[order], np.cumsum(counts)[:-1])
+    return np.array(
+        [agg_fn(split.tolist()) if len(split) else np.nan for split in splits],
+        dtype=float,
+    )
 
 
 def get_differences(
@@ -103,19 +175,112 @@ def make_experiment_series(
     return series
 
 
-def plot(
-    exps: Sequence[experiments.Experiment],
+def compute_series(
+    experiment_series: Dict[Key, List[experiments.Experiment]],
     plotting: str,
     with_respect_to: str,
-    controlling_for: MaybeList[str] = None,
     aggregating_with: types.AggregatorFunc = statistics.mean,
+    trial_aggregating_with: Optional[types.AggregatorFunc] = None,
+) -> Dict[Key, Series]:
+    """
+    Aggregates each experiment's trials with trial_aggregating_with (defaults to aggregating_with), then the experiments at each x value with aggregating_with. NaN values are skipped, and so are experiments where no trial has a (non-NaN) value for the metric.
+    """
+    if trial_aggregating_with is None:
+        trial_aggregating_with = aggregating_with
+
+    series = {}
+    for key, exps in experiment_series.items():
+        groups, values = _metric_values(exps, plotting)
+        per_experiment = group_reduce(groups, values, len(exps), trial_aggregating_with)
+
+        keep = ~np.isnan(per_experiment)
+        xs = np.asarray(
+            [preface.dict.get(exp.config, with_respect_to) for exp in exps]
+        )[keep]
+        ys = per_experiment[keep]
+
+        # np.unique sorts, and inverse maps each experiment to its x value.
+        unique_xs, inverse = np.unique(xs, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        series[key] = Series(
+            unique_xs,
+            group_reduce(inverse, ys, len(unique_xs), aggregating_with),
+            group_reduce(inverse, ys, len(unique_xs), min),
+            group_reduce(inverse, ys, len(unique_xs), max),
+        )
+
+    return series
+
+
+def _draw(ax: Any, series: Dict[Key, Series], with_respect_to: str) -> None:
+    master_xs: np.ndarray = np.array([])
+    for line in series.values():
+        if len(line.xs) > len(master_xs):
+            master_xs = line.xs
+
+    # plot a dummy on the axis
+    ax.plot(master_xs, np.zeros(len(master_xs)), linewidth=0, marker=None)
+
+    for key, line in sorted(series.items()):
+        drawn = ax.plot(line.xs, line.ys, label=_prettify(key), marker="o")[0]
+        ax.fill_between(
+            line.xs, line.maxs, line.mins, alpha=0.1, color=drawn.get_color()
+        )
+
+    ax.set_xlabel(with_respect_to)
+    ax.legend()
+
+
+def render(
+    series: Dict[str, Dict[Key, Series]],
+    with_respect_to: str,
     title: Optional[str] = None,
+    out: Optional[types.Path] = None,
 ) -> None:
+    """
+    Draws the series of each metric (by metric) in a grid of subplots. With out, the figure is written to that file (the format comes from its suffix) with the non-interactive Agg backend, so it works without a display. Otherwise it is shown in a window.
 
-    controlling_for = _ensure_list(controlling_for)
+    Matplotlib is only imported here, because importing it takes longer than most relic commands.
+    """
+    cols = math.ceil(math.sqrt(len(series)))
+    rows = math.ceil(len(series) / cols)
+    figsize = (6.4 * cols, 4.8 * rows)
 
-    experiment_series = make_experiment_series(exps, controlling_for)
+    if out is not None:
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize)
+        axes = fig.subplots(rows, cols, squeeze=False)
+    else:
+        import matplotlib.pyplot as plt
+
+        fig, axes = plt.subplots(rows, cols, squeeze=False, figsize=figsize)
+
+    flat_axes = axes.flatten()
+    for ax, (metric, metric_series) in zip(flat_axes, series.items()):
+        _draw(ax, metric_series, with_respect_to)
+        ax.set_ylabel(metric)
+        if len(series) > 1:
+            ax.set_title(metric)
+
+    for ax in flat_axes[len(series) :]:
+        ax.set_visible(False)
+
+    if title:
+        fig.suptitle(title)
+    elif len(series) == 1:
+        fig.suptitle(f"{next(iter(series))}")
+    fig.tight_layout()
+
+    if out is not None:
+        fig.savefig(out)
+    else:
+        plt.show(block=True)
 
+
+def print_differences(
+    experiment_series: Dict[Key, List[experiments.Experiment]], with_respect_to: str
+) -> None:
     differences = {
         key: get_differences(exps) for key, exps in experiment_series.items()
     }
@@ -134,46 +299,36 @@ def plot(
             )
         print()
 
-    series = {}
-
-    for key, exps in experiment_series.items():
-        complete_xy_mapping = collections.defaultdict(list)
-        for exp in exps:
-            complete_xy_mapping[preface.dict.get(exp.config, with_respect_to)].append(
-                _metric_value(exp, plotting, aggregating_with)
-            )
-        aggregate_xy_mapping = {
-            x: Point(aggregating_with(y), min(y), max(y))
-            for x, y in complete_xy_mapping.items()
-        }
-        series[key] = aggregate_xy_mapping
-
-    fig, ax = plt.subplots(1, 1)
 
-    master_xs: List[types.Sortable] = []
-    for xy_mapping in series.values():
-        if len(xy_mapping) > len(master_xs):
-            master_xs = sorted(xy_mapping)
-
-    # plot a dummy on the axis
-    ax.plot(master_xs, [0 for _ in master_xs], linewidth=0, marker=None)
+def plot(
+    exps: Sequence[experiments.Experiment],
+    plotting: MaybeList[str],
+    with_respect_to: str,
+    controlling_for: MaybeList[str] = None,
+    aggregating_with: types.AggregatorFunc = statistics.mean,
+    title: Optional[str] = None,
+    trial_aggregating_with: Optional[types.AggregatorFunc] = None,
+    out: Optional[types.Path] = None,
+) -> None:
+    """
+    Plots one or more metrics (plotting) against with_respect_to. Several metrics share one grouping of the experiments and are drawn as a grid of subplots.
+    """
+    metrics = _ensure_list(plotting)
+    controlling_for = _ensure_list(controlling_for)
 
-    for key, xy_mapping in sorted(series.items()):
-        xs = sorted(xy_mapping)
-        ys = [xy_mapping[x].aggregate for x in xs]
-        mins = [xy_mapping[x].min for x in xs]
-        maxs = [xy_mapping[x].max for x in xs]
+    experiment_series = make_experiment_series(exps, controlling_for)
 
-        line = ax.plot(xs, ys, label=_prettify(key), marker="o")[0]
-        ax.fill_between(xs, maxs, mins, alpha=0.1, color=line._color)
+    print_differences(experiment_series, with_respect_to)
 
-    if title:
-        fig.suptitle(title)
-    else:
-        fig.suptitle(f"{plotting}")
-    fig.tight_layout()
-    ax.set_xlabel(with_respect_to)
-    ax.set_ylabel(plotting)
-    ax.legend()
+    series = {
+        metric: compute_series(
+            experiment_series,
+            metric,
+            with_respect_to,
+            aggregating_with,
+            trial_aggregating_with,
+        )
+        for metric in metrics
+    }
 
-    plt.show(block=True)
+    render(series, with_respect_to, title, out)
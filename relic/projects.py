@@ -10,7 +10,7 @@ import os
 import pathlib
 from typing import Iterator
 
-from . import json
+from . import json, objects
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +66,10 @@ class Project:
         return self._root / f"v{self._current}"
 
     @classmethod
-    def new(cls, root: pathlib.Path) -> "Project":
+    def new(cls, root: pathlib.Path, object_store: bool = False) -> "Project":
+        """
+        Creates a project in root. With object_store, models are deduplicated in relics/objects (see relic.objects).
+        """
         # Make root directory
         root.mkdir(exist_ok=True)
 
@@ -78,6 +81,9 @@ class Project:
         # Make a v1 directory
         (root / "v1").mkdir(exist_ok=True)
 
+        if object_store:
+            objects.ObjectStore.create(root)
+
         return cls(root)
 
     def hashes(self) -> Iterator[str]:
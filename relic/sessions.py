@@ -0,0 +1,137 @@
+"""
+A Session keeps one project's experiments in memory, for notebooks and scripts that load experiments many times.
+
+relic.load_experiments reads every experiment (and starts a new worker pool) on every call. A Session loads the project once, answers later queries from memory, and only reloads experiments that were added, changed or deleted when refresh() is called, for example while training jobs are still writing trials:
+
+    with relic.Session(root) as session:
+        for lr in [1e-3, 1e-4]:
+            exps = session.load_experiments(lambda exp: exp.config["lr"] == lr)
+
+        ...  # Jobs add trials.
+        session.refresh()
+
+Changes are found with experiments.fingerprints(), which only stats files. The session's worker pools are started on first use and kept until close(), so refreshes reuse warm workers that have already imported torch.
+"""
+import pathlib
+from typing import Any, Dict, Iterator, Optional
+
+from . import cli, executors, experiments, projects, types
+from .experiments import Experiment
+
+
+class Session:
+    project: projects.Project
+    engine: executors.Engine
+    chunksize: Optional[int]
+    # Loaded experiments and their fingerprints when they were loaded, by hash.
+    loaded: Dict[str, Experiment]
+    fingerprints: Dict[str, experiments.Fingerprint]
+
+    def __init__(
+        self,
+        root: Optional[pathlib.Path] = None,
+        engine: executors.Engine = "auto",
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+    ):
+        if root is None:
+            root = cli.DEFAULT_ROOT
+
+        self.project = projects.Project(root)
+        self.engine = engine
+        self.chunksize = chunksize
+        self._pools: Optional[executors.Pools] = executors.Pools(workers)
+
+        self.loaded = {}
+        self.fingerprints = {}
+        self.initialized = False
+
+    @property
+    def closed(self) -> bool:
+        return self._pools is None
+
+    @property
+    def pools(self) -> executors.Pools:
+        if self._pools is None:
+            raise ValueError("Session is closed!")
+        return self._pools
+
+    def new_experiment(self, config: types.Config) -> Experiment:
+        exp = Experiment.new(config, self.project.root)
+
+        if self.initialized:
+            fp = experiments.fingerprint(self.project.root, exp.hash)
+            if fp is not None:
+                self.loaded[exp.hash] = exp
+                self.fingerprints[exp.hash] = fp
+
+        return exp
+
+    def load_experiments(
+        self, filter_fn: types.FilterFn[Experiment] = lambda _: True
+    ) -> Iterator[Experiment]:
+        """
+        Experiments matching filter_fn, from memory. The first call loads the project; later calls don't look at the disk (see refresh()). The experiments are shared between calls, so changes to one are seen by every later query.
+        """
+        if not self.initialized:
+            self.refresh()
+
+        return (exp for exp in list(self.loaded.values()) if filter_fn(exp))
+
+    def refresh(self) -> int:
+        """
+        Reloads new, changed and deleted experiments. Returns how many there were.
+        """
+        # Checked first, so that a closed session doesn't touch the disk.
+        pools = self.pools
+
+        current = experiments.fingerprints(self.project)
+
+        changed = [
+            hash for hash, fp in current.items() if self.fingerprints.get(hash) != fp
+        ]
+        deleted = [hash for hash in self.fingerprints if hash not in current]
+
+        for hash in deleted + changed:
+            self.loaded.pop(hash, None)
+
+        for exp in experiments.load_all(
+            self.project,
+            hashes=changed,
+            engine=self.engine,
+            chunksize=self.chunksize,
+            pools=pools,
+        ):
+            self.loaded[exp.hash] = exp
+
+        for hash in changed:
+            if hash not in self.loaded:
+                # Being written or deleted right now; try again next refresh.
+                current.pop(hash)
+
+        self.fingerprints = current
+        self.initialized = True
+
+        return len(changed) + len(deleted)
+
+    def close(self) -> None:
+        """
+        Stops the session's workers and forgets its experiments. Loads in progress must finish first. Closing twice does nothing.
+        """
+        if self._pools is not None:
+            self._pools.close()
+            self._pools = None
+
+        self.loaded = {}
+        self.fingerprints = {}
+        self.initialized = False
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        state = "closed" if self.closed else f"{len(self.loaded)} experiments"
+        return f"Session({self.project.root}, engine={self.engine!r}, {state})"
@@ -0,0 +1,159 @@
+"""
+Ways to put a model file into the relics/ folder.
+
+Models can be several GB, so byte-copying them is often the slowest part of merging or modifying experiments. When the source and destination are on the same filesystem, a hardlink, reflink or rename is nearly free. Every strategy falls back to a plain copy when it isn't possible (for example, across devices).
+"""
+import errno
+import logging
+import os
+import shutil
+import sys
+
+from . import types
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+logger = logging.getLogger(__name__)
+
+Strategy = Literal["copy", "hardlink", "reflink", "move"]
+
+# From linux/fs.h
+FICLONE = 0x40049409
+
+# Errors that mean "this strategy doesn't work here", rather than a real failure.
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EMLINK,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.ENOSYS,
+    errno.EBADF,
+}
+
+
+def _unsupported(err: OSError) -> bool:
+    return err.errno in _UNSUPPORTED
+
+
+def _remove(dst: types.Path) -> None:
+    """
+    Removes dst before it is written, so that writing it never changes a file it is hardlinked to.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+
+def copy(src: types.Path, dst: types.Path) -> str:
+    _remove(dst)
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def hardlink(src: types.Path, dst: types.Path) -> str:
+    _remove(dst)
+
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError as err:
+        if not _unsupported(err):
+            raise
+
+    return copy(src, dst)
+
+
+def _clone(src: types.Path, dst: types.Path) -> bool:
+    """
+    Tries to clone src into dst (which must not exist) with the FICLONE ioctl, then with copy_file_range. Both share (or copy in the kernel) the underlying blocks instead of moving bytes through Python.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    with open(src, "rb") as src_fd, open(dst, "wb") as dst_fd:
+        try:
+            fcntl.ioctl(dst_fd.fileno(), FICLONE, src_fd.fileno())
+            return True
+        except OSError as err:
+            if not _unsupported(err):
+                raise
+
+        if not hasattr(os, "copy_file_range"):
+            return False
+
+        remaining = os.fstat(src_fd.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd.fileno(), dst_fd.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError as err:
+            if not _unsupported(err):
+                raise
+            return False
+
+        return remaining == 0
+
+
+def reflink(src: types.Path, dst: types.Path) -> str:
+    _remove(dst)
+    try:
+        cloned = _clone(src, dst)
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+
+    if not cloned:
+        return copy(src, dst)
+
+    shutil.copystat(src, dst)
+    return "reflink"
+
+
+def move(src: types.Path, dst: types.Path) -> str:
+    """
+    Renames src to dst. Across devices, src is copied and then removed.
+    """
+    try:
+        os.replace(src, dst)
+        return "move"
+    except OSError as err:
+        if err.errno != errno.EXDEV:
+            raise
+
+    copy(src, dst)
+    os.remove(src)
+    return "copy"
+
+
+STRATEGIES = {
+    "copy": copy,
+    "hardlink": hardlink,
+    "reflink": reflink,
+    "move": move,
+}
+
+
+def transfer(src: types.Path, dst: types.Path, strategy: Strategy = "copy") -> str:
+    """
+    Puts src at dst using strategy. Returns the strategy that was actually used ("copy" if it fell back).
+    """
+    used = STRATEGIES[strategy](src, dst)
+
+    if used != strategy:
+        logger.debug(
+            "Fell back to copying model. [strategy: %s, from: %s, to: %s]",
+            strategy,
+            src,
+            dst,
+        )
+
+    return used
@@ -0,0 +1,87 @@
+"""
+Deleted experiments wait in relics/.trash/ until `relic gc` removes them.
+
+Deleting an experiment is a single rename into the trash, which is atomic and takes the same (short) time no matter how many trials or how large the models are. A crash leaves each experiment either in its version directory or in the trash, never half-deleted. `relic gc` later removes the trashed directories (in parallel) and releases any object-store blobs they referenced.
+"""
+import concurrent.futures
+import logging
+import os
+import pathlib
+import shutil
+import uuid
+from typing import List, Optional
+
+from . import json, objects
+
+logger = logging.getLogger(__name__)
+
+
+def directory(project_root: pathlib.Path) -> pathlib.Path:
+    return project_root / ".trash"
+
+
+def put(version_root: pathlib.Path, hash: str) -> pathlib.Path:
+    """
+    Moves an experiment directory (relics/vN/<hash>) into the trash and returns its new path.
+    """
+    trash = directory(version_root.parent)
+    trash.mkdir(exist_ok=True)
+
+    # The same hash can be deleted more than once (for example, after it was re-run), so entries get a unique suffix.
+    dst = trash / f"{version_root.name}-{hash}-{uuid.uuid4().hex[:8]}"
+    os.rename(version_root / hash, dst)
+
+    logger.debug("Moved experiment to trash. [hash: %s, to: %s]", hash, dst)
+    return dst
+
+
+def entries(project_root: pathlib.Path) -> List[pathlib.Path]:
+    trash = directory(project_root)
+    if not trash.is_dir():
+        return []
+
+    return [pathlib.Path(entry.path) for entry in os.scandir(trash)]
+
+
+def _model_digests(entry: pathlib.Path) -> List[Optional[str]]:
+    # Read before the entry is removed; see experiments.Manifest.
+    try:
+        return list(json.load(entry / "manifest")["models"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return []
+
+
+def purge(entry: pathlib.Path, store: Optional[objects.ObjectStore] = None) -> None:
+    """
+    Removes one trashed experiment for good. Safe to call again on an entry that was partially removed.
+    """
+    digests = _model_digests(entry) if store is not None else []
+
+    try:
+        shutil.rmtree(entry)
+    except FileNotFoundError:
+        # Another gc got there first.
+        return
+
+    if store is not None:
+        for digest in digests:
+            store.release(digest)
+
+
+def empty(project_root: pathlib.Path, max_workers: Optional[int] = None) -> int:
+    """
+    Purges every entry in the trash. Returns the number of purged experiments.
+    """
+    trashed = entries(project_root)
+    if not trashed:
+        return 0
+
+    store = None
+    if objects.ObjectStore.directory(project_root).is_dir():
+        store = objects.ObjectStore(objects.ObjectStore.directory(project_root))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # list() re-raises the first error, if any.
+        list(pool.map(lambda entry: purge(entry, store), trashed))
+
+    return len(trashed)
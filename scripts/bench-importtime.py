@@ -0,0 +1,76 @@
+"""
+Measures how long the relic CLI takes to import, using `python -X importtime`, and fails if it is over budget or if a heavy module (torch, matplotlib, ...) is imported at startup.
+
+Each target is imported in a fresh interpreter (best of several runs). "cli" imports what `relic --help` imports; the others import one subcommand module.
+
+Usage: python scripts/bench-importtime.py [BUDGET_MS]
+"""
+
+import re
+import subprocess
+import sys
+
+RUNS = 5
+
+TARGETS = {
+    "cli": "relic.__main__",
+    "versions": "relic.cli.versions",
+    "ls": "relic.cli.ls",
+    "plot": "relic.cli.plot",
+}
+
+# None of these should be needed just to start up.
+HEAVY = ["torch", "matplotlib", "pyarrow", "tabulate", "numpy"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def importtime(module):
+    """
+    Returns the cumulative import time of module (in ms) and every module it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total, imported = 0, set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match[2]), len(match[3]), match[4]
+        imported.add(name)
+        # Top-level imports have the smallest indent.
+        if indent == 1:
+            total += cumulative
+
+    return total / 1000, imported
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 300.0
+    failed = False
+
+    for name, module in TARGETS.items():
+        runs = [importtime(module) for _ in range(RUNS)]
+        best = min(ms for ms, _ in runs)
+        heavy = sorted({h for h in HEAVY for m in runs[0][1] if m.split(".")[0] == h})
+
+        status = "ok"
+        if best > budget:
+            status = f"over budget ({budget:.0f}ms)"
+            failed = True
+        if heavy:
+            status = f"imports {', '.join(heavy)}"
+            failed = True
+
+        print(f"{name:10} {best:8.1f}ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compares the engines in relic.executors by loading generated projects of a few sizes with experiments.load_all.
+
+Usage: python scripts/bench-load.py [TRIALS_PER_EXPERIMENT]
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+from relic import executors, experiments, projects
+
+SIZES = [8, 64, 512, 2048]
+
+
+def make_project(root, n, trials):
+    project = projects.Project.new(root)
+    for i in range(n):
+        exp = experiments.Experiment.new({"seed": i, "lr": 1e-3}, project.root)
+        for _ in range(trials):
+            exp.add_trial({"loss": [1.0 / (step + 1) for step in range(100)]})
+    return project
+
+
+def bench(project, engine, load_trials):
+    start = time.perf_counter()
+    count = sum(
+        1
+        for _ in experiments.load_all(
+            project, needs_trials=False, load_trials=load_trials, engine=engine
+        )
+    )
+    return time.perf_counter() - start, count
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(
+        f"{'experiments':>12} {'trials':>6} "
+        + " ".join(f"{e:>8}" for e in executors.ENGINES)
+    )
+    for n in SIZES:
+        with tempfile.TemporaryDirectory() as root_name:
+            project = make_project(pathlib.Path(root_name), n, trials)
+            for load_trials in [False, True]:
+                times = []
+                for engine in executors.ENGINES:
+                    seconds, count = bench(project, engine, load_trials)
+                    assert count == n
+                    times.append(f"{seconds:8.3f}")
+                print(f"{n:>12} {str(load_trials):>6} " + " ".join(times))
+
+
+if __name__ == "__main__":
+    main()
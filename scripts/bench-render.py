@@ -0,0 +1,53 @@
+"""
+Compares the table renderer in relic.cli.lib.render with tabulate on a large, `relic ls`-shaped table.
+
+Usage: python scripts/bench-render.py [ROWS]
+"""
+
+import random
+import sys
+import time
+
+from tabulate import tabulate
+
+from relic.cli.lib import render
+
+
+def make_rows(n):
+    rng = random.Random(42)
+    return [
+        [
+            f"{rng.getrandbits(40):010x}",
+            rng.randint(1, 10),
+            rng.choice([1e-3, 3e-4, 1e-4, None]),
+            rng.choice(["adam", "sgd"]),
+            rng.random(),
+            rng.random() * 100,
+            rng.choice([True, False]),
+        ]
+        for _ in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    headers = ["experiment", "trials", "lr", "optim", "loss", "acc", "finished"]
+    rows = make_rows(n)
+
+    start = time.perf_counter()
+    expected = tabulate(rows, headers=headers, floatfmt=".3g", missingval="-")
+    tabulate_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = render.render(headers, rows)
+    render_s = time.perf_counter() - start
+
+    assert actual == expected, "render output differs from tabulate!"
+
+    print(f"rows:     {n}")
+    print(f"tabulate: {tabulate_s:.3f}s")
+    print(f"render:   {render_s:.3f}s ({tabulate_s / render_s:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from relic import experiments
+from relic.cli.lib import catalog
+
+
+def make_catalog() -> catalog.KeyCatalog:
+    exp = experiments.Experiment(
+        root=None,  # type: ignore
+        hash="abc",
+        config={"model": {"dropout": 0.1}, "lr": 0.01},
+        trials=[
+            experiments.Trial(instance=0, train_loss=1.0, val_loss=2.0),
+            experiments.Trial(instance=1, train_loss=1.0, acc={"top1": 0.5}),
+        ],
+    )
+    key_catalog = catalog.KeyCatalog()
+    key_catalog.add(exp)
+    return key_catalog
+
+
+def test_keys() -> None:
+    key_catalog = make_catalog()
+
+    assert key_catalog.config_keys == {"model.dropout", "lr"}
+    assert key_catalog.trial_keys == {"instance", "train_loss", "val_loss", "acc.top1"}
+
+
+def test_expand_regex() -> None:
+    assert make_catalog().expand(".*loss.*") == ["train_loss", "val_loss"]
+
+
+def test_expand_nested() -> None:
+    assert make_catalog().expand(r"acc\..*") == ["acc.top1"]
+
+
+def test_expand_exact_key() -> None:
+    assert make_catalog().expand("lr") == ["lr"]
+
+
+def test_expand_expression_unchanged() -> None:
+    assert make_catalog().expand("(sum losses)") == ["(sum losses)"]
+
+
+def test_expand_no_match_unchanged() -> None:
+    assert make_catalog().expand("epochs") == ["epochs"]
+
+
+def test_expand_invalid_regex_unchanged() -> None:
+    assert make_catalog().expand("loss[") == ["loss["]
@@ -1,4 +1,5 @@
 import argparse
+import os
 import pathlib
 import tempfile
 
@@ -169,3 +170,81 @@ def test_delete_experiment_filter_fn() -> None:
         remaining = list(experiments.load_all(project))
 
         assert len(remaining) == 2
+
+
+def test_delete_by_hash_does_not_load(monkeypatch) -> None:  # type: ignore
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.delete.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new({"file": "0.txt"}, project.root)
+        experiment.add_trial({"finished": True})
+
+        def load(*args, **kwargs):  # type: ignore
+            raise AssertionError("delete --hashes shouldn't load experiments")
+
+        monkeypatch.setattr(experiments.Experiment, "load", load)
+
+        args = parser.parse_args(["delete", "--hashes", experiment.hash[:4]])
+        args.project = projects.Project(root)
+        assert cli.delete.do_delete(args) == 0
+
+        assert not experiments.Experiment.exists(project.root, experiment.hash)
+
+
+def test_delete_by_filter_reads_only_configs(monkeypatch) -> None:  # type: ignore
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.delete.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        for name in ["0.txt", "1.txt"]:
+            experiment = experiments.Experiment.new({"file": name}, project.root)
+            experiment.add_trial({"finished": True})
+            # Written by an older relic, without a summary.
+            experiment.summary_path(project.root, experiment.hash).unlink()
+
+        def load(*args, **kwargs):  # type: ignore
+            raise AssertionError("delete --experiments shouldn't load trials")
+
+        monkeypatch.setattr(experiments.Experiment, "load", load)
+
+        args = parser.parse_args(["delete", "--experiments", "(== file '0.txt')"])
+        args.project = projects.Project(root)
+        assert cli.delete.do_delete(args) == 0
+
+        assert len(list(project.hashes())) == 1
+
+
+def test_gc_after_delete() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.delete.add_parser(subparsers)
+    cli.gc.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new({"file": "0.txt"}, project.root)
+        experiment.add_trial({"finished": True})
+
+        args = parser.parse_args(["delete", "--experiments", "(== file '0.txt')"])
+        args.project = projects.Project(root)
+        assert cli.delete.do_delete(args) == 0
+        assert not experiments.Experiment.exists(project.root, experiment.hash)
+        assert len(os.listdir(root / ".trash")) == 1
+
+        cached = cli.plot.cache_dir(root) / "plot.svg"
+        cached.parent.mkdir(parents=True)
+        cached.write_text("<svg/>")
+
+        args = parser.parse_args(["gc"])
+        args.project = projects.Project(root)
+        assert cli.gc.do_gc(args) == 0
+        assert os.listdir(root / ".trash") == []
+        assert not cached.exists()
@@ -0,0 +1,344 @@
+import argparse
+import csv
+import pathlib
+import tempfile
+import threading
+
+import pytest
+
+from relic import cli, experiments, json, projects
+
+
+def make_project(root: pathlib.Path, count: int) -> projects.Project:
+    project = projects.Project.new(root)
+    for i in range(count):
+        experiment = experiments.Experiment.new(
+            {"model": {"layers": i}, "lr": 0.1}, project.root
+        )
+        experiment.add_trial({"loss": [1.0, 0.5], "finished": True})
+        experiment.add_trial({"loss": [0.9], "finished": i % 2 == 0})
+    return project
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.export.add_parser(subparsers)
+    return parser
+
+
+def test_to_table() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = make_project(pathlib.Path(root_name), 1)
+        exps = list(experiments.load_all(project))
+
+        headers, rows = cli.export.to_table(exps)
+
+        assert headers == [
+            "experiment",
+            "config.model.layers",
+            "config.lr",
+            "trial.loss",
+            "trial.finished",
+            "trial.instance",
+        ]
+        assert len(rows) == 2
+        record = dict(zip(headers, rows[0]))
+        assert record["experiment"] == exps[0].hash
+        assert record["config.model.layers"] == 0
+        assert record["trial.loss"] == [1.0, 0.5]
+
+
+def test_to_table_trial_fn() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = make_project(pathlib.Path(root_name), 2)
+        exps = list(experiments.load_all(project))
+
+        _, rows = cli.export.to_table(
+            exps, trial_fn=lambda trial: trial["finished"]  # type: ignore
+        )
+
+        assert len(rows) == 3
+
+
+def test_export_jsonl_shards() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 5)
+
+        parser = make_parser()
+        args = parser.parse_args(
+            ["export", "--dir", str(root / "out"), "--shard-size", "2"]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.export.do_export(args) == 0
+
+        files = sorted((root / "out").iterdir())
+        assert [file.name for file in files] == [
+            "part-00000.jsonl",
+            "part-00001.jsonl",
+            "part-00002.jsonl",
+        ]
+
+        records = [
+            json.loadb(line)
+            for file in files
+            for line in file.read_bytes().splitlines()
+        ]
+        assert len(records) == 10
+        assert {record["config.model.layers"] for record in records} == set(range(5))
+
+
+def test_export_csv_single_file() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 3)
+
+        parser = make_parser()
+        args = parser.parse_args(
+            [
+                "export",
+                "--dir",
+                str(root / "out"),
+                "--format",
+                "csv",
+                "--shard-size",
+                "0",
+                "--experiments",
+                "(< model.layers 2)",
+            ]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.export.do_export(args) == 0
+
+        with open(root / "out" / "part-00000.csv", newline="") as fp:
+            rows = list(csv.DictReader(fp))
+
+        assert len(rows) == 4
+        # Lists are written as JSON.
+        assert {row["trial.loss"] for row in rows} == {"[1.0,0.5]", "[0.9]"}
+
+
+def test_export_parquet() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 4)
+
+        parser = make_parser()
+        args = parser.parse_args(
+            ["export", "--dir", str(root / "out"), "--format", "parquet"]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.export.do_export(args) == 0
+
+        table = pq.read_table(root / "out" / "part-00000.parquet")
+        assert table.num_rows == 8
+        assert sorted(set(table.column("config.model.layers").to_pylist())) == [
+            0,
+            1,
+            2,
+            3,
+        ]
+
+
+def test_write_shards_builds_records_in_workers() -> None:
+    threads = []
+
+    def to_records(shard):  # type: ignore
+        threads.append(threading.current_thread())
+        return [{"experiment": hash} for hash in shard]
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        shards = [["a", "b"], ["c"]]
+        assert cli.export.write_shards(shards, root, "jsonl", to_records) == 2
+        assert cli.export.read_shard(root / "part-00001.jsonl", "jsonl") == [
+            {"experiment": "c"}
+        ]
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_export_refuses_non_empty_dir() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 1)
+        (root / "out").mkdir()
+        (root / "out" / "existing").write_text("")
+
+        parser = make_parser()
+        args = parser.parse_args(["export", "--dir", str(root / "out")])
+        args.project = projects.Project(root / "relics")
+        assert cli.export.do_export(args) == 1
+
+
+def export_args(
+    parser: argparse.ArgumentParser, root: pathlib.Path, *extra: str
+) -> argparse.Namespace:
+    args = parser.parse_args(["export", "--dir", str(root / "out"), *extra])
+    args.project = projects.Project(root / "relics")
+    return args
+
+
+def read_all(directory: pathlib.Path) -> list:  # type: ignore
+    return sorted(
+        (record["experiment"], record["trial.instance"], record["trial.loss"])
+        for record in cli.export._read_shards(directory, "jsonl")
+    )
+
+
+def test_incremental_export_and_compact() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = make_project(root / "relics", 4)
+        parser = make_parser()
+
+        args = export_args(parser, root, "--incremental", "--shard-size", "2")
+        assert cli.export.do_export(args) == 0
+        assert sorted(path.name for path in (root / "out").iterdir()) == [
+            "part-00000.jsonl",
+            "part-00001.jsonl",
+            "watermark.json",
+        ]
+
+        # Nothing changed, so nothing is written.
+        assert cli.export.do_export(args) == 0
+        assert not (root / "out" / "delta-00001").exists()
+
+        exps = {
+            exp.config["model"]["layers"]: exp for exp in experiments.load_all(project)
+        }
+        exps[0].add_trial({"loss": [0.1], "finished": True})
+        exps[1].delete()
+        experiments.Experiment.new({"model": {"layers": 9}, "lr": 0.1}, project.root)
+
+        assert cli.export.do_export(args) == 0
+        delta = root / "out" / "delta-00001"
+        assert json.load(delta / "removed.json") == sorted([exps[0].hash, exps[1].hash])
+        assert {
+            record["experiment"] for record in cli.export._read_shards(delta, "jsonl")
+        } == {exps[0].hash}
+
+        watermark = cli.export.Watermark.load(root / "out")
+        assert watermark is not None
+        assert watermark.deltas == 1
+        assert exps[1].hash not in watermark.experiments
+
+        args = export_args(parser, root, "--compact")
+        assert cli.export.do_export(args) == 0
+        assert not delta.exists()
+
+        with tempfile.TemporaryDirectory() as full_name:
+            full = pathlib.Path(full_name)
+            cli.export.export(experiments.load_all(project), full, "jsonl")
+            assert read_all(root / "out") == read_all(full)
+
+
+def test_incremental_export_format_mismatch() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 1)
+        parser = make_parser()
+
+        assert cli.export.do_export(export_args(parser, root, "--incremental")) == 0
+        args = export_args(parser, root, "--incremental", "--format", "csv")
+        assert cli.export.do_export(args) == 1
+
+
+def test_compact_requires_watermark() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 1)
+        parser = make_parser()
+
+        assert cli.export.do_export(export_args(parser, root)) == 0
+        assert cli.export.do_export(export_args(parser, root, "--compact")) == 1
+
+
+def test_interrupted_compaction_is_finished(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = make_project(root / "relics", 4)
+        parser = make_parser()
+
+        args = export_args(parser, root, "--incremental", "--shard-size", "1")
+        assert cli.export.do_export(args) == 0
+        exp = next(experiments.load_all(project))
+        exp.add_trial({"loss": [0.1], "finished": True})
+        assert cli.export.do_export(args) == 0
+
+        # Crash after the new watermark is saved, before the old files are removed.
+        monkeypatch.setattr(cli.export, "_finish_compaction", lambda *args: None)
+        args = export_args(parser, root, "--compact", "--shard-size", "2")
+        assert cli.export.do_export(args) == 0
+        assert (root / "out" / "delta-00001").exists()
+        monkeypatch.undo()
+
+        # The next export finishes the compaction instead of skipping the deltas.
+        exp.add_trial({"loss": [0.2], "finished": True})
+        args = export_args(parser, root, "--incremental", "--shard-size", "2")
+        assert cli.export.do_export(args) == 0
+        assert cli.export.do_export(export_args(parser, root, "--compact")) == 0
+
+        assert sorted(path.name for path in (root / "out").iterdir()) == [
+            "part-00000.jsonl",
+            "watermark.json",
+        ]
+        with tempfile.TemporaryDirectory() as full_name:
+            full = pathlib.Path(full_name)
+            cli.export.export(experiments.load_all(project), full, "jsonl")
+            assert read_all(root / "out") == read_all(full)
+
+
+def test_incremental_export_records_filtered_experiments(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics", 3)
+        parser = make_parser()
+
+        args = export_args(
+            parser, root, "--incremental", "--experiments", "(== model.layers 0)"
+        )
+        assert cli.export.do_export(args) == 0
+
+        watermark = cli.export.Watermark.load(root / "out")
+        assert watermark is not None
+        assert len(watermark.experiments) == 3
+        assert watermark.experiment_filters == ["(== model.layers 0)"]
+
+        # The experiments that were left out would never be exported.
+        assert cli.export.do_export(export_args(parser, root, "--incremental")) == 1
+
+        def load_all(*args, **kwargs):  # type: ignore
+            raise AssertionError("nothing changed, so nothing should be loaded")
+
+        monkeypatch.setattr(experiments, "load_all", load_all)
+        assert cli.export.do_export(args) == 0
+
+
+def test_interrupted_first_incremental_export(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = make_project(root / "relics", 3)
+        parser = make_parser()
+        args = export_args(parser, root, "--incremental", "--shard-size", "1")
+
+        # Crash after the part files are written, before the watermark.
+        def save(*args, **kwargs):  # type: ignore
+            raise KeyboardInterrupt()
+
+        monkeypatch.setattr(cli.export.Watermark, "save", save)
+        with pytest.raises(KeyboardInterrupt):
+            cli.export.do_export(args)
+        monkeypatch.undo()
+        assert not (root / "out").exists()
+
+        assert cli.export.do_export(args) == 0
+        assert sorted(path.name for path in root.iterdir()) == ["out", "relics"]
+        with tempfile.TemporaryDirectory() as full_name:
+            full = pathlib.Path(full_name)
+            cli.export.export(experiments.load_all(project), full, "jsonl")
+            assert read_all(root / "out") == read_all(full)
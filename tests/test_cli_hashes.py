@@ -0,0 +1,32 @@
+from relic.cli.lib import hashes
+
+HASHES = ["abc123", "abd456", "b00000", "b00001", "c"]
+
+
+def test_with_prefix() -> None:
+    index = hashes.HashIndex(HASHES)
+
+    assert index.with_prefix("ab") == ["abc123", "abd456"]
+    assert index.with_prefix("abd") == ["abd456"]
+    assert index.with_prefix("b0000") == ["b00000", "b00001"]
+    assert index.with_prefix("d") == []
+    assert index.with_prefix("") == sorted(HASHES)
+
+
+def test_shortest_unique_prefix() -> None:
+    index = hashes.HashIndex(HASHES)
+
+    assert index.shortest_unique_prefix("abc123") == "abc"
+    assert index.shortest_unique_prefix("abd456") == "abd"
+    assert index.shortest_unique_prefix("b00001") == "b00001"
+    assert index.shortest_unique_prefix("c") == "c"
+    assert index.shortest_unique_prefix("c", minimum=4) == "c"
+    assert index.shortest_unique_prefix("abc123", minimum=4) == "abc1"
+
+
+def test_shortest_unique_prefix_not_in_index() -> None:
+    index = hashes.HashIndex(HASHES)
+
+    assert index.shortest_unique_prefix("abe000") == "abe"
+    assert "abe000" not in index
+    assert "abc123" in index
@@ -1,7 +1,11 @@
 import argparse
+import json
+import math
 import pathlib
 import tempfile
 
+import pytest
+
 from relic import cli, experiments, projects
 
 
@@ -517,3 +521,276 @@ def test_table_regression1() -> None:
             "data.file",
             "model.intrinsic_dimension",
         ]
+
+
+def test_ls_format_choices() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+
+    assert set(cli.lib.writers.LS_FORMATS) <= set(cli.lib.writers.WRITERS)
+    assert parser.parse_args(["ls", "--format", "arrow"]).format == "arrow"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["ls", "--format", "parquet"])
+
+
+def test_ls_format_jsonl(capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--format", "jsonl", "--show", "loss"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment.add_trial({"loss": 0.5})
+        experiment.add_trial({"loss": 1.5})
+
+        assert cli.ls.do_ls(args) == 0
+
+        rows = [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+        assert rows == [
+            {"experiment": experiment.hash[:4], "trials": 2, "loss": 1.0},
+        ]
+
+
+def test_table_with_show_regex() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--show", ".*loss"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment_a = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment_a.add_trial({"train_loss": 1.0, "val_loss": 2.0, "acc": 0.5})
+
+        experiment_b = experiments.Experiment.new({"file": "b.txt"}, args.project.root)
+        experiment_b.add_trial({"train_loss": 3.0, "val_loss": 4.0, "acc": 0.5})
+
+        actual = cli.ls.make_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == [
+            "experiment",
+            "trials",
+            "file",
+            "train_loss",
+            "val_loss",
+        ]
+
+
+def test_grouped_table() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--group-by", "lr", "--show", "loss"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        for lr, seed, loss in [(0.1, 0, 1.0), (0.1, 1, 3.0), (0.01, 0, 5.0)]:
+            experiment = experiments.Experiment.new(
+                {"lr": lr, "seed": seed}, args.project.root
+            )
+            experiment.add_trial({"loss": loss})
+
+        actual = cli.ls.make_grouped_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == ["lr", "experiments", "trials", "loss"]
+        assert actual.rows == [[0.01, 1, 1, 5.0], [0.1, 2, 2, 2.0]]
+
+
+def test_grouped_table_with_pivot() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(
+        ["ls", "--group-by", "lr", "--pivot", "model", "--show", ".*loss"]
+    )
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        for lr, model, loss in [(0.1, "a", 1.0), (0.1, "b", 3.0), (0.01, "a", 5.0)]:
+            experiment = experiments.Experiment.new(
+                {"lr": lr, "model": model}, args.project.root
+            )
+            experiment.add_trial({"val_loss": loss})
+
+        actual = cli.ls.make_grouped_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == [
+            "lr",
+            "experiments",
+            "trials",
+            "val_loss (model=a)",
+            "val_loss (model=b)",
+        ]
+        assert actual.rows == [[0.01, 1, 1, 5.0, None], [0.1, 2, 2, 1.0, 3.0]]
+
+
+def test_live_table_refresh() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--watch", "--show", "loss"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment_a = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment_a.add_trial({"loss": 1.0})
+
+        live = cli.ls.LiveTable(args)
+        assert live.refresh() == 1
+        assert live.refresh() == 0
+
+        table = live.table()
+        assert table is not None
+        assert table.headers == ["experiment", "trials", "loss"]
+        assert table.rows == [[experiment_a.hash[:4], 1, 1.0]]
+
+        experiment_b = experiments.Experiment.new({"file": "b.txt"}, args.project.root)
+        experiment_b.add_trial({"loss": 3.0})
+        experiment_a.add_trial({"loss": 2.0})
+
+        assert live.refresh() == 2
+
+        table = live.table()
+        assert table is not None
+        assert table.headers == ["experiment", "trials", "file", "loss"]
+        assert sorted(table.rows) == sorted(
+            [
+                [experiment_a.hash[:4], 2, "a.txt", 1.5],
+                [experiment_b.hash[:4], 1, "b.txt", 3.0],
+            ]
+        )
+
+        experiment_b.delete()
+
+        assert live.refresh() == 1
+
+        table = live.table()
+        assert table is not None
+        assert table.headers == ["experiment", "trials", "loss"]
+        assert table.rows == [[experiment_a.hash[:4], 2, 1.5]]
+
+
+def test_table_with_show_from_summary() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--show", "loss", "--aggregator", "max"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment.add_trial({"loss": 1.0})
+        experiment.add_trial({"loss": 3.0})
+
+        # ls shouldn't need any trial files.
+        for i in range(len(experiment)):
+            experiment.trial_path(args.project.root, experiment.hash, i).unlink()
+
+        actual = cli.ls.make_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == ["experiment", "trials", "loss"]
+        assert actual.rows == [[experiment.hash[:4], 2, 3.0]]
+
+
+def test_table_loads_trials_once_when_summary_cannot_answer(monkeypatch) -> None:  # type: ignore
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--show", "acc", "lr"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        for name in ["a.txt", "b.txt"]:
+            experiment = experiments.Experiment.new({"file": name}, args.project.root)
+            # Only some trials have acc and lr, so the summary can't answer them.
+            experiment.add_trial({"loss": 1.0, "acc": 0.5, "lr": 0.1})
+            experiment.add_trial({"loss": 3.0})
+
+        full_loads = []
+        original_load = experiments.Experiment.load
+
+        def load(root, hash, load_trials=True):  # type: ignore
+            if load_trials:
+                full_loads.append(hash)
+            return original_load(root, hash, load_trials)
+
+        monkeypatch.setattr(experiments.Experiment, "load", load)
+
+        actual = cli.ls.make_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == ["experiment", "trials", "file", "acc", "lr"]
+        assert actual.rows[0][3:] == actual.rows[1][3:]
+        # Once per experiment, not once per cell.
+        assert len(full_loads) == 2
+
+
+def test_summarize_rebuilds_summaries() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.summarize.add_parser(subparsers)
+    args = parser.parse_args(["summarize"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment.add_trial({"loss": 1.0})
+        experiment.summary_path(args.project.root, experiment.hash).unlink()
+
+        assert cli.summarize.do_summarize(args) == 0
+
+        summary = experiments.Experiment.load_summary(
+            args.project.root, experiment.hash
+        )
+        assert summary is not None
+        assert summary.metrics["loss"].mean == 1.0
+
+
+def test_table_with_nan_metric() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.ls.add_parser(subparsers)
+    args = parser.parse_args(["ls", "--show", "loss"])
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        args.project = projects.Project.new(root)
+
+        experiment = experiments.Experiment.new({"file": "a.txt"}, args.project.root)
+        experiment.add_trial({"loss": 1.0})
+        experiment.add_trial({"loss": float("nan")})
+
+        summary = experiments.Experiment.load_summary(
+            args.project.root, experiment.hash
+        )
+        assert summary is not None
+        assert summary.metrics["loss"].count == 1
+
+        actual = cli.ls.make_table_from_args(args)
+
+        assert actual is not None
+        assert actual.headers == ["experiment", "trials", "loss"]
+        assert math.isnan(actual.rows[0][2])
@@ -3,8 +3,9 @@ import pathlib
 import tempfile
 
 import pytest
+import torch
 
-from relic import cli, experiments, projects
+from relic import cli, disk, experiments, projects
 
 
 def test_merge1() -> None:
@@ -287,3 +288,266 @@ def test_merge_keep_all_trials() -> None:
         assert "finished" not in project_a_experiments[0][1]
         assert project_a_experiments[0][2]["finished"] is True
         assert project_a_experiments[0][3]["finished"] is True
+
+
+def test_merge_many_experiments_in_parallel() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        for i in range(20):
+            experiment_b = experiments.Experiment.new(
+                {"file": f"{i}.txt"}, project_b.root
+            )
+            for _ in range(i % 3 + 1):
+                experiment_b.add_trial({"finished": True})
+
+        # Half of the experiments already exist in the destination with fewer trials.
+        for i in range(0, 20, 2):
+            experiment_a = experiments.Experiment.new(
+                {"file": f"{i}.txt"}, project_a.root
+            )
+            experiment_a.add_trial({"finished": True})
+
+        args = parser.parse_args(
+            ["merge", str(root_b), str(root_a), "--workers", "4", "--queue-size", "2"]
+        )
+        assert cli.merge.do_merge(args) == 0
+
+        merged = {
+            exp.config["file"]: len(exp) for exp in experiments.load_all(project_a)
+        }
+        assert merged == {f"{i}.txt": i % 3 + 1 for i in range(20)}
+
+
+def test_merge_skips_unchanged_experiments(monkeypatch) -> None:  # type: ignore
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        unchanged = experiments.Experiment.new({"file": "0.txt"}, project_b.root)
+        unchanged.add_trial({"finished": True})
+        changed = experiments.Experiment.new({"file": "1.txt"}, project_b.root)
+        changed.add_trial({"finished": True})
+
+        args = parser.parse_args(["merge", str(root_b), str(root_a)])
+        cli.merge.do_merge(args)
+
+        changed.add_trial({"finished": False})
+
+        loaded = []
+        load = experiments.Experiment.load
+
+        def spy(root, hash, *args, **kwargs):  # type: ignore
+            loaded.append(hash)
+            return load(root, hash, *args, **kwargs)
+
+        monkeypatch.setattr(experiments.Experiment, "load", spy)
+        cli.merge.do_merge(args)
+
+        assert unchanged.hash not in loaded
+        assert changed.hash in loaded
+        assert len(experiments.Experiment.load(project_a.root, changed.hash)) == 2
+
+
+def test_merge_unique_seed_uses_model_index() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        models = []
+        for seed in range(3):
+            models.append(pathlib.Path(true_root) / f"{seed}.pt")
+            disk.dump(models[-1], {"fastfood_seed": seed})
+
+        experiment_a = experiments.Experiment.new({"file": "0.txt"}, project_a.root)
+        experiment_a.add_trial({"seed": 0}, models[0])
+
+        experiment_b = experiments.Experiment.new({"file": "0.txt"}, project_b.root)
+        for seed in range(3):
+            experiment_b.add_trial({"seed": seed}, models[seed])
+        # Written by an older version of relic, without a model index.
+        experiment_b.model_index_path(project_b.root, experiment_b.hash).unlink()
+
+        args = parser.parse_args(
+            ["merge", str(root_b), str(root_a), "--conflicts", "unique-seed"]
+        )
+        cli.merge.do_merge(args)
+
+        merged = experiments.Experiment.load(project_a.root, experiment_a.hash)
+        assert [trial["seed"] for trial in merged] == [0, 1, 2]
+        assert experiments.Experiment.load_model_index(
+            project_a.root, experiment_a.hash
+        ) == {i: {"fastfood_seed": i} for i in range(3)}
+
+        # The source wasn't written to.
+        assert not experiment_b.model_index_path(
+            project_b.root, experiment_b.hash
+        ).exists()
+
+
+def test_merge_longer_with_tensors() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        experiment_a = experiments.Experiment.new({"file": "0.txt"}, project_a.root)
+        experiment_a.add_trial({"losses": torch.zeros(2)})
+
+        experiment_b = experiments.Experiment.new({"file": "0.txt"}, project_b.root)
+        experiment_b.add_trial({"losses": torch.zeros(2000)})
+
+        args = parser.parse_args(
+            ["merge", str(root_b), str(root_a), "--conflicts", "longer"]
+        )
+        cli.merge.do_merge(args)
+
+        merged = experiments.Experiment.load(project_a.root, experiment_a.hash)
+        assert merged.trials[0]["losses"].shape == (2000,)
+
+
+def test_merge_newer() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        experiment_a = experiments.Experiment.new({"file": "0.txt"}, project_a.root)
+        experiment_a.add_trial({"loss": 1.0, "notes": "a much longer trial body"})
+        experiment_a.add_trial({"loss": 3.0})
+
+        experiment_b = experiments.Experiment.new({"file": "0.txt"}, project_b.root)
+        experiment_b.add_trial({"loss": 2.0})
+        experiment_b.add_trial({"loss": 4.0})
+
+        # Trial 1 was written last in the destination.
+        experiment_a.update_trial({"instance": 1, "loss": 5.0})
+
+        args = parser.parse_args(
+            ["merge", str(root_b), str(root_a), "--conflicts", "newer"]
+        )
+        cli.merge.do_merge(args)
+
+        merged = experiments.Experiment.load(project_a.root, experiment_a.hash)
+        assert [trial["loss"] for trial in merged] == [2.0, 5.0]
+
+
+def test_merge_newer_twice() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        roots = {}
+        for name in ["a", "b", "d"]:
+            roots[name] = pathlib.Path(true_root) / f"project_{name}"
+            roots[name].mkdir()
+            projects.Project.new(roots[name])
+
+        project_a = projects.Project(roots["a"])
+        project_b = projects.Project(roots["b"])
+        project_d = projects.Project(roots["d"])
+
+        experiment_a = experiments.Experiment.new({"file": "0.txt"}, project_a.root)
+        experiment_a.add_trial({"loss": 1.0})
+        experiment_b = experiments.Experiment.new({"file": "0.txt"}, project_b.root)
+        experiment_b.add_trial({"loss": 2.0})
+
+        # The destination keeps the source's write time, not the time of the merge.
+        args = parser.parse_args(["merge", str(roots["a"]), str(roots["d"])])
+        cli.merge.do_merge(args)
+        merged = experiments.Experiment.load(project_d.root, experiment_a.hash)
+        assert merged.trial_weights()[0].written == pytest.approx(
+            experiment_a.trial_weights()[0].written
+        )
+
+        args = parser.parse_args(
+            ["merge", str(roots["b"]), str(roots["d"]), "--conflicts", "newer"]
+        )
+        cli.merge.do_merge(args)
+
+        merged = experiments.Experiment.load(project_d.root, experiment_a.hash)
+        assert [trial["loss"] for trial in merged] == [2.0]
+        assert merged.trial_weights()[0].written == pytest.approx(
+            experiment_b.trial_weights()[0].written
+        )
+
+
+def test_merge_reuses_model_digests(monkeypatch) -> None:  # type: ignore
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.merge.add_parser(subparsers)
+
+    with tempfile.TemporaryDirectory() as true_root:
+        root_a = pathlib.Path(true_root) / "project_a"
+        root_a.mkdir()
+        project_a = projects.Project.new(root_a)
+
+        root_b = pathlib.Path(true_root) / "project_b"
+        root_b.mkdir()
+        project_b = projects.Project.new(root_b)
+
+        model = pathlib.Path(true_root) / "model.pt"
+        model.write_bytes(b"weights" * 1000)
+
+        experiment_a = experiments.Experiment.new({"file": "0.txt"}, project_a.root)
+        experiment_a.add_trial({"loss": 1.0}, model)
+
+        def digest(*args, **kwargs):  # type: ignore
+            raise AssertionError("merged models shouldn't be read again to digest them")
+
+        monkeypatch.setattr(disk, "digest", digest)
+
+        args = parser.parse_args(
+            ["merge", str(root_a), str(root_b), "--transfer", "hardlink"]
+        )
+        cli.merge.do_merge(args)
+
+        src = experiments.Experiment.load_manifest(project_a.root, experiment_a.hash)
+        dst = experiments.Experiment.load_manifest(project_b.root, experiment_a.hash)
+        assert src is not None and dst is not None
+        assert dst.models == src.models
@@ -0,0 +1,182 @@
+import argparse
+import pathlib
+import tempfile
+
+from relic import cli, disk, experiments, projects
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.modify.add_parser(subparsers)
+    return parser
+
+
+def test_rename_moves_experiment() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        model = root / "model.pt"
+        model.write_bytes(b"weights")
+
+        experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+        experiment.add_trial({"loss": 1.0}, model)
+        experiment.add_trial({"loss": 2.0})
+        model_inode = experiment.model_path(0).stat().st_ino
+
+        args = make_parser().parse_args(
+            ["modify", "--act", "rename", "lr", "learning_rate"]
+        )
+        args.project = project
+        assert args.func(args) == 0
+
+        assert not experiments.Experiment.exists(project.root, experiment.hash)
+
+        (renamed,) = experiments.load_all(project)
+        assert renamed.config == {"learning_rate": 0.1}
+        assert [trial["loss"] for trial in renamed] == [1.0, 2.0]
+        # The directory was renamed, so the model wasn't copied.
+        assert renamed.model_path(0).stat().st_ino == model_inode
+
+        manifest = experiments.Experiment.load_manifest(project.root, renamed.hash)
+        assert manifest is not None
+        assert manifest.config == renamed.hash
+
+
+def test_rename_with_conflict_copies_trials() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+
+        old = experiments.Experiment.new({"lr": 0.1}, project.root)
+        old.add_trial({"loss": 1.0})
+        old.add_trial({"loss": 2.0})
+        existing = experiments.Experiment.new({"learning_rate": 0.1}, project.root)
+        existing.add_trial({"loss": 3.0})
+
+        args = make_parser().parse_args(
+            [
+                "modify",
+                "--act",
+                "rename",
+                "--conflicts",
+                "more-trials",
+                "lr",
+                "learning_rate",
+            ]
+        )
+        args.project = project
+        assert args.func(args) == 0
+
+        (merged,) = experiments.load_all(project)
+        assert merged.hash == existing.hash
+        assert [trial["loss"] for trial in merged] == [1.0, 2.0]
+
+
+def test_copy_trials_reuses_model_digests(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        model = root / "model.pt"
+        model.write_bytes(b"weights" * 1000)
+
+        old = experiments.Experiment.new({"lr": 0.1}, project.root)
+        old.add_trial({"loss": 1.0}, model)
+        new = experiments.Experiment.new({"learning_rate": 0.1}, project.root)
+
+        def digest(*args, **kwargs):  # type: ignore
+            raise AssertionError("models shouldn't be read again to digest them")
+
+        monkeypatch.setattr(disk, "digest", digest)
+        cli.modify.copy_trials(old, new, "hardlink")
+
+        assert new.model_digests() == old.model_digests()
+        assert len(new.model_digests()) == 1
+
+
+def _remove_seed(exp):  # type: ignore
+    if "seed" not in exp.config:
+        return None
+    return {key: value for key, value in exp.config.items() if key != "seed"}
+
+
+def test_plan_finds_collisions() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+
+        for lr in [0.1, 0.2, 0.3]:
+            experiments.Experiment.new({"lr": lr, "seed": 0}, project.root)
+        experiments.Experiment.new({"lr": 0.1, "seed": 1}, project.root)
+        experiments.Experiment.new({"lr": 0.1}, project.root)
+
+        args = make_parser().parse_args(["modify", "remove", "seed"])
+        args.project = project
+
+        plan = cli.modify.make_plan(args, _remove_seed)
+        # {lr: 0.1} already exists, so both lr=0.1 experiments conflict.
+        assert len(plan.renames) == 2
+        assert len(plan.conflicts) == 2
+        assert plan.unchanged == 1
+
+
+def test_dry_run_changes_nothing() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+
+        args = make_parser().parse_args(["modify", "change", "lr", "float", "0.5"])
+        args.project = project
+        assert args.func(args) == 0
+
+        assert [exp.hash for exp in experiments.load_all(project)] == [experiment.hash]
+
+
+def test_batch_change_in_parallel() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        for i in range(30):
+            experiment = experiments.Experiment.new({"i": i, "lr": 0.1}, project.root)
+            experiment.add_trial({"loss": float(i)})
+
+        args = make_parser().parse_args(
+            ["modify", "--act", "--workers", "4", "change", "lr", "float", "0.5"]
+        )
+        args.project = project
+        assert args.func(args) == 0
+
+        exps = list(experiments.load_all(project))
+        assert len(exps) == 30
+        assert all(exp.config["lr"] == 0.5 for exp in exps)
+        assert sorted(exp.trials[0]["loss"] for exp in exps) == [
+            float(i) for i in range(30)
+        ]
+
+
+def test_rename_without_summary_does_not_load_trials(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        for i in range(3):
+            experiment = experiments.Experiment.new({"i": i, "lr": 0.1}, project.root)
+            experiment.add_trial({"loss": float(i)})
+            # Written by an older relic, without a summary.
+            experiment.summary_path(project.root, experiment.hash).unlink()
+
+        def load(*args, **kwargs):  # type: ignore
+            raise AssertionError("renames shouldn't load experiments")
+
+        monkeypatch.setattr(experiments.Experiment, "load", load)
+
+        args = make_parser().parse_args(
+            ["modify", "--act", "rename", "lr", "learning_rate"]
+        )
+        args.project = project
+        assert args.func(args) == 0
+
+        monkeypatch.undo()
+        exps = list(experiments.load_all(project))
+        assert sorted(exp.config["i"] for exp in exps) == [0, 1, 2]
+        assert all(exp.config["learning_rate"] == 0.1 for exp in exps)
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from relic.cli.lib import parallel
+
+
+def test_bounded_executor_blocks_when_full() -> None:
+    pool = parallel.BoundedExecutor(max_workers=2, queue_size=1)
+    release = threading.Event()
+    blocked = threading.Event()
+    lock = threading.Lock()
+    in_flight = 0
+    most_in_flight = 0
+
+    slots = pool._slots
+
+    class Slots:
+        # Tells the test when submit() has to wait for a slot.
+        def acquire(self) -> None:
+            if not slots.acquire(blocking=False):
+                blocked.set()
+                slots.acquire()
+
+        def release(self) -> None:
+            slots.release()
+
+    pool._slots = Slots()  # type: ignore
+
+    def work() -> None:
+        nonlocal in_flight
+        release.wait()
+        with lock:
+            in_flight -= 1
+
+    def submit_all() -> None:
+        nonlocal in_flight, most_in_flight
+        for _ in range(10):
+            pool.submit(work)
+            with lock:
+                in_flight += 1
+                most_in_flight = max(most_in_flight, in_flight)
+
+    try:
+        producer = threading.Thread(target=submit_all)
+        producer.start()
+        assert blocked.wait(timeout=10)
+        # 2 running + 1 queued; the producer is blocked on the fourth submit.
+        with lock:
+            assert most_in_flight == 3
+
+        release.set()
+        producer.join()
+        pool.finish()
+        assert most_in_flight == 3
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_bounded_executor_reraises() -> None:
+    def fail() -> None:
+        raise ValueError("bad experiment")
+
+    pool = parallel.BoundedExecutor(max_workers=2)
+    try:
+        pool.submit(fail)
+        with pytest.raises(ValueError):
+            pool.finish()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+from tabulate import tabulate
+
+from relic.cli.lib import render
+
+HEADERS = ["experiment", "trials", "lr", "loss", "finished"]
+ROWS = [
+    ["abcdef1234", 3, 0.001, 0.25, True],
+    ["0123456789", 1, None, "1.0,2.0", False],
+    ["9f8e7d6c5b", 12, 2.5e10, -0.5, None],
+]
+
+
+def expected(headers, rows):  # type: ignore
+    return tabulate(rows, headers=headers, floatfmt=".3g", missingval="-")
+
+
+@pytest.mark.parametrize(
+    "headers,rows",
+    [
+        (HEADERS, ROWS),
+        (HEADERS, []),
+        (["a"], [[None], [None]]),
+        (["a", "b"], [[1, 0.5], [-3, 1e-7], [12345678, float("nan")]]),
+        (["a", "b"], [["12", " 7 "], ["1.5", "abc"], ["-4", [1, 2]]]),
+        (["a", "b"], [["True", "False"], [None, "x"]]),
+        (["x"], [["1e5"], ["inf"], ["Infinity"], ["1_000"]]),
+        (["a-very-long-header"], [[" padded "], [""], [{"a": 1}]]),
+    ],
+)
+def test_render_matches_tabulate(headers, rows) -> None:  # type: ignore
+    assert render.render(headers, rows) == expected(headers, rows)
+
+
+def test_render_falls_back_for_wide_characters() -> None:
+    rows = [["日本語", 1], ["ascii", 2]]
+    assert render.render(["name", "n"], rows) == expected(["name", "n"], rows)
+
+
+def test_render_no_headers() -> None:
+    assert render.render([], [[], []]) == ""
+
+
+def test_write_chunks() -> None:
+    rows = [[f"{i:010x}", i, i / 7] for i in range(100)]
+    fp = io.StringIO()
+    render.write(["experiment", "trials", "loss"], rows, fp, chunk_size=8)
+
+    assert fp.getvalue() == expected(["experiment", "trials", "loss"], rows) + "\n"
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from relic.cli.lib import writers
+
+HEADERS = ["experiment", "trials", "lr", "loss"]
+ROWS = [
+    ["abcdef1234", 3, 0.001, 0.25],
+    ["0123456789", 1, None, "1.0,2.0"],
+]
+
+
+def test_jsonl_keeps_native_types() -> None:
+    fp = io.BytesIO()
+    writers.write_jsonl(HEADERS, ROWS, fp)
+
+    lines = fp.getvalue().decode("utf-8").splitlines()
+    assert lines == [
+        '{"experiment":"abcdef1234","trials":3,"lr":0.001,"loss":0.25}',
+        '{"experiment":"0123456789","trials":1,"lr":null,"loss":"1.0,2.0"}',
+    ]
+
+
+def test_jsonl_streams_rows() -> None:
+    fp = io.BytesIO()
+
+    def rows():  # type: ignore
+        yield ROWS[0]
+        # The first row is already written before the second one is computed.
+        assert fp.getvalue().count(b"\n") == 1
+        yield ROWS[1]
+
+    writers.write_jsonl(HEADERS, rows(), fp)
+    assert fp.getvalue().count(b"\n") == 2
+
+
+def test_csv() -> None:
+    fp = io.BytesIO()
+    writers.write_csv(HEADERS, ROWS, fp)
+
+    assert not fp.closed
+    assert fp.getvalue().decode("utf-8").splitlines() == [
+        "experiment,trials,lr,loss",
+        "abcdef1234,3,0.001,0.25",
+        '0123456789,1,,"1.0,2.0"',
+    ]
+
+
+def test_arrow() -> None:
+    pa = pytest.importorskip("pyarrow")
+
+    fp = io.BytesIO()
+    writers.write_arrow(HEADERS, ROWS, fp)
+
+    table = pa.ipc.open_file(pa.BufferReader(fp.getvalue())).read_all()
+    assert table.column_names == HEADERS
+    assert table.schema.field("trials").type == pa.int64()
+    assert table.schema.field("lr").type == pa.float64()
+    # mixed float and string values fall back to strings.
+    assert table.schema.field("loss").type == pa.string()
+    assert table.column("lr").to_pylist() == [0.001, None]
+
+
+def test_parquet() -> None:
+    pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    fp = io.BytesIO()
+    writers.write_parquet(HEADERS, ROWS, fp)
+
+    fp.seek(0)
+    table = pq.read_table(fp)
+    assert table.column_names == HEADERS
+    assert table.column("trials").to_pylist() == [3, 1]
+    assert table.column("loss").to_pylist() == ["0.25", "1.0,2.0"]
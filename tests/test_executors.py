@@ -0,0 +1,104 @@
+import pathlib
+import tempfile
+
+import pytest
+
+from relic import executors, experiments, projects
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@pytest.mark.parametrize("engine", ["process", "thread", "asyncio", "inline"])
+def test_starmap_keeps_order(engine: executors.Engine) -> None:
+    args = [(i, i) for i in range(100)]
+    with executors.create(engine, 2) as pool:
+        assert pool.starmap(add, args, chunksize=8) == [i * 2 for i in range(100)]
+
+
+def test_create_unknown_engine() -> None:
+    with pytest.raises(ValueError):
+        executors.create("fibers")  # type: ignore
+
+
+def test_choose() -> None:
+    assert executors.choose(10, load_trials=True, workers=8) == "inline"
+    assert executors.choose(10_000, load_trials=False, workers=8) == "thread"
+    assert executors.choose(200, load_trials=True, workers=8) == "thread"
+    assert executors.choose(10_000, load_trials=True, workers=8) == "process"
+    assert executors.choose(10_000, load_trials=True, workers=1) == "inline"
+
+
+def test_configured_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(executors.WORKERS_VAR, raising=False)
+    assert executors.configured_workers() is None
+    assert executors.configured_workers(3) == 3
+
+    monkeypatch.setenv(executors.WORKERS_VAR, "2")
+    assert executors.configured_workers() == 2
+    assert executors.configured_workers(3) == 3
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "many"])
+def test_configured_workers_invalid(
+    monkeypatch: pytest.MonkeyPatch, value: str
+) -> None:
+    monkeypatch.setenv(executors.WORKERS_VAR, value)
+    with pytest.raises(ValueError):
+        executors.configured_workers()
+
+
+def test_tune_chunksize() -> None:
+    # Slow items: one per chunk.
+    assert executors.tune_chunksize(1.0, 10_000, 4) == 1
+    # Fast items: limited by TARGET_CHUNK_SECONDS.
+    assert executors.tune_chunksize(0.001, 10_000, 4) == 50
+    # Very fast items: limited so that every worker gets several chunks.
+    assert executors.tune_chunksize(1e-9, 160, 4) == 10
+    assert executors.tune_chunksize(1e-9, 0, 4) == 1
+
+
+def test_process_tunes_chunksize() -> None:
+    args = [(i, i) for i in range(100)]
+    with executors.ProcessExecutor(2) as pool:
+        assert pool.starmap(add, args) == [i * 2 for i in range(100)]
+        assert isinstance(pool, executors.ProcessExecutor)
+        assert pool.chunksize is not None and pool.chunksize >= 1
+
+
+@pytest.mark.parametrize("engine", executors.ENGINES)
+def test_load_all_engines(engine: executors.Engine) -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = projects.Project.new(pathlib.Path(root_name))
+        for i in range(5):
+            exp = experiments.Experiment.new({"seed": i}, project.root)
+            exp.add_trial({"loss": float(i)})
+
+        exps = list(
+            experiments.load_all(
+                project,
+                lambda exp: exp.config["seed"] % 2 == 0,
+                needs_trials=False,
+                engine=engine,
+            )
+        )
+        assert sorted(exp.config["seed"] for exp in exps) == [0, 2, 4]
+        assert all(len(exp) == 1 for exp in exps)
+
+
+@pytest.mark.parametrize("engine", ["auto", "process"])
+def test_load_all_workers(
+    monkeypatch: pytest.MonkeyPatch, engine: executors.Engine
+) -> None:
+    monkeypatch.setenv(executors.WORKERS_VAR, "2")
+    with tempfile.TemporaryDirectory() as root_name:
+        project = projects.Project.new(pathlib.Path(root_name))
+        for i in range(5):
+            experiments.Experiment.new({"seed": i}, project.root).add_trial({})
+
+        exps = list(experiments.load_all(project, engine=engine, chunksize=2))
+        assert sorted(exp.config["seed"] for exp in exps) == list(range(5))
+
+        exps = list(experiments.load_all(project, engine=engine, workers=1))
+        assert len(exps) == 5
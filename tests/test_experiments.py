@@ -1,10 +1,13 @@
 import copy
+import json
+import os
 import pathlib
+import statistics
 import tempfile
 
 import pytest
 
-from relic import experiments, projects
+from relic import disk, experiments, projects
 
 
 def test_smoke() -> None:
@@ -314,3 +317,239 @@ def test_load_all() -> None:
 
         assert len(exps) == 1
         assert exps == [experiment]
+
+
+def test_update_trial_writes_summary() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+
+        experiment.add_trial({"loss": 1.0, "acc": {"top1": 3}, "finished": True})
+        experiment.add_trial({"loss": 3.0, "name": "b"})
+        experiment.update_trial({"instance": 1, "loss": 5.0})
+
+        summary = experiments.Experiment.load_summary(project.root, experiment.hash)
+        assert summary is not None
+        assert summary.trials == 2
+        assert summary.keys == ["acc.top1", "finished", "instance", "loss"]
+        assert set(summary.metrics) == {"loss", "acc.top1"}
+
+        loss = summary.metrics["loss"]
+        assert (loss.count, loss.sum, loss.min, loss.max, loss.last) == (
+            2,
+            6.0,
+            1.0,
+            5.0,
+            5.0,
+        )
+        assert loss.mean == 3.0
+        assert loss.stdev == pytest.approx(statistics.stdev([1.0, 5.0]))
+
+
+def test_metric_summary_stdev_with_offset() -> None:
+    values = [1e8 + 1, 1e8 + 2, 1e8 + 3]
+    metric = experiments.MetricSummary()
+    for value in values:
+        metric.add(value)
+
+    assert metric.stdev == pytest.approx(statistics.stdev(values))
+
+
+def test_old_summary_is_ignored() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+        experiment.add_trial({"loss": 1.0})
+
+        # Summaries from before m2 was recorded can't answer stdev accurately.
+        summary_path = experiment.summary_path(project.root, experiment.hash)
+        old = {
+            "trials": 1,
+            "keys": ["instance", "loss"],
+            "metrics": {
+                "loss": {
+                    "count": 1,
+                    "sum": 1.0,
+                    "sumsq": 1.0,
+                    "min": 1.0,
+                    "max": 1.0,
+                    "last": 1.0,
+                }
+            },
+        }
+        summary_path.write_text(json.dumps(old))
+
+        assert (
+            experiments.Experiment.load_summary(project.root, experiment.hash) is None
+        )
+
+
+def test_load_without_trials() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+        experiment.add_trial({"loss": 1.0})
+        experiment.add_trial({"loss": 2.0})
+
+        loaded = experiments.Experiment.load(
+            project.root, experiment.hash, load_trials=False
+        )
+        assert not loaded.trials_loaded
+        assert loaded.trials == []
+        assert len(loaded) == 2
+
+
+def test_load_without_trials_legacy() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+        experiment.add_trial({"loss": 1.0})
+
+        experiment.summary_path(project.root, experiment.hash).unlink()
+
+        loaded = experiments.Experiment.load(
+            project.root, experiment.hash, load_trials=False
+        )
+        assert loaded.trials_loaded
+        assert loaded == experiment
+
+
+def test_manifest_matches_for_equal_experiments() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        model_path = root / "model.pt"
+        model_path.write_bytes(b"weights")
+
+        manifests = []
+        for name in ["a", "b"]:
+            (root / name).mkdir()
+            project = projects.Project.new(root / name)
+            experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+            experiment.add_trial({"loss": 1.0}, model_path)
+            experiment.add_trial({"loss": 2.0})
+            manifests.append(
+                experiments.Experiment.load_manifest(project.root, experiment.hash)
+            )
+
+        assert manifests[0] is not None
+        assert manifests[0] == manifests[1]
+        assert manifests[0].config == experiment.hash
+        assert len(manifests[0].trials) == 2
+        assert manifests[0].models[1] is None
+
+        # Changing a trial changes its digest but not the model's.
+        experiment.update_trial({"instance": 0, "loss": 3.0})
+        changed = experiments.Experiment.load_manifest(project.root, experiment.hash)
+        assert changed is not None
+        assert changed.trials[0] != manifests[0].trials[0]
+        assert changed.trials[1] == manifests[0].trials[1]
+        assert changed.models == manifests[0].models
+
+
+def test_model_metadata_index() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        model_path = root / "model.pt"
+        disk.dump(model_path, {"fastfood_seed": 7, "weights": [1, 2, 3]})
+
+        experiment = experiments.Experiment.new({}, project.root)
+        # Recorded at add_trial time without loading the model.
+        experiment.add_trial({}, model_path, model_metadata={"fastfood_seed": 3})
+        # Read from the model.
+        experiment.add_trial({}, model_path)
+        experiment.add_trial({})
+
+        index = experiments.Experiment.load_model_index(project.root, experiment.hash)
+        assert index == {0: {"fastfood_seed": 3}, 1: {"fastfood_seed": 7}}
+
+        # Models added by older versions of relic are indexed lazily.
+        experiment._set_model_metadata(1, None)
+        assert experiment.model_metadata(1, load=False) is None
+
+        assert experiment.backfill_model_metadata() == {
+            0: {"fastfood_seed": 3},
+            1: {"fastfood_seed": 7},
+        }
+        assert experiment.model_metadata(1, load=False) == {"fastfood_seed": 7}
+
+        # Deleting models drops their entries.
+        experiment.delete_trials(starting_from=1)
+        index = experiments.Experiment.load_model_index(project.root, experiment.hash)
+        assert index == {0: {"fastfood_seed": 3}}
+
+
+def test_trial_weights() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+        experiment.add_trial({"losses": [1.0, 2.0, 3.0], "acc": {"top1": 0.5}})
+        experiment.add_trial({"loss": 1.0})
+
+        first, second = experiment.trial_weights()
+        assert (first.keys, first.step) == (3, 3)
+        assert first.size == os.path.getsize(
+            experiment.trial_path(project.root, experiment.hash, 0)
+        )
+        assert second.written >= first.written
+
+        # Saving again (for example, when adding a trial) keeps the timestamps of unchanged trials.
+        experiment.add_trial({"loss": 2.0})
+        assert experiment.trial_weights()[0].written == first.written
+
+
+def test_trial_weights_without_manifest() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new(config={}, root=project.root)
+        experiment.add_trial({"loss": 1.0})
+        experiment.add_trial({"loss": 2.0})
+
+        # Written by an older version of relic: no manifest, and old trial files.
+        experiment.manifest_path(project.root, experiment.hash).unlink()
+        for i in range(2):
+            os.utime(
+                experiment.trial_path(project.root, experiment.hash, i), (1000, 1000)
+            )
+
+        experiment = experiments.Experiment.load(project.root, experiment.hash)
+        experiment.add_trial({"loss": 3.0})
+        first, second, third = experiment.trial_weights()
+        assert first.written == second.written == 1000.0
+        assert third.written > 1000.0
+
+        # Changed trials are stamped with the time they changed.
+        experiment.manifest_path(project.root, experiment.hash).unlink()
+        for i in range(3):
+            os.utime(
+                experiment.trial_path(project.root, experiment.hash, i), (1000, 1000)
+            )
+        experiment.update_trial({"loss": 4.0, "instance": 0})
+        assert [w.written for w in experiment.trial_weights()][1:] == [1000.0, 1000.0]
+        assert experiment.trial_weights()[0].written > 1000.0
+
+
+def test_content_fingerprint_changes_with_trials() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+
+        before = experiments.Experiment.content_fingerprint(
+            project.root, experiment.hash
+        )
+        assert before == experiments.Experiment.content_fingerprint(
+            project.root, experiment.hash
+        )
+
+        experiment.add_trial({"loss": 0.5})
+        after = experiments.Experiment.content_fingerprint(
+            project.root, experiment.hash
+        )
+        assert after != before
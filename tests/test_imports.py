@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+from relic import __main__, cli
+
+HEAVY = ["torch", "matplotlib", "pyarrow", "tabulate", "numpy"]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import relic",
+        "import relic.__main__; relic.__main__.make_parser([])",
+        "import relic.__main__; relic.__main__.make_parser(['versions'])",
+        "import relic.cli.ls",
+    ],
+)
+def test_startup_skips_heavy_modules(code: str) -> None:
+    check = (
+        f"{code}; import sys; print(sorted(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_find_command() -> None:
+    assert __main__.find_command(["ls", "--format", "csv"]) == "ls"
+    assert __main__.find_command(["--verbose", "--root", "ls", "cat"]) == "cat"
+    assert __main__.find_command(["--root", "relics", "plot", "-y", "a"]) == "plot"
+    assert __main__.find_command(["--load-workers", "2", "ls"]) == "ls"
+    assert __main__.find_command(["init"]) is None
+    assert __main__.find_command(["--help"]) is None
+    assert __main__.find_command([]) is None
+
+
+def test_lazy_parser_lists_every_command() -> None:
+    parser = __main__.make_parser([])
+    help = parser.format_help()
+    for command in ["cat", "delete", "export", "gc", "ls", "plot", "versions"]:
+        assert command in help
+
+    args = __main__.make_parser(["versions"]).parse_args(["versions", "--new"])
+    assert args.new
+
+
+@pytest.mark.parametrize("command", sorted(cli.COMMANDS))
+def test_command_help(command: str) -> None:
+    # In a fresh interpreter, so that no other test has imported the modules a subcommand forgot to import.
+    result = subprocess.run(
+        [sys.executable, "-m", "relic", command, "--help"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
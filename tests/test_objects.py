@@ -0,0 +1,157 @@
+import concurrent.futures
+import os
+import pathlib
+import tempfile
+import threading
+import time
+
+from relic import disk, experiments, objects, projects, transfer, trash
+
+
+def test_no_store_by_default() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = projects.Project.new(pathlib.Path(root_name))
+        assert objects.ObjectStore.find(project.root) is None
+
+
+def test_identical_models_are_stored_once() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root / "relics", object_store=True)
+        store = objects.ObjectStore.find(project.root)
+        assert store is not None
+
+        model = root / "model.pt"
+        model.write_bytes(b"weights")
+
+        a = experiments.Experiment.new({"lr": 0.1}, project.root)
+        a.add_trial({}, model)
+        b = experiments.Experiment.new({"lr": 0.2}, project.root)
+        b.add_trial({}, model)
+
+        manifest = experiments.Experiment.load_manifest(project.root, a.hash)
+        assert manifest is not None
+        digest = manifest.models[0]
+        assert digest is not None
+
+        assert store.refcount(digest) == 2
+        assert os.stat(a.model_path(0)).st_ino == os.stat(b.model_path(0)).st_ino
+        assert a.model_path(0).read_bytes() == b"weights"
+
+        a.delete_trials()
+        assert store.refcount(digest) == 1
+        assert store.path(digest).exists()
+
+        # Deleting only moves the experiment to the trash, which still references the blob.
+        b.delete()
+        assert store.path(digest).exists()
+
+        assert trash.empty(root / "relics") == 1
+        assert not store.path(digest).exists()
+
+
+def test_replacing_a_model_releases_the_old_blob() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root / "relics", object_store=True)
+        store = objects.ObjectStore.find(project.root)
+        assert store is not None
+
+        old, new = root / "old.pt", root / "new.pt"
+        old.write_bytes(b"old")
+        new.write_bytes(b"new")
+
+        experiment = experiments.Experiment.new({}, project.root)
+        experiment.add_trial({}, old, transfer_strategy="move")
+        assert not old.exists()
+        experiment.update_trial({"instance": 0}, new)
+
+        assert experiment.model_path(0).read_bytes() == b"new"
+        assert store.collect() == 0
+        assert sum(1 for _ in store.root.glob("*/*")) == 1
+
+
+def test_collect_removes_unreferenced_blobs() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root / "relics", object_store=True)
+        store = objects.ObjectStore.find(project.root)
+        assert store is not None
+
+        model = root / "model.pt"
+        model.write_bytes(b"weights")
+        experiment = experiments.Experiment.new({}, project.root)
+        experiment.add_trial({}, model)
+
+        # Removed by hand, without going through relic.
+        os.remove(experiment.model_path(0))
+
+        assert store.collect() == 1
+
+
+def test_parallel_add_and_release() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root / "relics", object_store=True)
+        store = objects.ObjectStore.find(project.root)
+        assert store is not None
+
+        model = root / "model.pt"
+        model.write_bytes(b"weights" * 1000)
+
+        def churn(i: int) -> experiments.Experiment:
+            # Each release can drop the blob's last link while other threads add it.
+            experiment = experiments.Experiment.new({"i": i}, project.root)
+            for _ in range(5):
+                experiment.add_trial({}, model)
+                experiment.delete_trials()
+            experiment.add_trial({}, model)
+            return experiment
+
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            exps = list(pool.map(churn, range(16)))
+
+        manifest = experiments.Experiment.load_manifest(project.root, exps[0].hash)
+        assert manifest is not None and manifest.models[0] is not None
+        assert store.refcount(manifest.models[0]) == len(exps)
+        assert all(exp.model_path(0).read_bytes() == model.read_bytes() for exp in exps)
+        assert store.collect() == 0
+
+
+def test_release_waits_for_put(monkeypatch) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root / "relics", object_store=True)
+        store = objects.ObjectStore.find(project.root)
+        assert store is not None
+
+        model = root / "model.pt"
+        model.write_bytes(b"weights")
+        # Copied and digested in one read.
+        digest = store.put(model, root / "a.pt")
+        assert digest == disk.digest(model)
+        # The blob is now unreferenced, so release() would remove it.
+        os.remove(root / "a.pt")
+
+        hardlink = transfer.hardlink
+        released = []
+
+        def slow_hardlink(src, dst):  # type: ignore
+            # Another thread releases the blob while put() is about to link it.
+            thread = threading.Thread(
+                target=lambda: released.append(store.release(digest))  # type: ignore
+            )
+            thread.start()
+            thread.join(timeout=0.2)
+            return hardlink(src, dst)
+
+        monkeypatch.setattr(transfer, "hardlink", slow_hardlink)
+        assert store.put(model, root / "b.pt", digest) == digest
+        monkeypatch.undo()
+
+        while not released:
+            time.sleep(0.01)
+
+        assert released == [False]
+        assert store.refcount(digest) == 1
+        assert (root / "b.pt").read_bytes() == b"weights"
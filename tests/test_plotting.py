@@ -0,0 +1,197 @@
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+from relic import cli, experiments, plotting, projects
+
+
+@pytest.mark.parametrize(
+    "agg_fn",
+    [statistics.mean, statistics.median, statistics.stdev, sum, min, max],
+)
+def test_group_reduce(agg_fn) -> None:  # type: ignore
+    groups = np.array([0, 2, 0, 2, 2, 0])
+    values = np.array([1.0, 5.0, 3.0, 2.0, 8.0, 4.0])
+
+    result = plotting.group_reduce(groups, values, 4, agg_fn)
+
+    assert result[0] == pytest.approx(agg_fn([1.0, 3.0, 4.0]))
+    assert np.isnan(result[1])
+    assert result[2] == pytest.approx(agg_fn([5.0, 2.0, 8.0]))
+    assert np.isnan(result[3])
+
+
+def make_project(root: pathlib.Path) -> projects.Project:
+    project = projects.Project.new(root)
+    for lr in [0.1, 0.2]:
+        for dropout in [0.0, 0.5]:
+            for seed in range(2):
+                exp = experiments.Experiment.new(
+                    {"lr": lr, "dropout": dropout, "seed": seed}, project.root
+                )
+                exp.add_trial({"metrics": {"acc": lr + seed}})
+                exp.add_trial({"metrics": {"acc": lr + seed + 1}})
+                exp.add_trial({"loss": 1.0})
+    return project
+
+
+def test_compute_series() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = make_project(pathlib.Path(root_name))
+        exps = list(experiments.load_all(project))
+
+        series = plotting.compute_series(
+            plotting.make_experiment_series(exps, ["dropout"]),
+            "metrics.acc",
+            "lr",
+            aggregating_with=statistics.mean,
+            trial_aggregating_with=max,
+        )
+
+        assert set(series) == {(("dropout", 0.0),), (("dropout", 0.5),)}
+        line = series[(("dropout", 0.0),)]
+        assert line.xs.tolist() == [0.1, 0.2]
+        # max over trials is lr + seed + 1; mean over seeds 0 and 1.
+        assert line.ys == pytest.approx([1.6, 1.7])
+        assert line.mins == pytest.approx([1.1, 1.2])
+        assert line.maxs == pytest.approx([2.1, 2.2])
+
+
+def test_compute_series_skips_missing_metric() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        project = make_project(pathlib.Path(root_name))
+        exps = list(experiments.load_all(project))
+
+        series = plotting.compute_series(
+            plotting.make_experiment_series(exps, []), "missing", "lr"
+        )
+
+        assert series[()].xs.tolist() == []
+
+
+def test_compute_series_skips_nan_values(caplog) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        project = projects.Project.new(pathlib.Path(root_name))
+        for lr in [0.1, 0.2]:
+            exp = experiments.Experiment.new({"lr": lr}, project.root)
+            exp.add_trial({"loss": lr})
+            exp.add_trial({"loss": float("nan")})
+        exps = list(experiments.load_all(project))
+
+        series = plotting.compute_series(
+            plotting.make_experiment_series(exps, []), "loss", "lr"
+        )
+
+        assert series[()].xs.tolist() == [0.1, 0.2]
+        assert series[()].ys == pytest.approx([0.1, 0.2])
+        assert caplog.text.count("Skipped NaN values.") == 2
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(help="Available commands.")
+    cli.plot.add_parser(subparsers)
+    return parser
+
+
+def test_plot_out_and_cache(monkeypatch) -> None:  # type: ignore
+    pytest.importorskip("matplotlib")
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics")
+        out = root / "plot.svg"
+
+        args = make_parser().parse_args(
+            ["plot", "-y", "metrics.acc", "-x", "lr", "--out", str(out)]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.plot.do_plot(args) == 0
+        assert out.read_text().startswith("<?xml")
+        rendered = out.read_bytes()
+        out.unlink()
+
+        # Nothing changed, so the cached plot is used.
+        def render(*args, **kwargs):  # type: ignore
+            raise AssertionError("cached plots shouldn't be rendered")
+
+        monkeypatch.setattr(plotting, "render", render)
+        assert cli.plot.do_plot(args) == 0
+        assert out.read_bytes() == rendered
+
+        # A new experiment invalidates the cache.
+        exp = experiments.Experiment.new({"lr": 0.3}, args.project.root)
+        exp.add_trial({"metrics": {"acc": 1.0}})
+        with pytest.raises(AssertionError):
+            cli.plot.do_plot(args)
+
+
+def test_cli_does_not_import_matplotlib() -> None:
+    code = "import sys, relic.cli.plot; print('matplotlib' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_plot_several_metrics(monkeypatch) -> None:  # type: ignore
+    pytest.importorskip("matplotlib")
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        make_project(root / "relics")
+
+        loads = []
+        load_all = experiments.load_all
+
+        def counting_load_all(*args, **kwargs):  # type: ignore
+            loads.append(args)
+            return load_all(*args, **kwargs)
+
+        monkeypatch.setattr(experiments, "load_all", counting_load_all)
+
+        # One grid.
+        out = root / "grid.png"
+        args = make_parser().parse_args(
+            ["plot", "-y", "metrics.acc", "loss", "-x", "lr", "--out", str(out)]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.plot.do_plot(args) == 0
+        assert out.read_bytes().startswith(b"\x89PNG")
+        assert len(loads) == 1
+
+        # One file per metric, still from a single load.
+        pattern = str(root / "{metric}.svg")
+        args = make_parser().parse_args(
+            ["plot", "-y", "metrics.acc", "loss", "-x", "lr", "--out", pattern]
+        )
+        args.project = projects.Project(root / "relics")
+        assert cli.plot.do_plot(args) == 0
+        assert (root / "metrics.acc.svg").is_file()
+        assert (root / "loss.svg").is_file()
+        assert len(loads) == 2
+
+
+def test_prune_cache() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        directory = cli.plot.cache_dir(pathlib.Path(root_name))
+        directory.mkdir(parents=True)
+        for i in range(5):
+            path = directory / f"{i}.svg"
+            path.write_text(str(i))
+            os.utime(path, (i, i))
+
+        assert cli.plot.prune_cache(directory, keep=3) == 2
+        assert sorted(p.name for p in directory.iterdir()) == [
+            "2.svg",
+            "3.svg",
+            "4.svg",
+        ]
+        assert cli.plot.prune_cache(directory, keep=3) == 0
@@ -0,0 +1,92 @@
+import pathlib
+import tempfile
+
+import pytest
+
+import relic
+from relic import executors, experiments, projects
+
+
+def test_session_reuses_pool() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        projects.Project.new(root)
+
+        with relic.Session(root, engine="process", workers=2) as session:
+            for i in range(5):
+                session.new_experiment({"seed": i}).add_trial({"loss": float(i)})
+
+            exps = list(session.load_experiments(lambda exp: exp.config["seed"] < 2))
+            assert sorted(exp.config["seed"] for exp in exps) == [0, 1]
+            pool = session.pools.get("process")
+
+            relic.new_experiment({"seed": 5}, root)
+            assert session.refresh() == 1
+            assert len(list(session.load_experiments())) == 6
+            assert session.pools.get("process") is pool
+
+        assert session.closed
+        with pytest.raises(ValueError):
+            session.load_experiments()
+
+        # Closing again does nothing.
+        session.close()
+
+
+def test_session_refresh() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        hashes = [relic.new_experiment({"seed": i}, root).hash for i in range(3)]
+
+        with relic.Session(root) as session:
+            exps = {exp.hash: exp for exp in session.load_experiments()}
+            assert sorted(exps) == sorted(hashes)
+            assert session.refresh() == 0
+
+            # Another process (a training job) adds a trial and deletes an experiment.
+            relic.Experiment.load(project.root, hashes[0]).add_trial({"loss": 0.5})
+            experiments.Experiment.remove(project.root, hashes[1])
+
+            assert session.refresh() == 2
+            exps2 = {exp.hash: exp for exp in session.load_experiments()}
+            assert sorted(exps2) == sorted([hashes[0], hashes[2]])
+            assert len(exps2[hashes[0]]) == 1
+            # Unchanged experiments aren't reloaded.
+            assert exps2[hashes[2]] is exps[hashes[2]]
+
+            # Experiments added through the session are seen without a refresh.
+            exp = session.new_experiment({"seed": 3})
+            assert exp.hash in {exp.hash for exp in session.load_experiments()}
+            assert session.refresh() == 0
+
+
+def test_pools_close() -> None:
+    pools = executors.Pools(1)
+    assert pools.get("thread") is pools.get("thread")
+    assert "thread" in pools
+
+    pools.close()
+    assert "thread" not in pools
+
+
+def test_load_experiments_with_pools() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        projects.Project.new(root)
+        for i in range(3):
+            relic.new_experiment({"seed": i}, root).add_trial({"loss": float(i)})
+
+        with relic.Session(root, engine="thread", workers=2) as session:
+            exps = list(
+                relic.load_experiments(root, engine="thread", pools=session.pools)
+            )
+            assert len(exps) == 3
+            pool = session.pools.get("thread")
+
+            # The pool is left open for the next call.
+            exps = list(
+                relic.load_experiments(root, engine="thread", pools=session.pools)
+            )
+            assert len(exps) == 3
+            assert session.pools.get("thread") is pool
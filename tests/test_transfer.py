@@ -0,0 +1,92 @@
+import errno
+import os
+import pathlib
+import tempfile
+
+import pytest
+
+from relic import experiments, projects, transfer
+
+
+@pytest.mark.parametrize("strategy", ["copy", "hardlink", "reflink", "move"])
+def test_transfer_contents(strategy) -> None:  # type: ignore
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        src = root / "src.model"
+        src.write_bytes(b"weights")
+        dst = root / "dst.model"
+        dst.write_bytes(b"old weights")
+
+        transfer.transfer(src, dst, strategy)
+
+        assert dst.read_bytes() == b"weights"
+        assert src.exists() == (strategy != "move")
+
+
+def test_hardlink_shares_inode() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        src = root / "src.model"
+        src.write_bytes(b"weights")
+
+        assert transfer.hardlink(src, root / "dst.model") == "hardlink"
+        assert os.stat(src).st_ino == os.stat(root / "dst.model").st_ino
+
+
+def test_hardlink_falls_back_across_devices(monkeypatch) -> None:  # type: ignore
+    def link(src, dst):  # type: ignore
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", link)
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        src = root / "src.model"
+        src.write_bytes(b"weights")
+
+        assert transfer.transfer(src, root / "dst.model", "hardlink") == "copy"
+        assert (root / "dst.model").read_bytes() == b"weights"
+
+
+def test_move_falls_back_across_devices(monkeypatch) -> None:  # type: ignore
+    def replace(src, dst):  # type: ignore
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "replace", replace)
+
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        src = root / "src.model"
+        src.write_bytes(b"weights")
+
+        assert transfer.transfer(src, root / "dst.model", "move") == "copy"
+        assert (root / "dst.model").read_bytes() == b"weights"
+        assert not src.exists()
+
+
+def test_copy_does_not_write_through_hardlinks() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        original = root / "original.model"
+        original.write_bytes(b"original")
+        transfer.hardlink(original, root / "dst.model")
+
+        new = root / "new.model"
+        new.write_bytes(b"new")
+        transfer.copy(new, root / "dst.model")
+
+        assert original.read_bytes() == b"original"
+        assert (root / "dst.model").read_bytes() == b"new"
+
+
+def test_add_trial_with_hardlink() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        model = root / "model.pt"
+        model.write_bytes(b"weights")
+
+        experiment = experiments.Experiment.new({}, project.root)
+        experiment.add_trial({"loss": 1.0}, model, transfer_strategy="hardlink")
+
+        assert os.stat(model).st_ino == os.stat(experiment.model_path(0)).st_ino
@@ -0,0 +1,61 @@
+import pathlib
+import tempfile
+
+from relic import experiments, projects, trash
+
+
+def test_delete_moves_to_trash() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+        experiment.add_trial({"loss": [1.0, 0.5]})
+
+        experiment.delete()
+        assert not experiments.Experiment.exists(project.root, experiment.hash)
+        assert experiment.hash not in set(project.hashes())
+
+        (entry,) = trash.entries(root)
+        assert entry.name.startswith(f"v1-{experiment.hash}-")
+        assert (entry / "config").exists()
+
+
+def test_delete_same_hash_twice() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+
+        for _ in range(2):
+            experiment = experiments.Experiment.new({"lr": 0.1}, project.root)
+            experiment.delete()
+
+        assert len(trash.entries(root)) == 2
+
+
+def test_empty() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        project = projects.Project.new(root)
+        for i in range(10):
+            experiment = experiments.Experiment.new({"seed": i}, project.root)
+            experiment.add_trial({"finished": True})
+            experiment.delete()
+
+        assert trash.empty(root, max_workers=4) == 10
+        assert trash.entries(root) == []
+        assert trash.empty(root) == 0
+
+
+def test_empty_without_trash() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+        projects.Project.new(root)
+
+        assert trash.empty(root) == 0
+
+
+def test_purge_missing_entry() -> None:
+    with tempfile.TemporaryDirectory() as root_name:
+        root = pathlib.Path(root_name)
+
+        trash.purge(root / "missing")